@@ -0,0 +1,118 @@
+# app/asgi.py
+
+import inspect
+import io
+import sys
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.exceptions import HTTPException
+
+from app.main import create_app
+
+
+class AsyncFlaskApp:
+    """
+    ASGI application for a Flask app.
+
+    Requests routed to `async def` views are awaited directly on the server's event loop, so an analysis
+    waiting on the LLM holds no thread and one process can keep hundreds in flight. Every other request
+    runs through asgiref's WSGI adapter on its thread pool, exactly as under a WSGI server.
+
+    Run with an ASGI server, e.g. `uvicorn app.asgi:app`.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi_app = WsgiToAsgi(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            match = self._match_async_view(scope)
+            if match is not None:
+                view, view_args = match
+                await self._serve_async_view(view, view_args, scope, receive, send)
+                return
+        await self.wsgi_app(scope, receive, send)
+
+    def _match_async_view(self, scope):
+        """
+        Return the (view function, view args) for an `async def` view matching the request, or None.
+        """
+        adapter = self.flask_app.url_map.bind("localhost", script_name=scope.get("root_path") or None)
+        try:
+            endpoint, view_args = adapter.match(scope["path"], method=scope["method"])
+        except HTTPException:
+            return None
+        view = self.flask_app.view_functions.get(endpoint)
+        if view is None or not inspect.iscoroutinefunction(view):
+            return None
+        return view, view_args
+
+    async def _serve_async_view(self, view, view_args, scope, receive, send):
+        """
+        Run an async view inside a Flask request context on the running event loop and send its response.
+        """
+        body = await self._read_body(receive)
+        with self.flask_app.request_context(build_environ(scope, body)):
+            try:
+                rv = self.flask_app.preprocess_request()
+                if rv is None:
+                    rv = await view(**view_args)
+            except Exception as e:
+                rv = self.flask_app.handle_user_exception(e)
+            response = self.flask_app.finalize_request(rv)
+
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [(name.lower().encode("latin1"), value.encode("latin1")) for name, value in response.headers.items()],
+        })
+        await send({"type": "http.response.body", "body": response.get_data()})
+
+    @staticmethod
+    async def _read_body(receive):
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+
+def build_environ(scope, body):
+    """
+    Build a WSGI environ from an ASGI HTTP scope and the full request body.
+    """
+    script_name = scope.get("root_path", "")
+    path_info = scope["path"][len(script_name):] if scope["path"].startswith(script_name) else scope["path"]
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": script_name.encode("utf8").decode("latin1"),
+        "PATH_INFO": path_info.encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("ascii"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin1").upper().replace("-", "_")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = f"HTTP_{name}"
+        value = value.decode("latin1")
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+app = AsyncFlaskApp(create_app())
@@ -0,0 +1,143 @@
+import logging
+from collections.abc import Mapping
+
+from app.concurrency import configure_concurrency_limiter
+from app.jobs import configure_job_queue
+from app.nlp.budget import configure_token_budgets
+from app.nlp.clients import configure_clients
+from app.nlp.heuristics import configure_heuristic_validator
+from app.nlp.model import configure_llm_cache, configure_model_tiers, configure_request_coalescing
+from app.nlp.research import configure_research_cache, configure_serp_api
+from app.nlp.throttle import configure_llm_resilience
+from app.profiling import configure_profiling
+from app.utils import configure_document_cache, configure_extraction_limits, configure_ocr
+
+# Constants
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def configure_logging(level="INFO"):
+    """
+    Set the level of the app's loggers, and log to stderr unless logging is already set up
+    (e.g. by gunicorn or the Streamlit runtime).
+
+    :param level: A logging level name such as "DEBUG", "INFO" or "WARNING".
+    """
+    logger = logging.getLogger("app")
+    logger.setLevel(level)
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+
+
+def configure_services(config):
+    """
+    Configure the process-wide clients and caches shared by every request.
+    Called once per process by `create_app` and by the Streamlit frontend.
+
+    :param config: A mapping such as Flask's `app.config`, or a config class from `config.config`.
+    """
+    if not isinstance(config, Mapping):
+        config = {key: getattr(config, key) for key in dir(config) if key.isupper()}
+
+    # Log level of the app's loggers
+    configure_logging(level=config['LOG_LEVEL'])
+
+    # Pooled LLM and HTTP clients
+    configure_clients(
+        pool_size=config['HTTP_POOL_SIZE'],
+        timeout=config['HTTP_TIMEOUT'],
+        max_retries=config['HTTP_MAX_RETRIES'],
+        backoff_factor=config['HTTP_BACKOFF_FACTOR'],
+        async_pool_size=config['HTTP_ASYNC_POOL_SIZE'],
+        llm_timeout=config['LLM_TIMEOUT'],
+    )
+
+    # LLM rate limits and retries
+    configure_llm_resilience(
+        rpm=config['LLM_RPM_LIMIT'],
+        tpm=config['LLM_TPM_LIMIT'],
+        max_retries=config['LLM_MAX_RETRIES'],
+        base_delay=config['LLM_RETRY_BASE_DELAY'],
+        max_delay=config['LLM_RETRY_MAX_DELAY'],
+    )
+
+    # Opt-in request profiling
+    configure_profiling(
+        enabled=config['PROFILING_ENABLED'],
+        header_enabled=config['PROFILING_HEADER_ENABLED'],
+        directory=config['PROFILING_DIR'],
+        max_profiles=config['PROFILING_MAX_PROFILES'],
+        access_token=config['PROFILING_ACCESS_TOKEN'],
+    )
+
+    # Concurrency limit and wait queue for analyses
+    configure_concurrency_limiter(
+        max_concurrent=config['MAX_CONCURRENT_ANALYSES'],
+        max_queued=config['MAX_QUEUED_ANALYSES'],
+        queue_timeout=config['ANALYSIS_QUEUE_TIMEOUT'],
+        retry_after=config['OVERLOAD_RETRY_AFTER'],
+    )
+
+    # Background job queue for long analyses
+    configure_job_queue(
+        max_workers=config['JOB_WORKERS'],
+        max_queued=config['JOB_MAX_QUEUED'],
+        result_ttl=config['JOB_RESULT_TTL'],
+        path=config['JOB_STORE_PATH'],
+        lease_timeout=config['JOB_LEASE_TIMEOUT'],
+        max_attempts=config['JOB_MAX_ATTEMPTS'],
+    )
+
+    # Shared LLM response cache
+    configure_llm_cache(
+        enabled=config['LLM_CACHE_ENABLED'],
+        max_entries=config['LLM_CACHE_MAX_ENTRIES'],
+        ttl=config['LLM_CACHE_TTL'],
+        path=config['LLM_CACHE_PATH'],
+    )
+
+    # Model per prompt
+    configure_model_tiers(enabled=config['MODEL_TIERING_ENABLED'], models=config['LLM_PROMPT_MODELS'])
+
+    # Coalescing of concurrent identical analyses and LLM calls
+    configure_request_coalescing(enabled=config['REQUEST_COALESCING_ENABLED'])
+
+    # SERP API endpoint
+    configure_serp_api(url=config['SERP_API_URL'])
+
+    # SERP results (and optionally interview insights) per company and job title
+    configure_research_cache(
+        enabled=config['RESEARCH_CACHE_ENABLED'],
+        ttl=config['RESEARCH_CACHE_TTL'],
+        stale_ttl=config['RESEARCH_CACHE_STALE_TTL'],
+        max_entries=config['RESEARCH_CACHE_MAX_ENTRIES'],
+        path=config['RESEARCH_CACHE_PATH'],
+        cache_insights=config['INTERVIEW_INSIGHTS_CACHE_ENABLED'],
+    )
+
+    # Pre-LLM heuristic validation
+    configure_heuristic_validator(
+        enabled=config['HEURISTIC_VALIDATION_ENABLED'],
+        reject_threshold=config['HEURISTIC_REJECT_THRESHOLD'],
+        accept_threshold=config['HEURISTIC_ACCEPT_THRESHOLD'],
+        skip_llm_for_valid=config['HEURISTIC_SKIP_LLM_FOR_VALID'],
+    )
+
+    # Per-prompt input token budgets
+    configure_token_budgets(enabled=config['TOKEN_BUDGET_ENABLED'], budgets=config['TOKEN_BUDGETS'])
+
+    # Parallel OCR
+    configure_ocr(max_workers=config['OCR_MAX_WORKERS'], min_page_chars=config['OCR_MIN_PAGE_CHARS'])
+
+    # Page and character caps for resume text extraction
+    configure_extraction_limits(max_pages=config['DOCUMENT_MAX_PAGES'], max_chars=config['DOCUMENT_MAX_CHARS'])
+
+    # Parsed-document cache
+    configure_document_cache(
+        enabled=config['DOCUMENT_CACHE_ENABLED'],
+        max_entries=config['DOCUMENT_CACHE_MAX_ENTRIES'],
+        ttl=config['DOCUMENT_CACHE_TTL'],
+        path=config['DOCUMENT_CACHE_PATH'],
+    )
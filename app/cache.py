@@ -0,0 +1,420 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+SQLITE_TIMEOUT = 30  # seconds to wait for a lock held by another worker
+DEFAULT_STALE_TTL = 24 * 60 * 60  # seconds an expired entry may still be served while it is refreshed
+
+
+def make_cache_key(*parts):
+    """
+    Build a content-addressed cache key from JSON-serializable parts.
+
+    :param parts: Values that together identify the cached computation.
+    :return: A SHA-256 hex digest.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCache:
+    """
+    In-process LRU cache with a per-entry time-to-live.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the cached value, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entries once the cache is full.
+        """
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    On-disk cache backed by SQLite, safe to share between worker processes.
+    Values must be JSON-serializable.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    @contextmanager
+    def _connect(self):
+        """
+        Open a short-lived connection and commit on success, so no handle is shared across threads or forks.
+        """
+        connection = sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, key):
+        """
+        Return the cached value, or None if it is missing or expired.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute("SELECT value, stored_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            if self.ttl is not None and now - stored_at > self.ttl:
+                connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            connection.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key, value):
+        """
+        Store a value, then drop expired entries and the least recently used ones beyond the size limit.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            if self.ttl is not None:
+                connection.execute("DELETE FROM cache WHERE stored_at < ?", (now - self.ttl,))
+            connection.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute("DELETE FROM cache")
+
+    def __len__(self):
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class TieredCache:
+    """
+    Looks up values in a fast in-memory tier first, then an optional shared disk tier,
+    and keeps hit/miss counters for both.
+    """
+
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory if memory is not None else MemoryCache()
+        self.disk = disk
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the cached value, or None on a miss. Disk hits are promoted to memory.
+        """
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        """
+        Return hit/miss counters and the current number of in-memory entries.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self.memory),
+            }
+
+
+def build_cache(max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, path=None):
+    """
+    Create a TieredCache with a memory tier and, when a path is given, a SQLite disk tier.
+
+    :param max_entries: Maximum number of entries kept in each tier.
+    :param ttl: Seconds before an entry expires, or None to keep entries until evicted.
+    :param path: Optional SQLite database path for the shared disk tier.
+    :return: A TieredCache instance.
+    """
+    disk = SQLiteCache(path, max_entries=max_entries, ttl=ttl) if path else None
+    return TieredCache(MemoryCache(max_entries=max_entries, ttl=ttl), disk)
+
+
+class _Flight:
+    """
+    One in-flight computation and its outcome, shared by every caller with the same key.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for a key is running, other callers with
+    the same key wait for its outcome instead of starting their own. Counts the calls saved.
+    """
+
+    def __init__(self):
+        self.saved_calls = 0
+        self._flights = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        Return `func()`, or the outcome of the identical call already running on another thread.
+        Errors are shared with the waiting callers too.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.saved_calls += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    async def ado(self, key, func):
+        """
+        Async counterpart of `do`: await `func()`, or the identical call already running on this event loop.
+        A caller being cancelled does not cancel the shared call for the others.
+        """
+        flight_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(flight_key)
+            if task is None:
+                task = self._tasks[flight_key] = asyncio.ensure_future(func())
+                task.add_done_callback(lambda _: self._forget_task(flight_key))
+            else:
+                self.saved_calls += 1
+        return await asyncio.shield(task)
+
+    def _forget_task(self, flight_key):
+        with self._lock:
+            self._tasks.pop(flight_key, None)
+
+    def stats(self):
+        """
+        Return the number of calls saved and currently in flight.
+        """
+        with self._lock:
+            return {"saved_calls": self.saved_calls, "in_flight": len(self._flights) + len(self._tasks)}
+
+
+class RefreshingCache:
+    """
+    Stale-while-revalidate cache for slow upstream lookups.
+
+    Entries are fresh for `ttl` seconds. For `stale_ttl` seconds after that they are still returned
+    immediately while a single background refresh replaces them; older entries are recomputed inline.
+    Concurrent computations for the same key are coalesced into one upstream call.
+    Values must be JSON-serializable (and not None) when the cache has a disk tier.
+    """
+
+    def __init__(self, cache, ttl=DEFAULT_TTL, stale_ttl=DEFAULT_STALE_TTL, single_flight=None):
+        self.cache = cache
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+        self.stale_hits = 0
+        self.refreshes = 0
+        self._refreshing = set()
+        self._refresh_tasks = set()  # the event loop only keeps weak references to tasks
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the cached value, fresh or stale, or None. Never triggers a refresh.
+        """
+        entry = self.cache.get(key)
+        return entry["value"] if entry is not None else None
+
+    def set(self, key, value):
+        self.cache.set(key, {"value": value, "stored_at": time.time()})
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for the key, calling `compute()` on a miss and refreshing stale
+        entries on a background thread.
+        """
+        entry = self.cache.get(key)
+        if entry is not None:
+            if self._is_stale(entry) and self._start_refresh(key):
+                threading.Thread(target=self._refresh, args=(key, compute), daemon=True).start()
+            return entry["value"]
+        return self.single_flight.do(key, lambda: self._compute_and_store(key, compute))
+
+    async def aget_or_compute(self, key, compute):
+        """
+        Async counterpart of `get_or_compute`; `compute` is a coroutine function and stale
+        entries are refreshed in a task on the running event loop.
+        """
+        entry = self.cache.get(key)
+        if entry is not None:
+            if self._is_stale(entry) and self._start_refresh(key):
+                task = asyncio.ensure_future(self._arefresh(key, compute))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return entry["value"]
+        return await self.single_flight.ado(key, lambda: self._acompute_and_store(key, compute))
+
+    def _is_stale(self, entry):
+        return self.ttl is not None and time.time() - entry["stored_at"] > self.ttl
+
+    def _start_refresh(self, key):
+        """
+        Count a stale hit and claim the key's refresh; returns False if one is already running.
+        """
+        with self._lock:
+            self.stale_hits += 1
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def _refresh(self, key, compute):
+        try:
+            self.single_flight.do(key, lambda: self._compute_and_store(key, compute))
+        except Exception as e:
+            logger.warning("Background refresh failed, keeping the stale entry: %s", e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def _arefresh(self, key, compute):
+        try:
+            await self.single_flight.ado(key, lambda: self._acompute_and_store(key, compute))
+        except Exception as e:
+            logger.warning("Background refresh failed, keeping the stale entry: %s", e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _compute_and_store(self, key, compute):
+        value = compute()
+        self.set(key, value)
+        return value
+
+    async def _acompute_and_store(self, key, compute):
+        value = await compute()
+        self.set(key, value)
+        return value
+
+    def stats(self):
+        """
+        Return the underlying cache counters plus stale hits, refreshes and coalesced calls.
+        """
+        with self._lock:
+            stats = {"stale_hits": self.stale_hits, "refreshes": self.refreshes}
+        return {**self.cache.stats(), **stats, **self.single_flight.stats()}
+
+
+def build_refreshing_cache(max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, stale_ttl=DEFAULT_STALE_TTL, path=None):
+    """
+    Create a RefreshingCache over a TieredCache that keeps entries for `ttl + stale_ttl` seconds.
+
+    :param max_entries: Maximum number of entries kept in each tier.
+    :param ttl: Seconds an entry is fresh.
+    :param stale_ttl: Further seconds a stale entry is served while it is refreshed.
+    :param path: Optional SQLite database path for the shared disk tier.
+    :return: A RefreshingCache instance.
+    """
+    return RefreshingCache(build_cache(max_entries, ttl + stale_ttl, path), ttl=ttl, stale_ttl=stale_ttl)
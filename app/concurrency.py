@@ -0,0 +1,220 @@
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from app.metrics import MetricFamily, get_metrics_registry
+
+# Constants
+DEFAULT_MAX_CONCURRENT = 100
+DEFAULT_MAX_QUEUED = 200
+DEFAULT_QUEUE_TIMEOUT = 30  # seconds a request may wait for a slot
+DEFAULT_RETRY_AFTER = 5  # seconds clients are told to wait when rejected
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request cannot get an analysis slot. Carries the HTTP status and Retry-After to respond with.
+    """
+    status_code = 503
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueFull(Overloaded):
+    """
+    Every slot is busy and the wait queue is full.
+    """
+    status_code = 429
+
+
+class QueueTimeout(Overloaded):
+    """
+    The request waited in the queue longer than the queue timeout.
+    """
+    status_code = 503
+
+
+class _Waiter:
+    """
+    A queued request. `wake` is called (under the limiter lock) when a slot is handed to it.
+    """
+
+    def __init__(self, wake):
+        self.wake = wake
+        self.granted = False
+
+
+class ConcurrencyLimiter:
+    """
+    Process-wide cap on concurrent analyses, with a bounded FIFO wait queue.
+
+    Usable from worker threads (`slot`) and from event loops (`aslot`) at the same time, so the
+    sync Flask views and the async serving path share one budget. A request that finds every slot
+    busy waits in the queue; if the queue is full it is rejected with QueueFull (429), and if it waits
+    longer than `queue_timeout` it is rejected with QueueTimeout (503).
+    """
+
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT, max_queued=DEFAULT_MAX_QUEUED,
+                 queue_timeout=DEFAULT_QUEUE_TIMEOUT, retry_after=DEFAULT_RETRY_AFTER):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._active = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        """
+        Number of analyses currently holding a slot.
+        """
+        return self._active
+
+    @property
+    def queued(self):
+        """
+        Number of requests waiting for a slot.
+        """
+        return len(self._waiters)
+
+    def acquire(self):
+        """
+        Take a slot, blocking the calling thread while queued.
+        """
+        event = threading.Event()
+        waiter = self._enqueue(event.set)
+        if waiter is None or event.wait(self.queue_timeout):
+            return
+        self._abandon(waiter)
+
+    async def acquire_async(self):
+        """
+        Take a slot, waiting on the running event loop while queued.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = self._enqueue(lambda: loop.call_soon_threadsafe(_resolve, future))
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+        except asyncio.CancelledError:
+            # The client went away while queued; give back the slot if it was already handed over
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                self.release()
+            raise
+
+    def release(self):
+        """
+        Give a slot back, handing it straight to the longest-waiting request if there is one.
+        """
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                try:
+                    waiter.wake()
+                except RuntimeError:
+                    continue  # the waiter's event loop has closed
+                waiter.granted = True
+                return
+            self._active -= 1
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold a slot for the duration of the block (sync callers).
+        """
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        """
+        Hold a slot for the duration of the block (async callers).
+        """
+        await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _enqueue(self, wake):
+        """
+        Take a free slot immediately (returns None) or join the wait queue (returns the waiter).
+        """
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                return None
+            if len(self._waiters) >= self.max_queued:
+                raise QueueFull("The server is at capacity. Please retry shortly.", self.retry_after)
+            waiter = _Waiter(wake)
+            self._waiters.append(waiter)
+            return waiter
+
+    def _abandon(self, waiter):
+        """
+        Leave the queue after a timeout, unless a slot was handed over in the meantime.
+        """
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiters.remove(waiter)
+        raise QueueTimeout("Timed out waiting for the server to accept the request. Please retry.", self.retry_after)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+_concurrency_limiter = ConcurrencyLimiter()
+
+
+def configure_concurrency_limiter(max_concurrent=DEFAULT_MAX_CONCURRENT, max_queued=DEFAULT_MAX_QUEUED,
+                                  queue_timeout=DEFAULT_QUEUE_TIMEOUT, retry_after=DEFAULT_RETRY_AFTER):
+    """
+    Replace the process-wide concurrency limiter.
+    """
+    global _concurrency_limiter
+    _concurrency_limiter = ConcurrencyLimiter(
+        max_concurrent=max_concurrent, max_queued=max_queued, queue_timeout=queue_timeout, retry_after=retry_after
+    )
+
+
+def get_concurrency_limiter():
+    """
+    Return the process-wide concurrency limiter.
+    """
+    return _concurrency_limiter
+
+
+def _collect_metrics():
+    """
+    Report the analyses holding and waiting for a slot at scrape time.
+    """
+    return [
+        MetricFamily("analyses_active", "gauge", "Analyses currently holding a concurrency slot.", [
+            ({}, _concurrency_limiter.active),
+        ]),
+        MetricFamily("analyses_queued", "gauge", "Analyses waiting for a concurrency slot.", [
+            ({}, _concurrency_limiter.queued),
+        ]),
+    ]
+
+
+get_metrics_registry().register_collector(_collect_metrics)
@@ -0,0 +1,524 @@
+import base64
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+from werkzeug.datastructures import FileStorage
+
+from app.cache import SQLITE_TIMEOUT
+from app.concurrency import DEFAULT_RETRY_AFTER, QueueFull
+from app.metrics import MetricFamily, get_metrics_registry
+from app.nlp.model import run_analysis, summarize_stage_result
+from app.utils import parse_resume
+from config.keys import OPENAI_API_KEY, SERP_API_KEY
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_QUEUED = 100
+DEFAULT_RESULT_TTL = 60 * 60  # seconds finished jobs are kept
+DEFAULT_LEASE_TIMEOUT = 5 * 60  # seconds a running job may go without a heartbeat before it is reclaimed
+DEFAULT_MAX_ATTEMPTS = 3  # times a job is started before one whose workers keep dying is failed
+HEARTBEATS_PER_LEASE = 3  # lease renewals per lease timeout, so one missed heartbeat does not lose the job
+POLL_INTERVAL = 0.5  # seconds idle workers wait before checking the store again
+ANALYSIS_JOB = "analysis"
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED_STATUSES = (SUCCEEDED, FAILED)
+
+
+class JobFailed(Exception):
+    """
+    Raised by a job handler to fail a job with an error message and details for the client.
+    """
+
+    def __init__(self, error, details=None):
+        super().__init__(error)
+        self.details = details or []
+
+
+def new_job_record(job_id, kind):
+    """
+    Return the public record of a newly queued job.
+    """
+    return {
+        "job_id": job_id,
+        "kind": kind,
+        "status": QUEUED,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "expires_at": None,
+        "attempts": 0,
+        "completed_stages": [],
+        "partial_results": {},
+        "result": None,
+        "error": None,
+        "details": [],
+    }
+
+
+def _is_expired(record, now):
+    return record["expires_at"] is not None and record["expires_at"] < now
+
+
+class MemoryJobStore:
+    """
+    In-process job store. Jobs are only visible to the process that queued them.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._payloads = {}
+        self._queue = deque()
+        self._lock = threading.Lock()
+
+    def add(self, record, payload):
+        self.purge_expired()
+        with self._lock:
+            self._jobs[record["job_id"]] = record
+            self._payloads[record["job_id"]] = payload
+            self._queue.append(record["job_id"])
+
+    def claim_next(self, lease_timeout=DEFAULT_LEASE_TIMEOUT):
+        """
+        Mark the oldest queued job as running and return its (job_id, kind, payload, attempts), or None.
+        Workers share the process with this store, so a job never outlives its worker and needs no lease.
+        """
+        with self._lock:
+            if not self._queue:
+                return None
+            job_id = self._queue.popleft()
+            record = self._jobs[job_id]
+            record.update(status=RUNNING, started_at=time.time(), attempts=record["attempts"] + 1)
+            return job_id, record["kind"], self._payloads.pop(job_id), record["attempts"]
+
+    def renew_leases(self, job_ids, lease_timeout):
+        """
+        Nothing to renew: in-process jobs are not leased.
+        """
+
+    def update(self, job_id, update):
+        """
+        Apply `update(record)` to a job's record.
+        """
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if record is not None:
+                update(record)
+
+    def get(self, job_id):
+        """
+        Return a copy of a job's record, or None if it is unknown or expired.
+        """
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if record is None or _is_expired(record, time.time()):
+                return None
+            return json.loads(json.dumps(record))
+
+    def count_queued(self):
+        return len(self._queue)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, record in self._jobs.items() if _is_expired(record, now)]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+class SQLiteJobStore:
+    """
+    Job store backed by SQLite, shared by every web and worker process on the host,
+    so jobs can be queued by web processes and run by separate worker processes.
+
+    A claimed job is leased to its worker until `lease_expires_at`. Workers renew the leases of the jobs
+    they are running, so a job whose worker died stops being renewed and is claimed again once its lease expires.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=SQLITE_TIMEOUT)
+        try:
+            # Journal mode cannot change inside a transaction
+            connection.execute("PRAGMA journal_mode=WAL")
+        finally:
+            connection.close()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL, "
+                "expires_at REAL, record TEXT NOT NULL, payload TEXT, lease_expires_at REAL)"
+            )
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(jobs)")}
+            if "lease_expires_at" not in columns:
+                # Stores created before running jobs were leased
+                connection.execute("ALTER TABLE jobs ADD COLUMN lease_expires_at REAL")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status_created_at ON jobs (status, created_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at)")
+
+    @contextmanager
+    def _connect(self, write=True):
+        """
+        Open a short-lived connection, so no handle is shared across threads or forks. Writes run in an
+        immediate transaction committed on success; reads run without one, so they never take the write lock.
+        """
+        connection = sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT, isolation_level=None)
+        try:
+            if not write:
+                yield connection
+                return
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def add(self, record, payload):
+        with self._connect() as connection:
+            # Enqueueing is rare next to status polling, so expired jobs are purged here rather than on reads
+            connection.execute("DELETE FROM jobs WHERE expires_at < ?", (time.time(),))
+            connection.execute(
+                "INSERT INTO jobs (job_id, status, created_at, expires_at, record, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                (record["job_id"], record["status"], record["created_at"], None, json.dumps(record), json.dumps(payload)),
+            )
+
+    def claim_next(self, lease_timeout=DEFAULT_LEASE_TIMEOUT):
+        """
+        Lease the oldest queued job, or the oldest running job whose lease has expired, to this worker
+        for `lease_timeout` seconds. Returns its (job_id, kind, payload, attempts), or None.
+        The claim runs in an immediate transaction, so each job goes to exactly one worker.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT job_id, record, payload FROM jobs WHERE status = ? OR (status = ? AND lease_expires_at < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, record, payload = row
+            record = json.loads(record)
+            if record["status"] == RUNNING:
+                logger.warning("Reclaiming job %s, whose worker stopped renewing its lease", job_id)
+            # Records written before attempts were counted start at zero
+            record.update(status=RUNNING, started_at=now, attempts=record.get("attempts", 0) + 1)
+            connection.execute(
+                "UPDATE jobs SET status = ?, record = ?, lease_expires_at = ? WHERE job_id = ?",
+                (RUNNING, json.dumps(record), now + lease_timeout, job_id),
+            )
+        return job_id, record["kind"], json.loads(payload), record["attempts"]
+
+    def renew_leases(self, job_ids, lease_timeout):
+        """
+        Extend the leases of running jobs by `lease_timeout` seconds from now.
+        """
+        if not job_ids:
+            return
+        placeholders = ", ".join("?" * len(job_ids))
+        with self._connect() as connection:
+            connection.execute(
+                f"UPDATE jobs SET lease_expires_at = ? WHERE status = ? AND job_id IN ({placeholders})",
+                (time.time() + lease_timeout, RUNNING, *job_ids),
+            )
+
+    def update(self, job_id, update):
+        """
+        Apply `update(record)` to a job's record.
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT record FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            record = json.loads(row[0])
+            update(record)
+            connection.execute(
+                "UPDATE jobs SET status = ?, expires_at = ?, record = ? WHERE job_id = ?",
+                (record["status"], record["expires_at"], json.dumps(record), job_id),
+            )
+            if record["status"] in FINISHED_STATUSES:
+                # Finished jobs are never claimed again, so their input and lease can go
+                connection.execute(
+                    "UPDATE jobs SET payload = NULL, lease_expires_at = NULL WHERE job_id = ?", (job_id,)
+                )
+
+    def get(self, job_id):
+        """
+        Return a job's record, or None if it is unknown or expired.
+        """
+        with self._connect(write=False) as connection:
+            row = connection.execute(
+                "SELECT record FROM jobs WHERE job_id = ? AND (expires_at IS NULL OR expires_at >= ?)",
+                (job_id, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def count_queued(self):
+        with self._connect(write=False) as connection:
+            return connection.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+
+    def purge_expired(self):
+        with self._connect() as connection:
+            connection.execute("DELETE FROM jobs WHERE expires_at < ?", (time.time(),))
+
+
+class JobQueue:
+    """
+    Runs long analyses in the background on a local pool of worker threads.
+
+    Submitting returns a job ID immediately; the job's record tracks its status, the stages completed
+    so far with their partial results, and the final result or error. Finished jobs are kept for
+    `result_ttl` seconds. Workers start on the first submission, or with `run_forever` in a
+    dedicated worker process sharing a SQLiteJobStore.
+
+    While jobs run, a heartbeat thread renews their leases every `lease_timeout / HEARTBEATS_PER_LEASE`
+    seconds. Jobs whose worker died are picked up again once their lease expires, and failed after
+    `max_attempts` starts.
+    """
+
+    def __init__(self, store=None, max_workers=DEFAULT_MAX_WORKERS, max_queued=DEFAULT_MAX_QUEUED,
+                 result_ttl=DEFAULT_RESULT_TTL, handlers=None, lease_timeout=DEFAULT_LEASE_TIMEOUT,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.store = store if store is not None else MemoryJobStore()
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.handlers = dict(handlers if handlers is not None else JOB_HANDLERS)
+
+        self._workers = []
+        self._running = set()  # IDs of the jobs this process's workers are running
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, payload):
+        """
+        Queue a job and return its ID. Raises QueueFull when too many jobs are already waiting.
+
+        :param kind: The handler to run, e.g. ANALYSIS_JOB.
+        :param payload: JSON-serializable handler input.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self.max_queued is not None and self.store.count_queued() >= self.max_queued:
+            raise QueueFull("Too many analyses are waiting. Please retry shortly.", DEFAULT_RETRY_AFTER)
+
+        job_id = uuid.uuid4().hex
+        self.store.add(new_job_record(job_id, kind), payload)
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id):
+        """
+        Return the job's record, or None if it is unknown or has expired.
+        """
+        return self.store.get(job_id)
+
+    def start(self):
+        """
+        Start the worker threads if they are not running yet.
+        """
+        with self._lock:
+            if self._workers:
+                return
+            for index in range(self.max_workers):
+                worker = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+            if self._workers:
+                heartbeat = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+                heartbeat.start()
+                self._workers.append(heartbeat)
+
+    def run_forever(self):
+        """
+        Start the workers and block until `stop` is called (for dedicated worker processes).
+        """
+        self.start()
+        self._stopping.wait()
+
+    def stop(self):
+        """
+        Ask the workers to exit once their current job is done.
+        """
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _work(self):
+        while not self._stopping.is_set():
+            claimed = self.store.claim_next(self.lease_timeout)
+            if claimed is None:
+                with self._wakeup:
+                    self._wakeup.wait(POLL_INTERVAL)
+                continue
+
+            job_id, kind, payload, attempts = claimed
+            if attempts > self.max_attempts:
+                logger.error("Job %s was abandoned by its worker %d times; failing it", job_id, attempts - 1)
+                self._finish(job_id, FAILED, error="The analysis was interrupted repeatedly. Please retry.")
+                continue
+
+            with self._lock:
+                self._running.add(job_id)
+            try:
+                self._run(job_id, kind, payload)
+            finally:
+                with self._lock:
+                    self._running.discard(job_id)
+
+    def _heartbeat(self):
+        """
+        Renew the leases of the jobs this process is running until the queue stops.
+        """
+        while not self._stopping.wait(self.lease_timeout / HEARTBEATS_PER_LEASE):
+            with self._lock:
+                job_ids = list(self._running)
+            try:
+                self.store.renew_leases(job_ids, self.lease_timeout)
+            except Exception:
+                logger.exception("Failed to renew the leases of jobs %s", job_ids)
+
+    def _run(self, job_id, kind, payload):
+        """
+        Run one job, recording each completed stage and the final outcome in the store.
+        """
+        def report_stage(stage, data=None):
+            def update(record):
+                record["completed_stages"].append(stage)
+                if data is not None:
+                    record["partial_results"][stage] = data
+            self.store.update(job_id, update)
+
+        try:
+            result = self.handlers[kind](payload, report_stage)
+        except JobFailed as e:
+            self._finish(job_id, FAILED, error=str(e), details=e.details)
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            self._finish(job_id, FAILED, error=f"Analysis error:\n{str(e)}")
+        else:
+            self._finish(job_id, SUCCEEDED, result=result)
+
+    def _finish(self, job_id, status, result=None, error=None, details=None):
+        """
+        Record a job's outcome and start its result TTL.
+        """
+        now = time.time()
+        self.store.update(job_id, lambda record: record.update(
+            status=status, result=result, error=error, details=details or [],
+            finished_at=now, expires_at=now + self.result_ttl,
+        ))
+
+
+def run_analysis_job(payload, report_stage):
+    """
+    Job handler: parse the uploaded resume and analyze it against the job description,
+    reporting each stage as it completes.
+
+    :param payload: {"resume_file": base64 file contents, "file_name", "job_description", "fused"}.
+    :param report_stage: Callback invoked with (stage, partial result or None).
+    """
+    # Step 1: Parse the resume (including OCR for scanned pages)
+    resume_file = FileStorage(stream=io.BytesIO(base64.b64decode(payload["resume_file"])), filename=payload["file_name"])
+    try:
+        resume_text = parse_resume(resume_file)
+    except Exception as parse_error:
+        raise JobFailed(f"Failed to parse the resume:\n{str(parse_error)}")
+    if not resume_text.strip():
+        raise JobFailed("The uploaded resume is empty or could not be parsed.\nPlease upload a valid file.")
+    report_stage("parse_resume")
+
+    # Step 2: Run the analysis, reporting partial results as stages finish
+    result = run_analysis(
+        resume_text=resume_text,
+        job_description=payload["job_description"],
+        serp_api_key=SERP_API_KEY,
+        openai_api_key=OPENAI_API_KEY,
+        fused=payload.get("fused", False),
+        on_stage_complete=lambda name, stage_result: report_stage(name, summarize_stage_result(name, stage_result)),
+    )
+    if result.error is not None:
+        raise JobFailed(result.error, result.details)
+
+    return {
+        "results": result.to_dict(),
+        "company_name": result.company_name,
+        "job_title": result.job_title,
+    }
+
+
+JOB_HANDLERS = {ANALYSIS_JOB: run_analysis_job}
+
+_job_queue = JobQueue()
+
+
+def configure_job_queue(max_workers=DEFAULT_MAX_WORKERS, max_queued=DEFAULT_MAX_QUEUED,
+                        result_ttl=DEFAULT_RESULT_TTL, path=None, lease_timeout=DEFAULT_LEASE_TIMEOUT,
+                        max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Replace the process-wide job queue, stopping the previous one's workers.
+
+    :param max_workers: Worker threads in this process (0 to only queue jobs for separate worker processes,
+        which requires a shared `path`).
+    :param max_queued: Jobs allowed to wait before submissions are rejected.
+    :param result_ttl: Seconds finished jobs are kept.
+    :param path: Optional SQLite database path so jobs are shared with other processes.
+    :param lease_timeout: Seconds a running job may go without a heartbeat before another worker reclaims it.
+    :param max_attempts: Times a job is started before it is failed (a job is restarted when its worker dies).
+    """
+    global _job_queue
+    if max_workers == 0 and not path:
+        # An in-memory store is invisible to other processes, so its jobs would stay queued forever
+        raise ValueError("JOB_WORKERS=0 requires JOB_STORE_PATH so separate worker processes can run the jobs.")
+    previous = _job_queue
+    store = SQLiteJobStore(path) if path else MemoryJobStore()
+    _job_queue = JobQueue(
+        store, max_workers=max_workers, max_queued=max_queued, result_ttl=result_ttl,
+        lease_timeout=lease_timeout, max_attempts=max_attempts,
+    )
+    previous.stop()
+
+
+def get_job_queue():
+    """
+    Return the process-wide job queue.
+    """
+    return _job_queue
+
+
+def _collect_metrics():
+    """
+    Report the number of queued jobs at scrape time.
+    """
+    return [MetricFamily("jobs_queued", "gauge", "Background jobs waiting for a worker.", [
+        ({}, _job_queue.store.count_queued()),
+    ])]
+
+
+get_metrics_registry().register_collector(_collect_metrics)
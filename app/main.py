@@ -1,23 +1,55 @@
 # app/main.py
 
+from functools import wraps
+
 from flask import Flask
 from config.config import get_config
 import os
 
 # Import the Blueprint
 from app.routes.routes import resume_tailor_bp
+from app.bootstrap import configure_services
+from app.metrics import instrument_app
+from app.nlp.clients import get_client_registry
+
+
+class ResumeTailorFlask(Flask):
+    """
+    Flask app whose async views release their event loop's pooled clients when they finish.
+
+    Under a WSGI server Flask runs each async view on a new event loop that ends with the request,
+    so the async clients created for that loop are closed before it ends. Under `app.asgi` async views
+    are awaited on the server's long-lived loop instead and never pass through here.
+    """
+
+    def async_to_sync(self, func):
+        @wraps(func)
+        async def run_and_close_clients(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                await get_client_registry().aclose_loop_clients()
+
+        return super().async_to_sync(run_and_close_clients)
 
 
 def create_app():
-    app = Flask(__name__)
+    app = ResumeTailorFlask(__name__)
 
     # Get environment configuration
     env = os.environ.get('FLASK_ENV', 'development')
     app.config.from_object(get_config(env))
 
+    # Configure shared clients and caches
+    configure_services(app.config)
+
     # Register Blueprints
     app.register_blueprint(resume_tailor_bp, url_prefix='/api')
 
+    # Request timing and the Prometheus /metrics endpoint
+    if app.config['METRICS_ENABLED']:
+        instrument_app(app)
+
     @app.route('/')
     def home():
         return "Welcome to your Flask application!"
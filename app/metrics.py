@@ -0,0 +1,294 @@
+import threading
+import time
+from collections import namedtuple
+from contextlib import ContextDecorator
+
+from flask import Response, g, request
+
+# Constants
+METRIC_PREFIX = "resume_tailor_"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# A metric reported by a collector at scrape time; samples is a list of (labels dict, value) pairs
+MetricFamily = namedtuple("MetricFamily", ["name", "type", "documentation", "samples"])
+
+
+class _Metric:
+    """
+    Base class for metrics whose values are kept per combination of label values.
+    """
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric '{self.name}' takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """
+        Return (sample name, labels dict, value) tuples for rendering.
+        """
+        with self._lock:
+            return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    """
+    A value that only goes up, e.g. calls made or tokens used.
+    """
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values (e.g. durations in seconds) over fixed buckets, with their sum and count.
+    """
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            bucket_counts, count, total = self._values.get(key, ([0] * len(self.buckets), 0, 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    bucket_counts[index] += 1
+            self._values[key] = (bucket_counts, count + 1, total + value)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (bucket_counts, count, total) in self._values.items():
+                labels = dict(zip(self.labelnames, key))
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, bucket_count))
+                samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, count))
+                samples.append((f"{self.name}_sum", labels, total))
+                samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class Timer(ContextDecorator):
+    """
+    Observes the wall-clock duration of a block or function call in a histogram.
+    Usable as `with timed(...)` or as a `@timed(...)` decorator, including around `await`.
+    """
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+        self.elapsed = None
+        self._start = None
+
+    def _recreate_cm(self):
+        # Each decorated call gets its own timer, so concurrent calls do not share a start time
+        return Timer(self.histogram, self.labels)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self._start
+        self.histogram.observe(self.elapsed, **self.labels)
+        return False
+
+
+def timed(histogram, **labels):
+    """
+    Time a block or function into `histogram` with the given label values.
+    """
+    return Timer(histogram, labels)
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of metrics, rendered in the Prometheus text exposition format.
+
+    Collectors registered with `register_collector` are called at scrape time and return MetricFamily
+    tuples, for values that already live elsewhere (cache counters, queue lengths).
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(METRIC_PREFIX + name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(METRIC_PREFIX + name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector):
+        """
+        Register a function returning MetricFamily tuples, called on every scrape.
+        Family names are prefixed like registered metrics; families with the same name are merged.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        """
+        Return every metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families = {}  # name -> (type, documentation, samples)
+        for metric in metrics:
+            families[metric.name] = (metric.type, metric.documentation, metric.samples())
+        for collector in collectors:
+            for family in collector():
+                name = METRIC_PREFIX + family.name
+                samples = [(name, labels, value) for labels, value in family.samples]
+                if name in families:
+                    families[name][2].extend(samples)
+                else:
+                    families[name] = (family.type, family.documentation, samples)
+
+        lines = []
+        for name, (metric_type, documentation, samples) in families.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+def _escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return f"{value:.1f}"
+    return str(value)
+
+
+_metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry():
+    """
+    Return the process-wide metrics registry.
+    """
+    return _metrics_registry
+
+
+# Metrics recorded across the app
+STAGE_DURATION = _metrics_registry.histogram(
+    "stage_duration_seconds", "Duration of analysis pipeline stages.", ("stage",)
+)
+LLM_CALL_DURATION = _metrics_registry.histogram(
+    "llm_call_duration_seconds", "Duration of LLM calls that reached the model.", ("prompt", "model")
+)
+LLM_TOKENS = _metrics_registry.counter(
+    "llm_tokens_total", "Tokens reported by the model, by prompt and direction.", ("prompt", "model", "direction")
+)
+LLM_COST = _metrics_registry.counter(
+    "llm_cost_usd_total", "Estimated LLM cost in US dollars from reported token usage.", ("prompt", "model")
+)
+LLM_RETRIES = _metrics_registry.counter(
+    "llm_retries_total", "LLM calls retried after a transient error, by prompt and error type.",
+    ("prompt", "model", "error"),
+)
+LLM_FALLBACKS = _metrics_registry.counter(
+    "llm_fallbacks_total", "Prompts re-run on the default model after a smaller model's output failed to parse.",
+    ("prompt", "model"),
+)
+LLM_THROTTLE_WAIT = _metrics_registry.histogram(
+    "llm_throttle_wait_seconds", "Time LLM calls waited for the client-side rate limit.", ("model",)
+)
+EXTERNAL_CALL_DURATION = _metrics_registry.histogram(
+    "external_call_duration_seconds", "Duration of calls to external APIs other than the LLM.", ("service",)
+)
+DOCUMENT_PARSE_DURATION = _metrics_registry.histogram(
+    "document_parse_duration_seconds", "Duration of resume parses that missed the document cache.", ("file_type",)
+)
+DOCUMENT_STEP_DURATION = _metrics_registry.histogram(
+    "document_step_duration_seconds",
+    "Duration of document extraction steps (PyPDF2 text layer per page, OCR per batch, DOCX).", ("step",)
+)
+OCR_PAGES = _metrics_registry.counter("ocr_pages_total", "PDF pages sent to OCR.")
+HTTP_REQUEST_DURATION = _metrics_registry.histogram(
+    "http_request_duration_seconds", "Duration of HTTP requests until the response is returned.",
+    ("endpoint", "method", "status"),
+)
+
+
+def cache_metric_families(caches):
+    """
+    Build hit/miss/size metric families from the `stats()` of named caches (TieredCache or RefreshingCache).
+
+    :param caches: A {cache name: cache or None} mapping; disabled (None) caches are skipped.
+    """
+    families = {
+        "cache_hits_total": ("counter", "Cache lookups that found an entry.", "hits"),
+        "cache_disk_hits_total": ("counter", "Cache hits served by the shared disk tier.", "disk_hits"),
+        "cache_misses_total": ("counter", "Cache lookups that found no entry.", "misses"),
+        "cache_entries": ("gauge", "Entries in the in-memory cache tier.", "memory_entries"),
+        "cache_stale_hits_total": ("counter", "Stale entries served while being refreshed.", "stale_hits"),
+    }
+    stats = {name: cache.stats() for name, cache in caches.items() if cache is not None}
+    return [
+        MetricFamily(family, metric_type, documentation, [
+            ({"cache": name}, cache_stats[key]) for name, cache_stats in stats.items() if key in cache_stats
+        ])
+        for family, (metric_type, documentation, key) in families.items()
+    ]
+
+
+def instrument_app(app):
+    """
+    Time every request of a Flask app and serve the metrics at `/metrics`.
+    """
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        start = g.pop("request_start", None)
+        if start is not None:
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                endpoint=request.url_rule.rule if request.url_rule is not None else "unmatched",
+                method=request.method,
+                status=response.status_code,
+            )
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(get_metrics_registry().render(), content_type=PROMETHEUS_CONTENT_TYPE)
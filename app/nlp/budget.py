@@ -0,0 +1,310 @@
+import logging
+import math
+import re
+import threading
+from collections import namedtuple
+
+from .chains import chain_registry
+from .heuristics import JOB_DESCRIPTION_SECTIONS, RESUME_SECTIONS, match_section_header
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_ENCODING_MODEL = "gpt-4o"
+CHARS_PER_TOKEN = 4  # fallback estimate when no tiktoken encoding is available
+COMPRESSED_SECTION_LINES = 3  # lines kept (after the header) when a low-value section is compressed
+
+# Input token budgets per prompt and input variable. Validation and extraction only need enough
+# of each document to judge it, so they get less than the analysis prompts.
+DEFAULT_PROMPT_BUDGETS = {
+    "validate_resume": {"resume_text": 2000},
+    "validate_job_description": {"job_description": 1500},
+    "extract_company_and_job_title": {"job_description": 1000},
+    "compatibility": {"resume_text": 3000, "job_description": 2000},
+    "suggestions": {"resume_text": 3000, "job_description": 2000},
+    "bullet_points": {"job_description": 2000},
+    "fused_validation_and_extraction": {"resume_text": 2000, "job_description": 1500},
+    "fused_analysis": {"resume_text": 3000, "job_description": 2000},
+}
+
+# Sections that carry little signal for matching, dropped before anything else
+RESUME_BOILERPLATE_SECTIONS = {
+    "boilerplate": r"references|hobbies|interests|personal (details|information)|declaration|volunteering",
+}
+JOB_DESCRIPTION_BOILERPLATE_SECTIONS = {
+    "boilerplate": r"equal (employment )?opportunity|eeo( statement)?|diversity( and|&) inclusion|"
+                   r"how to apply|disclaimer|legal notice|privacy notice",
+}
+
+# Section priorities: 0 is dropped first, 1 is compressed and then dropped, higher is kept longest.
+# Sections not listed get priority 1.
+# "header" is the text before the first recognized section (name and contact, or company and title).
+RESUME_PRIORITIES = {
+    "header": 2, "summary": 2, "experience": 4, "skills": 4, "projects": 2,
+    "education": 1, "certifications": 1, "boilerplate": 0,
+}
+JOB_DESCRIPTION_PRIORITIES = {
+    "header": 3, "responsibilities": 4, "requirements": 4, "about": 1,
+    "benefits": 0, "boilerplate": 0,
+}
+
+# Section patterns and priorities for each budgeted input variable
+DOCUMENT_KINDS = {
+    "resume_text": ({**RESUME_BOILERPLATE_SECTIONS, **RESUME_SECTIONS}, RESUME_PRIORITIES),
+    "job_description": ({**JOB_DESCRIPTION_BOILERPLATE_SECTIONS, **JOB_DESCRIPTION_SECTIONS}, JOB_DESCRIPTION_PRIORITIES),
+}
+
+Section = namedtuple("Section", ["name", "lines"])
+FittedText = namedtuple("FittedText", ["text", "original_tokens", "tokens"])
+
+
+class TokenCounter:
+    """
+    Counts tokens with the model's tiktoken encoding, falling back to a characters-per-token
+    estimate when tiktoken or its encoding files are unavailable (e.g. offline hosts).
+    """
+
+    def __init__(self, model=DEFAULT_ENCODING_MODEL):
+        self.model = model
+        self._encoding = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def encoding(self):
+        """
+        The tiktoken encoding for the model, or None if it cannot be loaded. Loaded once, on first use.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                try:
+                    import tiktoken
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except Exception as e:
+                    logger.warning("Tokenizer unavailable, estimating token counts instead: %s", e)
+            return self._encoding
+
+    def count(self, text):
+        """
+        Return the number of tokens in the text.
+        """
+        if not text:
+            return 0
+        encoding = self.encoding
+        if encoding is None:
+            return math.ceil(len(text) / CHARS_PER_TOKEN)
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text, max_tokens):
+        """
+        Return the longest prefix of the text that fits in `max_tokens` tokens.
+        """
+        encoding = self.encoding
+        if encoding is None:
+            return text[:max_tokens * CHARS_PER_TOKEN]
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+
+class TokenBudgeter:
+    """
+    Fits resumes and job descriptions into per-prompt token budgets.
+
+    Text over budget is segmented into sections and reduced in order of increasing value:
+    whitespace is collapsed, boilerplate sections are dropped, low-value sections are compressed
+    and then dropped, and finally the lowest-priority remaining sections are truncated.
+    Text within budget is returned unchanged.
+    """
+
+    def __init__(self, budgets=None, counter=None):
+        self.budgets = {**DEFAULT_PROMPT_BUDGETS, **(budgets or {})}
+        self.counter = counter if counter is not None else TokenCounter()
+
+    def get_budget(self, prompt_name, variable):
+        """
+        Return the token budget for an input variable of a prompt, or None if it is not budgeted.
+        """
+        return self.budgets.get(prompt_name, {}).get(variable)
+
+    def fit(self, text, variable, max_tokens):
+        """
+        Reduce the text to at most `max_tokens` tokens.
+
+        :param text: A resume or job description.
+        :param variable: The prompt input variable, which selects the section layout ("resume_text" or "job_description").
+        :param max_tokens: The token budget.
+        :return: A FittedText with the reduced text and its token counts before and after.
+        """
+        original_tokens = self.counter.count(text)
+        if original_tokens <= max_tokens:
+            return FittedText(text, original_tokens, original_tokens)
+
+        section_patterns, priorities = DOCUMENT_KINDS[variable]
+
+        # Step 1: Collapse runs of spaces and blank lines
+        text = re.sub(r"[ \t]+", " ", text)
+        text = re.sub(r"\n\s*\n+", "\n\n", text).strip()
+        sections = self.segment(text, section_patterns)
+
+        def total_tokens():
+            return self.counter.count(self._join(sections))
+
+        def ranked(max_priority):
+            # Lowest priority first; among equals, later sections go first
+            candidates = [s for s in sections if priorities.get(s.name, 1) <= max_priority]
+            return sorted(candidates, key=lambda s: (priorities.get(s.name, 1), -sections.index(s)))
+
+        # Step 2: Drop boilerplate, then compress low-value sections, then drop them
+        for section in ranked(0):
+            if total_tokens() <= max_tokens:
+                break
+            sections.remove(section)
+
+        for section in ranked(1):
+            if total_tokens() <= max_tokens:
+                break
+            index = sections.index(section)
+            sections[index] = Section(section.name, section.lines[:COMPRESSED_SECTION_LINES + 1])
+
+        for section in ranked(1):
+            if total_tokens() <= max_tokens or len(sections) == 1:
+                break
+            sections.remove(section)
+
+        # Step 3: Share the budget out by priority, highest first; sections that do not fit are truncated
+        if total_tokens() > max_tokens:
+            remaining = max_tokens
+            allowances = {}
+            for priority in sorted({priorities.get(s.name, 1) for s in sections}, reverse=True):
+                sizes = {
+                    index: self.counter.count("\n".join(section.lines))
+                    for index, section in enumerate(sections) if priorities.get(section.name, 1) == priority
+                }
+                allowances.update(_share_budget(sizes, remaining))
+                remaining -= sum(allowances[index] for index in sizes)
+
+            sections = [
+                Section(section.name, self.counter.truncate("\n".join(section.lines), allowances[index]).splitlines())
+                for index, section in enumerate(sections) if allowances[index] > 0
+            ]
+
+        fitted = self._join(sections)
+        if self.counter.count(fitted) > max_tokens:
+            # Joining can add a token or two at section boundaries
+            fitted = self.counter.truncate(fitted, max_tokens)
+        return FittedText(fitted, original_tokens, self.counter.count(fitted))
+
+    @staticmethod
+    def segment(text, section_patterns):
+        """
+        Split the text into sections at recognized header lines. Text before the first header
+        is the "header" section; sections whose header is not recognized belong to the previous one.
+
+        :return: A list of Section tuples in document order.
+        """
+        sections = [Section("header", [])]
+        for line in text.splitlines():
+            name = match_section_header(line, section_patterns)
+            if name is not None:
+                sections.append(Section(name, [line]))
+            else:
+                sections[-1].lines.append(line)
+        return [section for section in sections if any(line.strip() for line in section.lines)]
+
+    @staticmethod
+    def _join(sections):
+        return "\n".join("\n".join(section.lines) for section in sections)
+
+
+def _share_budget(sizes, budget):
+    """
+    Split a token budget between sections so that sections smaller than an equal share keep all
+    their tokens and the larger ones split the rest evenly.
+
+    :param sizes: A {key: token count} mapping.
+    :return: A {key: allowed tokens} mapping whose values sum to at most `budget`.
+    """
+    allowances = {}
+    pending = sorted(sizes, key=sizes.get)
+    while pending:
+        share = max(budget, 0) // len(pending)
+        if sizes[pending[0]] > share:
+            allowances.update((key, share) for key in pending)
+            break
+        key = pending.pop(0)
+        allowances[key] = sizes[key]
+        budget -= sizes[key]
+    return allowances
+
+
+class BudgetedInputs:
+    """
+    The resume and job description of one analysis, fitted to each prompt's token budget.
+
+    Fitted texts are computed once per (variable, budget) and shared by every prompt with the
+    same budget. Tracks the input tokens saved across all prompts of the analysis.
+    """
+
+    def __init__(self, budgeter, resume_text, job_description):
+        self.budgeter = budgeter
+        self.texts = {"resume_text": resume_text, "job_description": job_description}
+        self.tokens_saved = 0
+        self._fitted = {variable: {} for variable in self.texts}  # variable -> {budget: FittedText}
+        self._lock = threading.Lock()
+
+    def for_job_description(self, job_description):
+        """
+        Return the inputs of the same resume with another job description. The resume's fitted texts
+        are shared with this instance, so a batch fits the resume once per budget rather than once per job.
+        """
+        inputs = BudgetedInputs(self.budgeter, self.texts["resume_text"], job_description)
+        inputs._fitted["resume_text"] = self._fitted["resume_text"]
+        inputs._lock = self._lock
+        return inputs
+
+    def fit(self, prompt_name, variable):
+        """
+        Return the text of one input variable fitted to the prompt's budget.
+        """
+        text = self.texts[variable]
+        max_tokens = self.budgeter.get_budget(prompt_name, variable) if self.budgeter is not None else None
+        if max_tokens is None:
+            return text
+
+        # Fitting is CPU-bound, so doing it under the lock costs no parallelism and fits each text only once
+        with self._lock:
+            fitted = self._fitted[variable].get(max_tokens)
+            if fitted is None:
+                fitted = self._fitted[variable][max_tokens] = self.budgeter.fit(text, variable, max_tokens)
+            self.tokens_saved += fitted.original_tokens - fitted.tokens
+        return fitted.text
+
+    def inputs(self, prompt_name):
+        """
+        Return the fitted resume and/or job description a registered prompt takes, as keyword arguments.
+        """
+        variables = chain_registry.get_prompt(prompt_name).input_variables
+        return {variable: self.fit(prompt_name, variable) for variable in variables if variable in self.texts}
+
+
+_token_budgeter = TokenBudgeter()
+
+
+def configure_token_budgets(enabled=True, budgets=None, model=DEFAULT_ENCODING_MODEL):
+    """
+    Replace the process-wide token budgeter.
+
+    :param enabled: When False, prompts receive the full resume and job description.
+    :param budgets: Per-prompt overrides, e.g. {"compatibility": {"resume_text": 4000}}.
+    :param model: Model whose tiktoken encoding is used to count tokens.
+    """
+    global _token_budgeter
+    _token_budgeter = TokenBudgeter(budgets, TokenCounter(model)) if enabled else None
+
+
+def get_token_budgeter():
+    """
+    Return the process-wide token budgeter, or None if budgeting is disabled.
+    """
+    return _token_budgeter
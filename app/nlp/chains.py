@@ -0,0 +1,102 @@
+import threading
+
+from langchain.prompts import PromptTemplate
+
+from .prompt_templates import (
+    COMPATIBILITY_TEMPLATE,
+    SUGGESTIONS_TEMPLATE,
+    BULLET_POINTS_TEMPLATE,
+    VALIDATE_AND_EVALUATE_RESUME,
+    VALIDATE_AND_EVALUATE_JOB_DESCRIPTION,
+    SEARCH_INTERVIEW_INFO_TEMPLATE, EXTRACT_COMPANY_AND_OCCUPATION_TEMPLATE,
+    FUSED_VALIDATION_AND_EXTRACTION_TEMPLATE, FUSED_ANALYSIS_TEMPLATE,
+)
+
+# Every prompt used by the analysis pipeline, with the input variables it must declare
+PROMPTS = {
+    "validate_resume": (VALIDATE_AND_EVALUATE_RESUME, ["resume_text"]),
+    "validate_job_description": (VALIDATE_AND_EVALUATE_JOB_DESCRIPTION, ["job_description"]),
+    "compatibility": (COMPATIBILITY_TEMPLATE, ["resume_text", "job_description"]),
+    "suggestions": (SUGGESTIONS_TEMPLATE, ["resume_text", "job_description"]),
+    "bullet_points": (BULLET_POINTS_TEMPLATE, ["job_description"]),
+    "interview_insights": (SEARCH_INTERVIEW_INFO_TEMPLATE, ["company_name", "job_title", "search_results"]),
+    "extract_company_and_job_title": (EXTRACT_COMPANY_AND_OCCUPATION_TEMPLATE, ["job_description"]),
+}
+
+# Prompts for the fused mode, whose responses are requested as JSON objects
+JSON_PROMPTS = {
+    "fused_validation_and_extraction": (FUSED_VALIDATION_AND_EXTRACTION_TEMPLATE, ["resume_text", "job_description"]),
+    "fused_analysis": (FUSED_ANALYSIS_TEMPLATE, ["resume_text", "job_description"]),
+}
+
+
+class ChainRegistry:
+    """
+    Compiles each prompt template once and hands out reusable prompt | client chains.
+    """
+
+    def __init__(self, prompts, json_prompts=None):
+        self._prompts = {}
+        self._json_output = set()
+        self._names_by_template = {}
+        for name, (template, input_variables) in prompts.items():
+            self.register(name, template, input_variables)
+        for name, (template, input_variables) in (json_prompts or {}).items():
+            self.register(name, template, input_variables, json_output=True)
+
+        self._chains = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, template, input_variables, json_output=False):
+        """
+        Compile a template, checking that its placeholders match the declared input variables.
+        With `json_output`, chains for this prompt ask the model for a JSON object.
+        """
+        prompt = PromptTemplate.from_template(template)
+        if sorted(prompt.input_variables) != sorted(input_variables):
+            raise ValueError(
+                f"Prompt '{name}' declares input variables {sorted(input_variables)} "
+                f"but its template uses {sorted(prompt.input_variables)}."
+            )
+        self._prompts[name] = prompt
+        self._names_by_template[template] = name
+        if json_output:
+            self._json_output.add(name)
+
+    def get_prompt(self, name):
+        """
+        Return the compiled PromptTemplate registered under `name`.
+        """
+        try:
+            return self._prompts[name]
+        except KeyError:
+            raise ValueError(f"Unknown prompt: {name}")
+
+    def find_name(self, template):
+        """
+        Return the name a template string is registered under, or None.
+        """
+        return self._names_by_template.get(template)
+
+    def get_chain(self, name, client):
+        """
+        Return the compiled chain for a prompt and client, building it on first use.
+        """
+        key = (name, id(client))
+        with self._lock:
+            entry = self._chains.get(key)
+            # Keep the client in the entry so its id cannot be reused while cached
+            if entry is None or entry[0] is not client:
+                entry = (client, self.build_chain(name, client))
+                self._chains[key] = entry
+            return entry[1]
+
+    def build_chain(self, name, client):
+        """
+        Build an uncached chain for a prompt and client, for short-lived clients that should not be kept alive.
+        """
+        model = client.bind(response_format={"type": "json_object"}) if name in self._json_output else client
+        return self.get_prompt(name) | model
+
+
+chain_registry = ChainRegistry(PROMPTS, JSON_PROMPTS)
@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from langchain_openai import ChatOpenAI
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Constants
+DEFAULT_POOL_SIZE = 10
+DEFAULT_ASYNC_POOL_SIZE = 100  # connections per event loop; one loop can hold many concurrent analyses
+DEFAULT_TIMEOUT = 60  # seconds
+DEFAULT_LLM_TIMEOUT = 60  # seconds per LLM call attempt; retries are handled by LLMHelper
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of LLM clients and pooled HTTP connections.
+
+    LLM clients are created once per (API key, model, temperature) and share one keep-alive
+    connection pool; outbound HTTP calls (e.g. SERP API) share a retrying requests session.
+    Async connection pools are bound to the event loop that created them, so async clients
+    are kept per event loop. `llm_factory` builds chat clients from ChatOpenAI's keyword arguments
+    (e.g. a local stand-in model for offline benchmarks).
+
+    Chat clients do not retry on their own: LLMHelper retries failed calls with backoff that honors
+    Retry-After and the client-side rate limits (see `app.nlp.throttle`).
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, async_pool_size=DEFAULT_ASYNC_POOL_SIZE, llm_factory=ChatOpenAI,
+                 llm_timeout=DEFAULT_LLM_TIMEOUT):
+        self.llm_factory = llm_factory
+        self.pool_size = pool_size
+        self.async_pool_size = async_pool_size
+        self.timeout = timeout
+        self.llm_timeout = llm_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        self._llm_clients = {}
+        self._openai_http_client = None
+        self._http_session = None
+        self._async_clients = weakref.WeakKeyDictionary()  # event loop -> {"http": ..., "llm": {...}}
+        self._lock = threading.Lock()
+
+    def get_llm_client(self, api_key, model, temperature):
+        """
+        Return the shared chat client for the given API key, model and temperature.
+        """
+        key = (api_key, model, temperature)
+        with self._lock:
+            client = self._llm_clients.get(key)
+            if client is None:
+                client = self.llm_factory(
+                    openai_api_key=api_key,
+                    model_name=model,
+                    temperature=temperature,
+                    request_timeout=self.llm_timeout,
+                    max_retries=0,
+                    stream_usage=True,
+                    http_client=self._get_openai_http_client(),
+                )
+                self._llm_clients[key] = client
+            return client
+
+    def get_async_llm_client(self, api_key, model, temperature):
+        """
+        Return the chat client for the running event loop, whose async calls share that loop's connection pool.
+        """
+        key = (api_key, model, temperature)
+        with self._lock:
+            clients = self._get_loop_clients()
+            client = clients["llm"].get(key)
+            if client is None:
+                client = self.llm_factory(
+                    openai_api_key=api_key,
+                    model_name=model,
+                    temperature=temperature,
+                    request_timeout=self.llm_timeout,
+                    max_retries=0,
+                    stream_usage=True,
+                    http_client=self._get_openai_http_client(),
+                    http_async_client=clients["http"],
+                )
+                clients["llm"][key] = client
+            return client
+
+    def get_async_http_client(self):
+        """
+        Return the pooled httpx.AsyncClient for the running event loop.
+        """
+        with self._lock:
+            return self._get_loop_clients()["http"]
+
+    def _get_loop_clients(self):
+        """
+        Return the async clients of the running event loop, creating them on first use. Caller must hold the lock.
+        """
+        loop = asyncio.get_running_loop()
+        clients = self._async_clients.get(loop)
+        if clients is None:
+            limits = httpx.Limits(
+                max_connections=self.async_pool_size, max_keepalive_connections=self.async_pool_size
+            )
+            transport = httpx.AsyncHTTPTransport(limits=limits, retries=self.max_retries)
+            clients = {"http": httpx.AsyncClient(transport=transport, timeout=self.timeout), "llm": {}}
+            self._async_clients[loop] = clients
+        return clients
+
+    async def aclose_loop_clients(self):
+        """
+        Close and forget the async clients of the running event loop. Loops that end with the request
+        (async views under a WSGI server) call this before closing, so their connections are not leaked.
+        """
+        with self._lock:
+            clients = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if clients is not None:
+            # The loop's chat clients send through this client, so closing it closes their connections too
+            await clients["http"].aclose()
+
+    def get_http_session(self):
+        """
+        Return the shared requests session with pooled connections and retry with backoff.
+        """
+        with self._lock:
+            if self._http_session is None:
+                retry = Retry(
+                    total=self.max_retries,
+                    backoff_factor=self.backoff_factor,
+                    status_forcelist=RETRY_STATUS_CODES,
+                    allowed_methods=frozenset(["GET"]),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._http_session = session
+            return self._http_session
+
+    def _get_openai_http_client(self):
+        """
+        Return the keep-alive connection pool shared by every OpenAI client. Caller must hold the lock.
+        """
+        if self._openai_http_client is None:
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            self._openai_http_client = httpx.Client(limits=limits, timeout=self.timeout)
+        return self._openai_http_client
+
+    def close(self):
+        """
+        Close pooled connections and forget cached clients.
+        """
+        with self._lock:
+            if self._http_session is not None:
+                self._http_session.close()
+                self._http_session = None
+            if self._openai_http_client is not None:
+                self._openai_http_client.close()
+                self._openai_http_client = None
+            self._llm_clients.clear()
+            self._async_clients.clear()
+
+
+_registry = ClientRegistry()
+
+
+def configure_clients(pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                      backoff_factor=DEFAULT_BACKOFF_FACTOR, async_pool_size=DEFAULT_ASYNC_POOL_SIZE,
+                      llm_factory=ChatOpenAI, llm_timeout=DEFAULT_LLM_TIMEOUT):
+    """
+    Replace the process-wide client registry, closing the connections held by the previous one.
+    """
+    global _registry
+    previous = _registry
+    _registry = ClientRegistry(
+        pool_size=pool_size, timeout=timeout, max_retries=max_retries, backoff_factor=backoff_factor,
+        async_pool_size=async_pool_size, llm_factory=llm_factory, llm_timeout=llm_timeout,
+    )
+    previous.close()
+
+
+def get_client_registry():
+    """
+    Return the process-wide client registry.
+    """
+    return _registry
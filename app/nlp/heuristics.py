@@ -0,0 +1,202 @@
+import re
+from collections import namedtuple
+
+# Constants
+DEFAULT_MIN_TOKENS = 30
+DEFAULT_REJECT_THRESHOLD = 0.9
+DEFAULT_ACCEPT_THRESHOLD = 0.95
+MIN_ALPHA_RATIO = 0.5  # share of non-space characters that are letters
+MIN_WORD_RATIO = 0.6  # share of tokens that look like real words
+MAX_HEADER_LENGTH = 40
+
+# Section headers, matched against whole lines
+RESUME_SECTIONS = {
+    "experience": r"(work |professional |relevant )?experience|employment( history)?|work history",
+    "education": r"education|academic background|qualifications",
+    "skills": r"(technical |core |key )?skills|competencies|technologies|tools",
+    "summary": r"(professional )?summary|profile|objective|about me",
+    "projects": r"projects|portfolio",
+    "certifications": r"certifications?|licenses?|awards|honou?rs",
+}
+JOB_DESCRIPTION_SECTIONS = {
+    "responsibilities": r"responsibilities|what you('ll| will) do|the role|duties|your impact",
+    "requirements": r"requirements|qualifications|what you('ll)? (need|bring)|who you are|must have|skills",
+    "about": r"about (us|the (company|team|role))|who we are|our (mission|team)",
+    "benefits": r"benefits|perks|what we offer|compensation|salary",
+}
+
+# Phrases typical of each document type, matched anywhere in the text
+RESUME_KEYWORDS = r"\b(managed|developed|led|designed|implemented|achieved|bachelor|master|university|gpa|intern)\b"
+JOB_DESCRIPTION_KEYWORDS = (
+    r"\b(we are looking|you will|we offer|join our|the ideal candidate|apply|equal opportunity|"
+    r"years of experience|responsible for|preferred|required)\b"
+)
+# Role titles and experience requirements, which even a one-line posting usually mentions
+JOB_TITLE_KEYWORDS = (
+    r"\b(engineer|developer|manager|analyst|designer|scientist|architect|consultant|specialist|associate|"
+    r"director|administrator|coordinator|assistant|intern|\d+\+? ?(years?|yrs))s?\b"
+)
+CONTACT_PATTERN = r"[\w.+-]+@[\w-]+\.[\w.]+|\+?\d[\d ().-]{7,}\d"
+TOKEN_PATTERN = r"[A-Za-z][A-Za-z'+#.-]*"
+
+HeuristicVerdict = namedtuple("HeuristicVerdict", ["status", "confidence", "reason"])
+
+
+class HeuristicValidator:
+    """
+    Cheap, deterministic checks that run before the LLM validation chains.
+
+    Each assessment returns a HeuristicVerdict whose status is "invalid", "valid" or "uncertain".
+    Verdicts at or above the reject threshold short-circuit validation with an error; when
+    `skip_llm_for_valid` is set, verdicts at or above the accept threshold skip the LLM as well.
+    """
+
+    def __init__(self, min_tokens=DEFAULT_MIN_TOKENS, reject_threshold=DEFAULT_REJECT_THRESHOLD,
+                 accept_threshold=DEFAULT_ACCEPT_THRESHOLD, skip_llm_for_valid=False):
+        self.min_tokens = min_tokens
+        self.reject_threshold = reject_threshold
+        self.accept_threshold = accept_threshold
+        self.skip_llm_for_valid = skip_llm_for_valid
+
+    def assess_resume(self, text):
+        """
+        Assess whether the text looks like a resume.
+        """
+        verdict = self._assess_noise(text)
+        if verdict is not None:
+            return verdict
+
+        tokens = re.findall(TOKEN_PATTERN, text)
+        sections = self._find_sections(text, RESUME_SECTIONS)
+        job_sections = self._find_sections(text, JOB_DESCRIPTION_SECTIONS)
+        job_keyword_hits = len(re.findall(JOB_DESCRIPTION_KEYWORDS, text, re.IGNORECASE))
+        has_contact = re.search(CONTACT_PATTERN, text) is not None
+        has_keywords = re.search(RESUME_KEYWORDS, text, re.IGNORECASE) is not None
+
+        if len(tokens) < self.min_tokens:
+            # Short text alone is inconclusive; only reject it when nothing else looks like a resume
+            if not sections and not has_contact and not has_keywords:
+                return HeuristicVerdict(
+                    "invalid", 0.95, f"The text is too short ({len(tokens)} words) and has no resume content."
+                )
+            return HeuristicVerdict("uncertain", 0.3, f"The text is short ({len(tokens)} words).")
+
+        if len(sections) <= 1 and len(job_sections) >= 2 and job_keyword_hits >= 3:
+            return HeuristicVerdict("invalid", 0.9, "The text looks like a job description rather than a resume.")
+
+        if "experience" in sections and len(sections) >= 3 and len(tokens) >= 150:
+            confidence = 0.8 + 0.05 * min(len(sections) - 3, 2) + (0.05 if has_contact else 0)
+            return HeuristicVerdict(
+                "valid", round(confidence, 2), f"Found sections: {', '.join(sorted(sections))}."
+            )
+
+        if not sections and not has_contact and not has_keywords:
+            return HeuristicVerdict("invalid", 0.85, "No resume sections, contact details or experience found.")
+
+        return HeuristicVerdict("uncertain", 0.5, "Inconclusive resume structure.")
+
+    def assess_job_description(self, text):
+        """
+        Assess whether the text looks like a job description.
+        """
+        verdict = self._assess_noise(text)
+        if verdict is not None:
+            return verdict
+
+        tokens = re.findall(TOKEN_PATTERN, text)
+        sections = self._find_sections(text, JOB_DESCRIPTION_SECTIONS)
+        keyword_hits = len(re.findall(JOB_DESCRIPTION_KEYWORDS, text, re.IGNORECASE))
+
+        if len(tokens) < self.min_tokens:
+            # Short postings are common; only reject when nothing names a role or job details
+            if not sections and keyword_hits == 0 and not re.search(JOB_TITLE_KEYWORDS, text, re.IGNORECASE):
+                return HeuristicVerdict(
+                    "invalid", 0.95, f"The text is too short ({len(tokens)} words) and has no job details."
+                )
+            return HeuristicVerdict("uncertain", 0.3, f"The text is short ({len(tokens)} words).")
+
+        if "responsibilities" in sections and "requirements" in sections and len(tokens) >= 80:
+            confidence = 0.85 + 0.05 * min(len(sections) - 2, 2) + (0.05 if keyword_hits >= 3 else 0)
+            return HeuristicVerdict(
+                "valid", round(min(confidence, 0.99), 2), f"Found sections: {', '.join(sorted(sections))}."
+            )
+
+        if not sections and keyword_hits == 0:
+            return HeuristicVerdict("invalid", 0.85, "No responsibilities, requirements or role details found.")
+
+        return HeuristicVerdict("uncertain", 0.5, "Inconclusive job description structure.")
+
+    def decide(self, verdict):
+        """
+        Map a verdict to "reject", "accept" or None (defer to the LLM) using the configured thresholds.
+        """
+        if verdict.status == "invalid" and verdict.confidence >= self.reject_threshold:
+            return "reject"
+        if self.skip_llm_for_valid and verdict.status == "valid" and verdict.confidence >= self.accept_threshold:
+            return "accept"
+        return None
+
+    def _assess_noise(self, text):
+        """
+        Reject empty, garbage or OCR-noise input. Returns None if the text passes.
+        """
+        characters = re.sub(r"\s", "", text or "")
+        if not characters:
+            return HeuristicVerdict("invalid", 1.0, "The text is empty.")
+
+        alpha_ratio = sum(character.isalpha() for character in characters) / len(characters)
+        if alpha_ratio < MIN_ALPHA_RATIO:
+            return HeuristicVerdict("invalid", 0.95, "The text is mostly symbols or digits, not readable prose.")
+
+        tokens = re.findall(TOKEN_PATTERN, text)
+        words = [token for token in tokens if len(token) > 1 and re.search(r"[aeiouyAEIOUY]", token)]
+        if len(words) / len(tokens) < MIN_WORD_RATIO:
+            return HeuristicVerdict("invalid", 0.9, "The text looks like OCR noise rather than readable words.")
+
+        return None
+
+    @staticmethod
+    def _find_sections(text, section_patterns):
+        """
+        Return the names of sections whose header appears on a line of its own.
+        """
+        found = set()
+        for line in text.splitlines():
+            name = match_section_header(line, section_patterns)
+            if name is not None:
+                found.add(name)
+        return found
+
+
+def match_section_header(line, section_patterns):
+    """
+    Return the name of the section whose header pattern matches the whole line, or None.
+    """
+    header = line.strip().strip(":#*-|").strip().lower()
+    if not header or len(header) > MAX_HEADER_LENGTH:
+        return None
+    for name, pattern in section_patterns.items():
+        if re.fullmatch(pattern, header):
+            return name
+    return None
+
+
+_heuristic_validator = HeuristicValidator()
+
+
+def configure_heuristic_validator(enabled=True, **options):
+    """
+    Replace the process-wide heuristic validator used by ValidationService.
+
+    :param enabled: When False, every input goes straight to the LLM validation chains.
+    :param options: HeuristicValidator keyword arguments (thresholds, `skip_llm_for_valid`, ...).
+    """
+    global _heuristic_validator
+    _heuristic_validator = HeuristicValidator(**options) if enabled else None
+
+
+def get_heuristic_validator():
+    """
+    Return the process-wide heuristic validator, or None if pre-LLM validation is disabled.
+    """
+    return _heuristic_validator
@@ -0,0 +1,211 @@
+import math
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+from scipy import sparse
+
+# Constants
+N_FEATURES = 2 ** 18  # hashed term space
+SKILL_WEIGHT = 3.0  # skills count more than ordinary words
+MAX_PHRASE_LENGTH = 3
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+COMPOUND_SEPARATORS = re.compile(r"[/-]")
+
+SKILL_TERMS = frozenset([
+    # Programming languages
+    "python", "java", "javascript", "typescript", "c++", "c#", "golang", "rust", "ruby", "php",
+    "scala", "kotlin", "swift", "matlab", "sql", "bash", "perl", "haskell", "elixir", "dart",
+    # Web and mobile
+    "react", "angular", "vue", "node.js", "django", "flask", "fastapi", "spring", "spring boot", "rails",
+    "html", "css", "graphql", "rest api", "ios", "android", "react native", "flutter",
+    # Data and machine learning
+    "machine learning", "deep learning", "data science", "data analysis", "data engineering", "nlp",
+    "natural language processing", "computer vision", "pandas", "numpy", "scikit-learn", "tensorflow",
+    "pytorch", "keras", "spark", "hadoop", "kafka", "airflow", "dbt", "etl", "tableau", "power bi",
+    "statistics", "a/b testing", "llm", "generative ai", "big data", "data visualization",
+    # Databases
+    "postgresql", "postgres", "mysql", "mongodb", "redis", "elasticsearch", "cassandra", "dynamodb",
+    "snowflake", "bigquery", "oracle", "sqlite",
+    # Cloud and infrastructure
+    "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "terraform", "ansible", "jenkins",
+    "ci/cd", "devops", "linux", "microservices", "serverless", "git", "github actions", "observability",
+    "prometheus", "grafana", "networking", "security", "distributed systems", "system design",
+    # Business and general
+    "project management", "product management", "agile", "scrum", "kanban", "jira", "leadership",
+    "stakeholder management", "communication", "excel", "salesforce", "sap", "crm", "seo", "marketing",
+    "sales", "budgeting", "forecasting", "financial modeling", "accounting", "customer service",
+    "negotiation", "recruiting", "ux", "ui", "figma", "user research", "copywriting", "operations",
+])
+
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her
+here hers herself him himself his how i if in into is it its itself just me more most my myself no nor not
+now of off on once only or other our ours ourselves out over own same she should so some such than that the
+their theirs them themselves then there these they this those through to too under until up very was we
+were what when where which while who whom why will with would you your yours yourself yourselves
+also etc including within across per via using use used work working role team teams company job
+""".split())
+
+
+@lru_cache(maxsize=200_000)
+def _term_index(term):
+    """
+    Map a term to a stable column in the hashed term space.
+    """
+    return zlib.crc32(term.encode("utf-8")) % N_FEATURES
+
+
+class KeywordScorer:
+    """
+    Fast, LLM-free keyword compatibility scoring between resumes and job descriptions.
+
+    Texts are turned into hashed, sublinear term-frequency vectors in which recognized skills are
+    up-weighted; scores are cosine similarities in [0, 1]. Scoring many documents at once can also
+    apply IDF weighting fitted over the whole batch.
+    """
+
+    def __init__(self, skills=SKILL_TERMS, stop_words=STOP_WORDS):
+        self.skills = frozenset(skills)
+        self.stop_words = frozenset(stop_words)
+        # First words of multi-word skills, so phrases are only built where one can start
+        self._phrase_starts = frozenset(skill.split()[0] for skill in self.skills if " " in skill)
+
+    def tokenize(self, text):
+        """
+        Lowercase the text and split it into word tokens, keeping symbols used in skill names (c++, c#, node.js).
+
+        Tokens joined by "/" or "-" stay whole when they name a skill or start a skill phrase
+        (ci/cd, scikit-learn, a/b testing); others are split into their parts (python/django).
+        """
+        tokens = []
+        for token in TOKEN_PATTERN.findall((text or "").lower()):
+            token = token.rstrip(".")
+            if COMPOUND_SEPARATORS.search(token) and token not in self.skills and token not in self._phrase_starts:
+                tokens.extend(part.rstrip(".") for part in COMPOUND_SEPARATORS.split(token) if part)
+            else:
+                tokens.append(token)
+        return tokens
+
+    def extract_terms(self, text):
+        """
+        Return the non-stop-word tokens plus every multi-word skill phrase found in the text.
+        """
+        tokens = self.tokenize(text)
+        terms = [token for token in tokens if token not in self.stop_words]
+        for start, token in enumerate(tokens):
+            if token not in self._phrase_starts:
+                continue
+            for length in range(2, MAX_PHRASE_LENGTH + 1):
+                phrase = " ".join(tokens[start:start + length])
+                if phrase in self.skills:
+                    terms.append(phrase)
+        return terms
+
+    def term_weights(self, text):
+        """
+        Return a {column: weight} mapping of sublinear term frequencies, with skills up-weighted.
+        """
+        weights = {}
+        for term, count in Counter(self.extract_terms(text)).items():
+            column = _term_index(term)
+            weight = (1.0 + math.log(count)) * (SKILL_WEIGHT if term in self.skills else 1.0)
+            weights[column] = weights.get(column, 0.0) + weight
+        return weights
+
+    def extract_skills(self, text):
+        """
+        Return the set of recognized skills mentioned in the text.
+        """
+        return {term for term in self.extract_terms(text) if term in self.skills}
+
+    def vectorize(self, texts):
+        """
+        Turn texts into an (n_texts, N_FEATURES) sparse matrix of weighted term frequencies.
+        """
+        rows, columns, values = [], [], []
+        for row, text in enumerate(texts):
+            weights = self.term_weights(text)
+            rows.extend([row] * len(weights))
+            columns.extend(weights.keys())
+            values.extend(weights.values())
+        matrix = sparse.csr_matrix(
+            (np.asarray(values, dtype=np.float64), (rows, columns)), shape=(len(texts), N_FEATURES)
+        )
+        return matrix
+
+    def score_matrix(self, resume_texts, job_descriptions, use_idf=False):
+        """
+        Score every resume against every job description in one vectorized pass.
+
+        :param use_idf: Weight terms by smoothed IDF fitted over all the given documents, so terms shared
+            by every document count for less. Without it, scores match `score` exactly.
+        :return: A dense (n_resumes, n_jobs) NumPy array of cosine similarities.
+        """
+        matrix = self.vectorize(list(resume_texts) + list(job_descriptions))
+
+        if use_idf:
+            n_documents = matrix.shape[0]
+            document_frequency = np.bincount(matrix.indices, minlength=N_FEATURES)
+            idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1.0
+            matrix = matrix @ sparse.diags(idf)
+        matrix = _normalize_rows(matrix)
+
+        resumes, jobs = matrix[:len(resume_texts)], matrix[len(resume_texts):]
+        return (resumes @ jobs.T).toarray()
+
+    def score(self, resume_text, job_description):
+        """
+        Return the keyword compatibility score for one resume and job description, in [0, 1].
+        """
+        # A single pair is cheaper to score with plain dicts than with sparse matrices
+        resume_weights = self.term_weights(resume_text)
+        job_weights = self.term_weights(job_description)
+        dot = sum(weight * job_weights.get(column, 0.0) for column, weight in resume_weights.items())
+        norm = math.sqrt(sum(w * w for w in resume_weights.values()) * sum(w * w for w in job_weights.values()))
+        return float(dot / norm) if norm else 0.0
+
+    def missing_skills(self, resume_text, job_description):
+        """
+        Return the skills mentioned in the job description but not in the resume, sorted alphabetically.
+        """
+        return sorted(self.extract_skills(job_description) - self.extract_skills(resume_text))
+
+    def match(self, resume_text, job_description):
+        """
+        Return the keyword score (rounded) and missing skills for one resume and job description.
+        """
+        return {
+            "keyword_score": round(self.score(resume_text, job_description), 3),
+            "missing_skills": self.missing_skills(resume_text, job_description),
+        }
+
+    def match_many(self, resume_text, job_descriptions):
+        """
+        Return `match` for one resume against each job description. The resume is tokenized once:
+        all scores come from one `score_matrix` pass, and its skills are extracted once.
+        """
+        scores = self.score_matrix([resume_text], job_descriptions)[0]
+        resume_skills = self.extract_skills(resume_text)
+        return [
+            {
+                "keyword_score": round(float(score), 3),
+                "missing_skills": sorted(self.extract_skills(job_description) - resume_skills),
+            }
+            for job_description, score in zip(job_descriptions, scores)
+        ]
+
+
+def _normalize_rows(matrix):
+    """
+    Scale each row of a sparse matrix to unit L2 norm (empty rows stay zero).
+    """
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+keyword_scorer = KeywordScorer()
@@ -1,20 +1,171 @@
-from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
-import requests
-
-from .prompt_templates import (
-    COMPATIBILITY_TEMPLATE,
-    SUGGESTIONS_TEMPLATE,
-    BULLET_POINTS_TEMPLATE,
-    VALIDATE_AND_EVALUATE_RESUME,
-    VALIDATE_AND_EVALUATE_JOB_DESCRIPTION,
-    SEARCH_INTERVIEW_INFO_TEMPLATE, EXTRACT_COMPANY_AND_OCCUPATION_TEMPLATE,
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import copy
+import json
+import logging
+import queue
+import re
+import threading
+import time
+
+from .chains import chain_registry
+from .pipeline import Stage, StageExecutor, AsyncStageExecutor, GateClosed, PipelineCancelled
+from .budget import CHARS_PER_TOKEN, BudgetedInputs, get_token_budgeter
+from .clients import get_client_registry
+from .heuristics import get_heuristic_validator
+from .keywords import keyword_scorer
+from .research import get_insights_cache, get_search_cache, get_serp_api_url, research_cache_key
+from .throttle import (
+    DEFAULT_EXPECTED_OUTPUT_TOKENS, get_retry_policy, get_throttle_registry, is_rate_limit, retry_after,
+)
+from app.cache import SingleFlight, build_cache, make_cache_key
+from app.profiling import profiled
+from app.metrics import (
+    EXTERNAL_CALL_DURATION, LLM_CALL_DURATION, LLM_COST, LLM_FALLBACKS, LLM_RETRIES, LLM_THROTTLE_WAIT, LLM_TOKENS,
+    MetricFamily, cache_metric_families,
+    get_metrics_registry, timed,
 )
 
+logger = logging.getLogger(__name__)
+
 # Constants
 DEFAULT_MODEL = "gpt-4o"
+SMALL_MODEL = "gpt-4o-mini"
 DEFAULT_TEMPERATURE = 0
-SERP_API_URL = "https://serpapi.com/search.json"
+DEFAULT_BATCH_CONCURRENCY = 4
+
+# USD per million (input, output) tokens, for cost estimates
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+# Prompts sent to a smaller, faster model instead of DEFAULT_MODEL. Their short, structured answers
+# are checked when parsed, and a parse failure retries the prompt on DEFAULT_MODEL.
+DEFAULT_PROMPT_MODELS = {
+    "validate_resume": SMALL_MODEL,
+    "validate_job_description": SMALL_MODEL,
+    "extract_company_and_job_title": SMALL_MODEL,
+    "fused_validation_and_extraction": SMALL_MODEL,
+}
+
+# Stage results emitted by `stream_full_analysis` (and recorded on background jobs) as soon as they are ready
+STREAMED_SECTIONS = (
+    "keyword_match", "compatibility_evaluation", "suggestions", "bullet_points", "interview_insights",
+)
+
+# Keys each fused-mode JSON response must contain
+FUSED_VALIDATION_KEYS = (
+    "resume_validity", "resume_reason", "job_description_validity", "job_description_reason",
+    "company_name", "job_title",
+)
+FUSED_ANALYSIS_KEYS = ("compatibility_evaluation", "suggestions", "bullet_points")
+
+# Process-wide LLM response cache, shared by every LLMHelper unless one is passed explicitly
+_llm_cache = build_cache()
+
+
+def configure_llm_cache(enabled=True, max_entries=None, ttl=None, path=None):
+    """
+    Replace the process-wide LLM response cache.
+
+    :param enabled: When False, responses are never cached.
+    :param max_entries: Maximum number of responses kept per cache tier.
+    :param ttl: Seconds before a cached response expires.
+    :param path: Optional SQLite database path so cached responses are shared across worker processes.
+    """
+    global _llm_cache
+    if not enabled:
+        _llm_cache = None
+        return
+    options = {"max_entries": max_entries, "ttl": ttl}
+    _llm_cache = build_cache(path=path, **{key: value for key, value in options.items() if value is not None})
+
+
+def get_llm_cache():
+    """
+    Return the process-wide LLM response cache, or None if caching is disabled.
+    """
+    return _llm_cache
+
+
+# Process-wide model per prompt; prompts not listed use the LLMHelper's model
+_prompt_models = dict(DEFAULT_PROMPT_MODELS)
+
+
+def configure_model_tiers(enabled=True, models=None):
+    """
+    Set which model each prompt runs on.
+
+    :param enabled: When False, every prompt uses the LLMHelper's model (DEFAULT_MODEL).
+    :param models: Per-prompt overrides of DEFAULT_PROMPT_MODELS, e.g. {"bullet_points": "gpt-4o-mini"}.
+    """
+    global _prompt_models
+    _prompt_models = {**DEFAULT_PROMPT_MODELS, **(models or {})} if enabled else {}
+
+
+def get_prompt_models():
+    """
+    Return the process-wide {prompt name: model} routing.
+    """
+    return _prompt_models
+
+
+# Process-wide coalescing of identical in-flight analyses and LLM calls
+_analysis_flights = SingleFlight()
+_llm_flights = SingleFlight()
+
+
+def configure_request_coalescing(enabled=True):
+    """
+    Enable or disable sharing one computation between concurrent identical analyses and LLM calls.
+    """
+    global _analysis_flights, _llm_flights
+    _analysis_flights, _llm_flights = (SingleFlight(), SingleFlight()) if enabled else (None, None)
+
+
+def get_coalescing_stats():
+    """
+    Return how many duplicate analyses and LLM calls were saved by coalescing, and how many are in flight.
+    """
+    return {
+        name: flights.stats() if flights is not None else None
+        for name, flights in (("analyses", _analysis_flights), ("llm_calls", _llm_flights))
+    }
+
+
+def estimate_cost(model, input_tokens, output_tokens):
+    """
+    Return the estimated USD cost of a call from its token usage, or 0 for models without a known price.
+    """
+    input_price, output_price = MODEL_PRICES.get(model, (0, 0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def _collect_metrics():
+    """
+    Report the LLM response cache and request coalescing counters at scrape time.
+    """
+    coalescing = get_coalescing_stats()
+    return cache_metric_families({"llm": _llm_cache}) + [
+        MetricFamily("coalesced_calls_saved_total", "counter", "Duplicate calls answered by an identical in-flight call.", [
+            ({"kind": kind}, stats["saved_calls"]) for kind, stats in coalescing.items() if stats is not None
+        ]),
+    ]
+
+
+get_metrics_registry().register_collector(_collect_metrics)
+
+
+class OutputParseError(ValueError):
+    """
+    Raised when a model's answer does not have the format its prompt asked for.
+    Only these errors send a prompt from a smaller model to the default model.
+    """
 
 
 class LLMHelper:
@@ -22,93 +173,498 @@ class LLMHelper:
     Encapsulates logic for creating and interacting with the LLM.
     """
 
-    def __init__(self, api_key, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
-        self.client = ChatOpenAI(
-            openai_api_key=api_key,
-            model_name=model,
-            temperature=temperature
-        )
+    def __init__(self, api_key, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, cache=None,
+                 prompt_models=None):
+        """
+        :param model: Model for every prompt not routed elsewhere by `prompt_models`, and for fallbacks.
+        :param prompt_models: {prompt name: model} routing; defaults to the process-wide `get_prompt_models()`.
+        """
+        self.api_key = api_key
+        self.model = model
+        self.prompt_models = prompt_models if prompt_models is not None else get_prompt_models()
+        self.temperature = temperature
+        self.cache = cache if cache is not None else get_llm_cache()
+        self.token_usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+        self._usage_lock = threading.Lock()
+        self.client = get_client_registry().get_llm_client(api_key, model, temperature)
 
     def create_chain(self, template, input_variables):
         """
         Create a reusable prompt chain for the LLM.
+        Registered templates reuse their precompiled prompt and chain.
         """
+        name = chain_registry.find_name(template)
+        if name is not None:
+            return self.get_chain(name)
         prompt = PromptTemplate(template=template, input_variables=input_variables)
         return prompt | self.client
 
-    def invoke_chain(self, chain, **inputs):
+    def get_chain(self, name):
+        """
+        Return the precompiled chain for a prompt registered in `chain_registry`, on the prompt's model.
+        """
+        model = self.model_for(name)
+        client = self.client if model == self.model else get_client_registry().get_llm_client(
+            self.api_key, model, self.temperature
+        )
+        return chain_registry.get_chain(name, client)
+
+    def get_async_chain(self, name):
+        """
+        Return a chain for a registered prompt whose async calls use the running event loop's connection pool.
+        """
+        client = get_client_registry().get_async_llm_client(self.api_key, self.model_for(name), self.temperature)
+        return chain_registry.build_chain(name, client)
+
+    def model_for(self, prompt_name):
+        """
+        Return the model a prompt runs on.
+        """
+        return self.prompt_models.get(prompt_name, self.model)
+
+    def invoke_with_fallback(self, prompt_name, call):
+        """
+        Run `call(helper)`, which invokes and parses one prompt. If the prompt runs on a smaller model
+        and its output fails to parse (OutputParseError), run it once more on this helper's model.
+        Other errors, such as a job description without a company name, reach the caller unchanged.
+        """
+        try:
+            return call(self)
+        except OutputParseError as e:
+            fallback = self._fallback_helper(prompt_name, e)
+            if fallback is None:
+                raise
+            return call(fallback)
+
+    async def ainvoke_with_fallback(self, prompt_name, call):
         """
-        Invoke a chain and return the result content.
+        Async counterpart of `invoke_with_fallback`; `call(helper)` returns an awaitable.
         """
-        return chain.invoke(inputs).content.strip()
+        try:
+            return await call(self)
+        except OutputParseError as e:
+            fallback = self._fallback_helper(prompt_name, e)
+            if fallback is None:
+                raise
+            return await call(fallback)
+
+    def _fallback_helper(self, prompt_name, error):
+        """
+        Return a helper that runs every prompt on this helper's model, sharing its cache and token usage,
+        or None if the prompt already runs on it.
+        """
+        model = self.model_for(prompt_name)
+        if model == self.model:
+            return None
+        LLM_FALLBACKS.inc(prompt=prompt_name, model=model)
+        logger.warning("Output of %s on %s failed to parse, retrying on %s: %s", prompt_name, model, self.model, error)
+        fallback = copy.copy(self)
+        fallback.prompt_models = {}
+        return fallback
+
+    def invoke_chain(self, chain, parse=None, **inputs):
+        """
+        Invoke a chain and return the result content, or `parse(content)` when a parser is given.
+        Responses are cached on the template, model, temperature and rendered prompt,
+        and concurrent identical calls share one model call. Content that `parse` rejects with
+        an OutputParseError is not cached, so a malformed answer is not served again.
+        """
+        key = self._cache_key(chain, inputs)
+        if _llm_flights is None:
+            result = self._invoke_cached(chain, inputs, key, parse)
+        else:
+            result = _llm_flights.do(key, lambda: self._invoke_cached(chain, inputs, key, parse))
+        return parse(result) if parse is not None else result
+
+    def _invoke_cached(self, chain, inputs, key, parse):
+        if self.cache is None:
+            return self._invoke_uncached(chain, inputs)
+
+        result = self.cache.get(key)
+        if result is None:
+            result = self._invoke_uncached(chain, inputs)
+            self._cache_result(key, result, parse)
+        return result
+
+    def _cache_result(self, key, result, parse):
+        """
+        Cache a response unless `parse` rejects it as malformed.
+        """
+        if parse is not None:
+            try:
+                parse(result)
+            except OutputParseError:
+                return
+        self.cache.set(key, result)
+
+    def invoke_json_chain(self, chain, required_keys=(), **inputs):
+        """
+        Invoke a chain whose prompt asks for a JSON object and return the parsed dict.
+        """
+        return self.invoke_chain(chain, parse=lambda result: self.parse_json_result(result, required_keys), **inputs)
+
+    @staticmethod
+    def parse_json_result(result, required_keys=()):
+        """
+        Parse a JSON object whose `required_keys` must all hold strings.
+        """
+        try:
+            parsed = json.loads(result)
+        except json.JSONDecodeError as e:
+            raise OutputParseError(f"Failed to parse JSON result: {result}. Error: {e}")
+        if not isinstance(parsed, dict):
+            raise OutputParseError(f"Failed to parse JSON result: {result}. Error: not a JSON object")
+
+        missing = [key for key in required_keys if not isinstance(parsed.get(key), str)]
+        if missing:
+            raise OutputParseError(f"JSON result is missing keys {missing}: {result}")
+        return parsed
+
+    async def ainvoke_chain(self, chain, parse=None, **inputs):
+        """
+        Async counterpart of `invoke_chain`; awaits the model without holding a thread and shares the same cache.
+        """
+        key = self._cache_key(chain, inputs)
+        if _llm_flights is None:
+            result = await self._ainvoke_cached(chain, inputs, key, parse)
+        else:
+            result = await _llm_flights.ado(key, lambda: self._ainvoke_cached(chain, inputs, key, parse))
+        return parse(result) if parse is not None else result
+
+    async def _ainvoke_cached(self, chain, inputs, key, parse):
+        if self.cache is None:
+            return await self._ainvoke_uncached(chain, inputs)
+
+        result = self.cache.get(key)
+        if result is None:
+            result = await self._ainvoke_uncached(chain, inputs)
+            self._cache_result(key, result, parse)
+        return result
+
+    def _invoke_uncached(self, chain, inputs):
+        """
+        Call the model within the client-side rate limits, retrying transient failures (timeouts,
+        429s, server errors) with jittered exponential backoff, and record the duration and token usage.
+        Only the failed call is retried, so the rest of the pipeline keeps its results.
+        """
+        prompt_name = self._prompt_name(chain)
+        model = self.model_for(prompt_name)
+        limiter = get_throttle_registry().get_limiter(self.api_key, model)
+        reserved_tokens = self._estimate_tokens(chain, inputs)
+        attempt = 0
+        while True:
+            time.sleep(self._reserve(limiter, model, reserved_tokens))
+            try:
+                with timed(LLM_CALL_DURATION, prompt=prompt_name, model=model) as timer:
+                    response = chain.invoke(inputs)
+            except Exception as e:
+                # Each attempt reserves anew, so release this attempt's tokens before retrying or raising
+                limiter.settle(reserved_tokens, 0)
+                time.sleep(self._retry_delay(limiter, prompt_name, model, e, attempt))
+                attempt += 1
+                continue
+            return self._record_usage(prompt_name, model, response, timer.elapsed, limiter, reserved_tokens)
+
+    async def _ainvoke_uncached(self, chain, inputs):
+        """
+        Async counterpart of `_invoke_uncached`; rate-limit waits and backoff do not hold a thread.
+        """
+        prompt_name = self._prompt_name(chain)
+        model = self.model_for(prompt_name)
+        limiter = get_throttle_registry().get_limiter(self.api_key, model)
+        reserved_tokens = self._estimate_tokens(chain, inputs)
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._reserve(limiter, model, reserved_tokens))
+            try:
+                with timed(LLM_CALL_DURATION, prompt=prompt_name, model=model) as timer:
+                    response = await chain.ainvoke(inputs)
+            except Exception as e:
+                # Each attempt reserves anew, so release this attempt's tokens before retrying or raising
+                limiter.settle(reserved_tokens, 0)
+                await asyncio.sleep(self._retry_delay(limiter, prompt_name, model, e, attempt))
+                attempt += 1
+                continue
+            return self._record_usage(prompt_name, model, response, timer.elapsed, limiter, reserved_tokens)
+
+    @staticmethod
+    def _estimate_tokens(chain, inputs):
+        """
+        Estimate the tokens a call will use (prompt plus expected output) to reserve against the TPM limit.
+        """
+        return len(chain.first.format(**inputs)) // CHARS_PER_TOKEN + DEFAULT_EXPECTED_OUTPUT_TOKENS
+
+    @staticmethod
+    def _reserve(limiter, model, tokens):
+        """
+        Reserve a call against the rate limiter and return the seconds to wait before sending it.
+        """
+        delay = limiter.reserve(tokens)
+        if delay:
+            LLM_THROTTLE_WAIT.observe(delay, model=model)
+        return delay
+
+    @staticmethod
+    def _retry_delay(limiter, prompt_name, model, error, attempt):
+        """
+        Return the backoff before retrying a failed call, or re-raise the error if it should not be retried.
+        A 429 also pauses every other call through the same limiter for the server's Retry-After.
+        """
+        policy = get_retry_policy()
+        if not policy.should_retry(error, attempt):
+            raise error
+        server_delay = retry_after(error)
+        if is_rate_limit(error):
+            limiter.pause(server_delay if server_delay is not None else policy.delay(attempt))
+        delay = policy.delay(attempt, server_delay)
+        LLM_RETRIES.inc(prompt=prompt_name, model=model, error=type(error).__name__)
+        logger.warning(
+            "LLM call %s failed (%s: %s); retry %d of %d in %.1fs",
+            prompt_name, type(error).__name__, error, attempt + 1, policy.max_retries, delay,
+        )
+        return delay
+
+    def _record_usage(self, prompt_name, model, response, elapsed, limiter, reserved_tokens):
+        """
+        Add a response's reported token usage and estimated cost to `token_usage` and the metrics,
+        settle the rate limiter's token reservation, and return its content.
+        """
+        usage = getattr(response, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        # Without reported usage the reservation's estimate stands
+        limiter.settle(reserved_tokens, input_tokens + output_tokens if usage else None)
+        cost = estimate_cost(model, input_tokens, output_tokens)
+        with self._usage_lock:
+            self.token_usage["calls"] += 1
+            self.token_usage["input_tokens"] += input_tokens
+            self.token_usage["output_tokens"] += output_tokens
+            self.token_usage["cost_usd"] += cost
+
+        LLM_TOKENS.inc(input_tokens, prompt=prompt_name, model=model, direction="input")
+        LLM_TOKENS.inc(output_tokens, prompt=prompt_name, model=model, direction="output")
+        LLM_COST.inc(cost, prompt=prompt_name, model=model)
+        logger.debug(
+            "LLM call %s on %s took %.2fs (%d input, %d output tokens)",
+            prompt_name, model, elapsed, input_tokens, output_tokens,
+        )
+        return response.content.strip()
+
+    @staticmethod
+    def _prompt_name(chain):
+        return chain_registry.find_name(chain.first.template) or "custom"
+
+    def stream_chain(self, chain, on_token, **inputs):
+        """
+        Invoke a chain while streaming, passing each generated chunk to `on_token`.
+        Returns the full result content, which is cached like `invoke_chain`. The streamed chunks are merged
+        into one message so its token usage is recorded and settled like any other call.
+        """
+        key = self._cache_key(chain, inputs) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                on_token(cached)
+                return cached
+
+        # Tokens have already reached the caller once streaming starts, so streamed calls are not retried
+        prompt_name = self._prompt_name(chain)
+        model = self.model_for(prompt_name)
+        limiter = get_throttle_registry().get_limiter(self.api_key, model)
+        reserved_tokens = self._estimate_tokens(chain, inputs)
+        time.sleep(self._reserve(limiter, model, reserved_tokens))
+        response = None
+        try:
+            with timed(LLM_CALL_DURATION, prompt=prompt_name, model=model) as timer:
+                for chunk in chain.stream(inputs):
+                    response = chunk if response is None else response + chunk
+                    if chunk.content:
+                        on_token(chunk.content)
+        except Exception:
+            # Once output has been generated its tokens were spent, so the estimate stands
+            if response is None:
+                limiter.settle(reserved_tokens, 0)
+            raise
+        result = self._record_usage(prompt_name, model, response, timer.elapsed, limiter, reserved_tokens)
+
+        if key is not None:
+            self.cache.set(key, result)
+        return result
+
+    def _cache_key(self, chain, inputs):
+        """
+        Build the content-addressed cache key for a chain invocation.
+        """
+        prompt = chain.first
+        model = self.model_for(chain_registry.find_name(prompt.template))
+        return make_cache_key(prompt.template, model, self.temperature, prompt.format(**inputs))
 
     def extract_company_and_job_title(self, job_description):
         """
         Extract the company name and job title from the job description.
+        Falls back to the default model when a smaller model's answer cannot be parsed.
+        """
+        def extract(helper):
+            chain = helper.get_chain("extract_company_and_job_title")
+            return helper.invoke_chain(chain, parse=helper.parse_company_and_job_title, job_description=job_description)
+
+        company_name, job_title = self.invoke_with_fallback("extract_company_and_job_title", extract)
+        self.check_company_and_job_title(company_name, job_title)
+        return company_name, job_title
+
+    async def aextract_company_and_job_title(self, job_description):
+        """
+        Async counterpart of `extract_company_and_job_title`.
         """
-        chain = self.create_chain(EXTRACT_COMPANY_AND_OCCUPATION_TEMPLATE, ["job_description"])
-        result = self.invoke_chain(chain, job_description=job_description)
+        async def extract(helper):
+            chain = helper.get_async_chain("extract_company_and_job_title")
+            return await helper.ainvoke_chain(
+                chain, parse=helper.parse_company_and_job_title, job_description=job_description
+            )
 
-        # Parse result
+        company_name, job_title = await self.ainvoke_with_fallback("extract_company_and_job_title", extract)
+        self.check_company_and_job_title(company_name, job_title)
+        return company_name, job_title
+
+    @staticmethod
+    def parse_company_and_job_title(result):
+        """
+        Parse the company name and job title from an extraction result. Either may be "Unknown";
+        `check_company_and_job_title` explains which one could not be determined.
+        """
         try:
             lines = result.splitlines()
             company_name = lines[0].split(":")[1].strip()
             job_title = lines[1].split(":")[1].strip()
-
-            # Handle specific cases
-            if company_name == "Unknown" and job_title == "Unknown":
-                raise ValueError(
-                    "Neither the company name nor the job title could be determined. "
-                    "Please ensure both are clearly mentioned in the job description."
-                )
-            elif company_name == "Unknown":
-                raise ValueError(
-                    "The company name could not be determined. Please ensure the company name is clearly mentioned in the job description."
-                )
-            elif job_title == "Unknown":
-                raise ValueError(
-                    "The job title could not be determined. Please ensure the job title is clearly mentioned in the job description."
-                )
-
         except Exception as e:
             # Capture and re-raise any parsing errors with context
-            raise ValueError(
+            raise OutputParseError(
                 f"Failed to parse extraction result. Original output:\n{result}\n\n"
                 f"Error: {str(e)}"
             )
 
         return company_name, job_title
 
+    @staticmethod
+    def check_company_and_job_title(company_name, job_title):
+        """
+        Raise a ValueError explaining which of the company name and job title could not be determined.
+        """
+        if company_name == "Unknown" and job_title == "Unknown":
+            raise ValueError(
+                "Neither the company name nor the job title could be determined. "
+                "Please ensure both are clearly mentioned in the job description."
+            )
+        elif company_name == "Unknown":
+            raise ValueError(
+                "The company name could not be determined. Please ensure the company name is clearly mentioned in the job description."
+            )
+        elif job_title == "Unknown":
+            raise ValueError(
+                "The job title could not be determined. Please ensure the job title is clearly mentioned in the job description."
+            )
+
 
 class ValidationService:
     """
     Handles validation logic for the resume and job description.
     """
 
-    def __init__(self, llm_helper):
+    def __init__(self, llm_helper, heuristic_validator=None):
         self.llm_helper = llm_helper
+        self.heuristic_validator = (
+            heuristic_validator if heuristic_validator is not None else get_heuristic_validator()
+        )
 
     def validate(self, resume_text, job_description):
         """
         Runs validation for both resume and job description.
         """
-        resume_chain = self.llm_helper.create_chain(
-            VALIDATE_AND_EVALUATE_RESUME, ["resume_text"]
-        )
-        job_chain = self.llm_helper.create_chain(
-            VALIDATE_AND_EVALUATE_JOB_DESCRIPTION, ["job_description"]
-        )
+        resume_validity, resume_sufficiency = self.validate_resume(resume_text)
+        job_validity, job_sufficiency = self.validate_job_description(job_description)
+        return self._collect_errors(resume_validity, resume_sufficiency, job_validity, job_sufficiency)
 
-        # Run the validation chains
-        resume_result = self.llm_helper.invoke_chain(resume_chain, resume_text=resume_text)
-        job_result = self.llm_helper.invoke_chain(job_chain, job_description=job_description)
+    def validate_resume(self, resume_text):
+        """
+        Runs the resume validation chain and returns its parsed validity and sufficiency.
+        Clear-cut inputs are decided by the heuristic validator without calling the LLM.
+        """
+        decision = self.prescreen_resume(resume_text)
+        if decision is not None:
+            return decision
+        return self._run_validation("validate_resume", resume_text=resume_text)
 
-        # Parse results and collect errors
-        resume_validity, resume_sufficiency = self._parse_validation_result(resume_result)
-        job_validity, job_sufficiency = self._parse_validation_result(job_result)
-        errors = self._collect_errors(resume_validity, resume_sufficiency, job_validity, job_sufficiency)
+    def validate_job_description(self, job_description):
+        """
+        Runs the job description validation chain and returns its parsed validity and sufficiency.
+        Clear-cut inputs are decided by the heuristic validator without calling the LLM.
+        """
+        decision = self.prescreen_job_description(job_description)
+        if decision is not None:
+            return decision
+        return self._run_validation("validate_job_description", job_description=job_description)
 
-        return errors
+    async def avalidate_resume(self, resume_text):
+        """
+        Async counterpart of `validate_resume`.
+        """
+        decision = self.prescreen_resume(resume_text)
+        if decision is not None:
+            return decision
+        return await self._arun_validation("validate_resume", resume_text=resume_text)
+
+    async def avalidate_job_description(self, job_description):
+        """
+        Async counterpart of `validate_job_description`.
+        """
+        decision = self.prescreen_job_description(job_description)
+        if decision is not None:
+            return decision
+        return await self._arun_validation("validate_job_description", job_description=job_description)
+
+    def _run_validation(self, prompt_name, **inputs):
+        """
+        Run a validation prompt and parse its result, falling back to the default model
+        when a smaller model's answer cannot be parsed.
+        """
+        def validate(helper):
+            return helper.invoke_chain(helper.get_chain(prompt_name), parse=self._parse_validation_result, **inputs)
+
+        return self.llm_helper.invoke_with_fallback(prompt_name, validate)
+
+    async def _arun_validation(self, prompt_name, **inputs):
+        """
+        Async counterpart of `_run_validation`.
+        """
+        async def validate(helper):
+            chain = helper.get_async_chain(prompt_name)
+            return await helper.ainvoke_chain(chain, parse=self._parse_validation_result, **inputs)
+
+        return await self.llm_helper.ainvoke_with_fallback(prompt_name, validate)
+
+    def prescreen_resume(self, resume_text):
+        """
+        Return a (validity, reason) decision from the heuristic validator, or None to defer to the LLM.
+        """
+        if self.heuristic_validator is None:
+            return None
+        return self._heuristic_decision(self.heuristic_validator.assess_resume(resume_text))
+
+    def prescreen_job_description(self, job_description):
+        """
+        Return a (validity, reason) decision from the heuristic validator, or None to defer to the LLM.
+        """
+        if self.heuristic_validator is None:
+            return None
+        return self._heuristic_decision(self.heuristic_validator.assess_job_description(job_description))
+
+    def _heuristic_decision(self, verdict):
+        decision = self.heuristic_validator.decide(verdict)
+        if decision == "reject":
+            return "No", verdict.reason
+        if decision == "accept":
+            return "Yes", verdict.reason
+        return None
 
     @staticmethod
     def _parse_validation_result(validation_result):
@@ -121,7 +677,7 @@ class ValidationService:
             sufficiency = lines[1].split(":")[1].strip().split(" - ")
             return validity[0], sufficiency[1]
         except Exception as e:
-            raise ValueError(f"Failed to parse validation result: {validation_result}. Error: {e}")
+            raise OutputParseError(f"Failed to parse validation result: {validation_result}. Error: {e}")
 
     @staticmethod
     def _collect_errors(resume_validity, resume_sufficiency, job_validity, job_sufficiency):
@@ -154,54 +710,131 @@ class AnalysisService:
         """
         Perform compatibility evaluation, suggestions, and bullet point generation.
         """
-        compatibility_chain = self.llm_helper.create_chain(
-            COMPATIBILITY_TEMPLATE, ["resume_text", "job_description"]
-        )
-        suggestions_chain = self.llm_helper.create_chain(
-            SUGGESTIONS_TEMPLATE, ["resume_text", "job_description"]
-        )
-        bullet_points_chain = self.llm_helper.create_chain(
-            BULLET_POINTS_TEMPLATE, ["job_description"]
-        )
-
-        # Run the chains
-        compatibility = self.llm_helper.invoke_chain(
-            compatibility_chain, resume_text=resume_text, job_description=job_description
-        )
-        suggestions = self.llm_helper.invoke_chain(
-            suggestions_chain, resume_text=resume_text, job_description=job_description
-        )
-        bullet_points = self.llm_helper.invoke_chain(
-            bullet_points_chain, job_description=job_description
-        )
-
         return {
-            "compatibility_evaluation": compatibility,
-            "suggestions": suggestions,
-            "bullet_points": bullet_points,
+            "compatibility_evaluation": self.evaluate_compatibility(resume_text, job_description),
+            "suggestions": self.generate_suggestions(resume_text, job_description),
+            "bullet_points": self.generate_bullet_points(job_description),
         }
 
+    def evaluate_compatibility(self, resume_text, job_description):
+        """
+        Evaluate how well the resume matches the job description.
+        """
+        chain = self.llm_helper.get_chain("compatibility")
+        return self.llm_helper.invoke_chain(chain, resume_text=resume_text, job_description=job_description)
+
+    def generate_suggestions(self, resume_text, job_description, on_token=None):
+        """
+        Suggest resume improvements tailored to the job description.
+        Pass `on_token` to receive the suggestions as they are generated.
+        """
+        chain = self.llm_helper.get_chain("suggestions")
+        if on_token is not None:
+            return self.llm_helper.stream_chain(
+                chain, on_token, resume_text=resume_text, job_description=job_description
+            )
+        return self.llm_helper.invoke_chain(chain, resume_text=resume_text, job_description=job_description)
+
+    def generate_bullet_points(self, job_description):
+        """
+        Generate example resume bullet points for the job description.
+        """
+        chain = self.llm_helper.get_chain("bullet_points")
+        return self.llm_helper.invoke_chain(chain, job_description=job_description)
+
+    async def aevaluate_compatibility(self, resume_text, job_description):
+        """
+        Async counterpart of `evaluate_compatibility`.
+        """
+        chain = self.llm_helper.get_async_chain("compatibility")
+        return await self.llm_helper.ainvoke_chain(chain, resume_text=resume_text, job_description=job_description)
+
+    async def agenerate_suggestions(self, resume_text, job_description):
+        """
+        Async counterpart of `generate_suggestions`.
+        """
+        chain = self.llm_helper.get_async_chain("suggestions")
+        return await self.llm_helper.ainvoke_chain(chain, resume_text=resume_text, job_description=job_description)
+
+    async def agenerate_bullet_points(self, job_description):
+        """
+        Async counterpart of `generate_bullet_points`.
+        """
+        chain = self.llm_helper.get_async_chain("bullet_points")
+        return await self.llm_helper.ainvoke_chain(chain, job_description=job_description)
+
+    @staticmethod
+    def parse_compatibility_score(compatibility_evaluation):
+        """
+        Extract the numeric 1-10 score from a compatibility evaluation, or None if it is missing.
+        """
+        match = re.search(r"Compatibility Score:\W*(\d+(?:\.\d+)?)", compatibility_evaluation or "")
+        return float(match.group(1)) if match else None
+
 
 class InterviewResearchService:
     """
     Handles retrieving and analyzing interview-related information using SERP API and LLM.
     """
 
-    def __init__(self, llm_helper, serp_api_key):
+    def __init__(self, llm_helper, serp_api_key, http_session=None):
         self.llm_helper = llm_helper
         self.serp_api_key = serp_api_key
+        registry = get_client_registry()
+        self.http_session = http_session if http_session is not None else registry.get_http_session()
+        self.timeout = registry.timeout
+        self.api_url = get_serp_api_url()
+        self.search_cache = get_search_cache()
+        self.insights_cache = get_insights_cache()
 
     def search_interview_info(self, company_name, job_title):
         """
         Use the SERP API to fetch interview-related information.
+        Results are cached per normalized (company, job title), and concurrent identical searches share one call.
+        """
+        if self.search_cache is None:
+            return self._fetch_search_results(company_name, job_title)
+        return self.search_cache.get_or_compute(
+            research_cache_key("serp", company_name, job_title),
+            lambda: self._fetch_search_results(company_name, job_title),
+        )
+
+    async def asearch_interview_info(self, company_name, job_title):
         """
+        Async counterpart of `search_interview_info`, using the running event loop's pooled httpx client.
+        """
+        if self.search_cache is None:
+            return await self._afetch_search_results(company_name, job_title)
+        return await self.search_cache.aget_or_compute(
+            research_cache_key("serp", company_name, job_title),
+            lambda: self._afetch_search_results(company_name, job_title),
+        )
+
+    def _fetch_search_results(self, company_name, job_title):
+        with timed(EXTERNAL_CALL_DURATION, service="serp"):
+            response = self.http_session.get(
+                self.api_url, params=self._search_params(company_name, job_title), timeout=self.timeout
+            )
+        return self._parse_search_response(response)
+
+    async def _afetch_search_results(self, company_name, job_title):
+        http_client = get_client_registry().get_async_http_client()
+        with timed(EXTERNAL_CALL_DURATION, service="serp"):
+            response = await http_client.get(
+                self.api_url, params=self._search_params(company_name, job_title), timeout=self.timeout
+            )
+        return self._parse_search_response(response)
+
+    def _search_params(self, company_name, job_title):
         query = f"{company_name} {job_title} interview process questions experiences"
-        params = {
+        return {
             "q": query,
             "key": self.serp_api_key,
             "num": 10
         }
-        response = requests.get(SERP_API_URL, params=params)
+
+    @staticmethod
+    def _parse_search_response(response):
         if response.status_code == 200:
             return response.json().get("organic_results", [])
         else:
@@ -218,53 +851,667 @@ class InterviewResearchService:
             for i, r in enumerate(search_results)
         )
 
-    def analyze_interview_data(self, company_name, job_title, search_results):
+    def analyze_interview_data(self, company_name, job_title, search_results, on_token=None):
         """
         Analyze SERP search results using LLM for interview insights.
+        Pass `on_token` to receive the insights as they are generated.
+        When the insights cache is enabled, insights are shared per normalized (company, job title).
         """
         formatted_results = self.parse_search_results(search_results)
 
-        chain = self.llm_helper.create_chain(
-            SEARCH_INTERVIEW_INFO_TEMPLATE, ["company_name", "job_title", "search_results"]
+        chain = self.llm_helper.get_chain("interview_insights")
+        inputs = {"company_name": company_name, "job_title": job_title, "search_results": formatted_results}
+        if on_token is not None:
+            return self._stream_insights(chain, on_token, inputs)
+        if self.insights_cache is None:
+            return self.llm_helper.invoke_chain(chain, **inputs)
+        return self.insights_cache.get_or_compute(
+            self._insights_cache_key(company_name, job_title),
+            lambda: self.llm_helper.invoke_chain(chain, **inputs),
+        )
+
+    async def aanalyze_interview_data(self, company_name, job_title, search_results):
+        """
+        Async counterpart of `analyze_interview_data`.
+        """
+        chain = self.llm_helper.get_async_chain("interview_insights")
+        inputs = {
+            "company_name": company_name, "job_title": job_title,
+            "search_results": self.parse_search_results(search_results),
+        }
+        if self.insights_cache is None:
+            return await self.llm_helper.ainvoke_chain(chain, **inputs)
+        return await self.insights_cache.aget_or_compute(
+            self._insights_cache_key(company_name, job_title),
+            lambda: self.llm_helper.ainvoke_chain(chain, **inputs),
+        )
+
+    def _stream_insights(self, chain, on_token, inputs):
+        """
+        Stream freshly generated insights, or emit cached insights as a single chunk.
+        """
+        if self.insights_cache is None:
+            return self.llm_helper.stream_chain(chain, on_token, **inputs)
+
+        key = self._insights_cache_key(inputs["company_name"], inputs["job_title"])
+        cached = self.insights_cache.get(key)
+        if cached is not None:
+            on_token(cached)
+            return cached
+        result = self.llm_helper.stream_chain(chain, on_token, **inputs)
+        self.insights_cache.set(key, result)
+        return result
+
+    def _insights_cache_key(self, company_name, job_title):
+        template = chain_registry.get_prompt("interview_insights").template
+        model = self.llm_helper.model_for("interview_insights")
+        return research_cache_key("interview_insights", company_name, job_title, model, template)
+
+
+def build_analysis_stages(llm_helper, serp_api_key, resume_text, job_description, resume_validation=None,
+                          on_token=None, budget=None, keyword_match=None):
+    """
+    Build the stage graph for analyzing one resume against one job description.
+
+    :param resume_validation: Already-parsed resume validation result to reuse instead of re-running the chain.
+    :param keyword_match: Already-computed `keyword_scorer.match` result to reuse instead of re-scoring.
+    :param on_token: Optional callback invoked with (section, chunk) while the long sections are generated.
+    :param budget: BudgetedInputs that fit the texts to each prompt's token budget (defaults to the configured budgets).
+    :return: A list of Stage objects for StageExecutor.
+    """
+    if budget is None:
+        budget = BudgetedInputs(get_token_budgeter(), resume_text, job_description)
+    validation_service = ValidationService(llm_helper)
+    analysis_service = AnalysisService(llm_helper)
+    interview_service = InterviewResearchService(llm_helper, serp_api_key)
+
+    def match_keywords(results):
+        if keyword_match is not None:
+            return keyword_match
+        return keyword_scorer.match(resume_text, job_description)
+
+    def validate_resume(results):
+        if resume_validation is not None:
+            return resume_validation
+        return validation_service.validate_resume(budget.fit("validate_resume", "resume_text"))
+
+    def check_validation(results):
+        resume_validity, resume_sufficiency = results["resume_validation"]
+        job_validity, job_sufficiency = results["job_validation"]
+        errors = validation_service._collect_errors(
+            resume_validity, resume_sufficiency, job_validity, job_sufficiency
+        )
+        if errors:
+            raise GateClosed({"error": "Validation failed for one or both inputs.", "details": errors})
+
+    def token_callback(section):
+        if on_token is None:
+            return None
+        return lambda chunk: on_token(section, chunk)
+
+    def extract_company_and_job_title(results):
+        logger.debug("Extracting company name and job title from the job description")
+        try:
+            company_name, job_title = llm_helper.extract_company_and_job_title(
+                budget.fit("extract_company_and_job_title", "job_description")
+            )
+        except ValueError as e:
+            # Return the specific error message from the extraction method
+            raise GateClosed({"error": str(e)})
+        logger.info("Extracted company name %r and job title %r", company_name, job_title)
+        return company_name, job_title
+
+    return [
+        # Step 1: Validate inputs
+        Stage("keyword_match", match_keywords),
+        Stage("resume_validation", validate_resume),
+        Stage(
+            "job_validation",
+            lambda results: validation_service.validate_job_description(
+                budget.fit("validate_job_description", "job_description")
+            ),
+        ),
+        Stage("validation", check_validation, depends_on=("resume_validation", "job_validation")),
+
+        # Step 2: Analyze resume-job description compatibility
+        Stage(
+            "compatibility_evaluation",
+            lambda results: analysis_service.evaluate_compatibility(**budget.inputs("compatibility")),
+            depends_on=("validation",),
+        ),
+        Stage(
+            "suggestions",
+            lambda results: analysis_service.generate_suggestions(
+                **budget.inputs("suggestions"), on_token=token_callback("suggestions")
+            ),
+            depends_on=("validation",),
+        ),
+        Stage(
+            "bullet_points",
+            lambda results: analysis_service.generate_bullet_points(**budget.inputs("bullet_points")),
+            depends_on=("validation",),
+        ),
+
+        # Step 3: Extract company name and job title
+        Stage("company_and_job_title", extract_company_and_job_title, depends_on=("validation",)),
+
+        # Step 4: Search and analyze interview insights
+        Stage(
+            "search_results",
+            lambda results: interview_service.search_interview_info(*results["company_and_job_title"]),
+            depends_on=("company_and_job_title",),
+        ),
+        Stage(
+            "interview_insights",
+            lambda results: interview_service.analyze_interview_data(
+                *results["company_and_job_title"], results["search_results"],
+                on_token=token_callback("interview_insights"),
+            ),
+            depends_on=("company_and_job_title", "search_results"),
+        ),
+    ]
+
+
+def build_fused_analysis_stages(llm_helper, serp_api_key, resume_text, job_description, budget=None):
+    """
+    Build a stage graph that produces the same stage results as `build_analysis_stages`
+    from two JSON calls: one for validation and extraction, one for the three analysis sections.
+    """
+    if budget is None:
+        budget = BudgetedInputs(get_token_budgeter(), resume_text, job_description)
+    validation_service = ValidationService(llm_helper)
+    interview_service = InterviewResearchService(llm_helper, serp_api_key)
+
+    def validate_and_extract(results):
+        # Reject clearly invalid inputs before spending the fused call on them
+        resume_decision = validation_service.prescreen_resume(resume_text) or ("Yes", "")
+        job_decision = validation_service.prescreen_job_description(job_description) or ("Yes", "")
+        errors = validation_service._collect_errors(*resume_decision, *job_decision)
+        if errors:
+            raise GateClosed({"error": "Validation failed for one or both inputs.", "details": errors})
+
+        def validate(helper):
+            chain = helper.get_chain("fused_validation_and_extraction")
+            return helper.invoke_json_chain(
+                chain, required_keys=FUSED_VALIDATION_KEYS, **budget.inputs("fused_validation_and_extraction")
+            )
+
+        return llm_helper.invoke_with_fallback("fused_validation_and_extraction", validate)
+
+    def check_validation(results):
+        fused = results["validation_and_extraction"]
+        errors = ValidationService._collect_errors(
+            fused["resume_validity"], fused["resume_reason"],
+            fused["job_description_validity"], fused["job_description_reason"],
         )
-        return self.llm_helper.invoke_chain(
-            chain, company_name=company_name, job_title=job_title, search_results=formatted_results
+        if errors:
+            raise GateClosed({"error": "Validation failed for one or both inputs.", "details": errors})
+
+    def extract_company_and_job_title(results):
+        fused = results["validation_and_extraction"]
+        company_name, job_title = fused["company_name"].strip(), fused["job_title"].strip()
+        try:
+            LLMHelper.check_company_and_job_title(company_name, job_title)
+        except ValueError as e:
+            raise GateClosed({"error": str(e)})
+        return company_name, job_title
+
+    def analyze(results):
+        chain = llm_helper.get_chain("fused_analysis")
+        return llm_helper.invoke_json_chain(
+            chain, required_keys=FUSED_ANALYSIS_KEYS, **budget.inputs("fused_analysis")
         )
 
+    def analysis_section(section):
+        return Stage(section, lambda results: results["analysis"][section].strip(), depends_on=("analysis",))
+
+    return [
+        # Step 1: Validate inputs and extract the company name and job title in one call
+        Stage("keyword_match", lambda results: keyword_scorer.match(resume_text, job_description)),
+        Stage("validation_and_extraction", validate_and_extract),
+        Stage(
+            "resume_validation",
+            lambda results: (
+                results["validation_and_extraction"]["resume_validity"],
+                results["validation_and_extraction"]["resume_reason"],
+            ),
+            depends_on=("validation_and_extraction",),
+        ),
+        Stage(
+            "job_validation",
+            lambda results: (
+                results["validation_and_extraction"]["job_description_validity"],
+                results["validation_and_extraction"]["job_description_reason"],
+            ),
+            depends_on=("validation_and_extraction",),
+        ),
+        Stage("validation", check_validation, depends_on=("validation_and_extraction",)),
+        Stage(
+            "company_and_job_title",
+            extract_company_and_job_title,
+            depends_on=("validation_and_extraction", "validation"),
+        ),
+
+        # Step 2: Compatibility, suggestions and bullet points in one call
+        Stage("analysis", analyze, depends_on=("validation",)),
+        analysis_section("compatibility_evaluation"),
+        analysis_section("suggestions"),
+        analysis_section("bullet_points"),
+
+        # Step 3: Search and analyze interview insights
+        Stage(
+            "search_results",
+            lambda results: interview_service.search_interview_info(*results["company_and_job_title"]),
+            depends_on=("company_and_job_title",),
+        ),
+        Stage(
+            "interview_insights",
+            lambda results: interview_service.analyze_interview_data(
+                *results["company_and_job_title"], results["search_results"]
+            ),
+            depends_on=("company_and_job_title", "search_results"),
+        ),
+    ]
 
-def run_full_analysis(resume_text, job_description, serp_api_key, openai_api_key):
+
+def build_async_analysis_stages(llm_helper, serp_api_key, resume_text, job_description, budget=None):
     """
-    Combines validation, compatibility analysis, and interview research into a single workflow.
+    Build the stage graph of `build_analysis_stages` with coroutine stages for AsyncStageExecutor,
+    so waiting on the LLM and SERP API holds no threads.
     """
-    llm_helper = LLMHelper(api_key=openai_api_key)
+    if budget is None:
+        budget = BudgetedInputs(get_token_budgeter(), resume_text, job_description)
     validation_service = ValidationService(llm_helper)
     analysis_service = AnalysisService(llm_helper)
     interview_service = InterviewResearchService(llm_helper, serp_api_key)
 
-    # Step 1: Validate inputs
-    errors = validation_service.validate(resume_text, job_description)
-    if errors:
-        return {"error": "Validation failed for one or both inputs.", "details": errors}
+    async def keyword_match(results):
+        return keyword_scorer.match(resume_text, job_description)
+
+    async def validate_resume(results):
+        return await validation_service.avalidate_resume(budget.fit("validate_resume", "resume_text"))
+
+    async def validate_job_description(results):
+        return await validation_service.avalidate_job_description(
+            budget.fit("validate_job_description", "job_description")
+        )
+
+    async def check_validation(results):
+        resume_validity, resume_sufficiency = results["resume_validation"]
+        job_validity, job_sufficiency = results["job_validation"]
+        errors = validation_service._collect_errors(
+            resume_validity, resume_sufficiency, job_validity, job_sufficiency
+        )
+        if errors:
+            raise GateClosed({"error": "Validation failed for one or both inputs.", "details": errors})
+
+    async def evaluate_compatibility(results):
+        return await analysis_service.aevaluate_compatibility(**budget.inputs("compatibility"))
+
+    async def generate_suggestions(results):
+        return await analysis_service.agenerate_suggestions(**budget.inputs("suggestions"))
+
+    async def generate_bullet_points(results):
+        return await analysis_service.agenerate_bullet_points(**budget.inputs("bullet_points"))
+
+    async def extract_company_and_job_title(results):
+        try:
+            return await llm_helper.aextract_company_and_job_title(
+                budget.fit("extract_company_and_job_title", "job_description")
+            )
+        except ValueError as e:
+            raise GateClosed({"error": str(e)})
+
+    async def search_interview_info(results):
+        return await interview_service.asearch_interview_info(*results["company_and_job_title"])
+
+    async def analyze_interview_data(results):
+        return await interview_service.aanalyze_interview_data(
+            *results["company_and_job_title"], results["search_results"]
+        )
+
+    return [
+        # Step 1: Validate inputs
+        Stage("keyword_match", keyword_match),
+        Stage("resume_validation", validate_resume),
+        Stage("job_validation", validate_job_description),
+        Stage("validation", check_validation, depends_on=("resume_validation", "job_validation")),
+
+        # Step 2: Analyze resume-job description compatibility
+        Stage("compatibility_evaluation", evaluate_compatibility, depends_on=("validation",)),
+        Stage("suggestions", generate_suggestions, depends_on=("validation",)),
+        Stage("bullet_points", generate_bullet_points, depends_on=("validation",)),
+
+        # Step 3: Extract company name and job title
+        Stage("company_and_job_title", extract_company_and_job_title, depends_on=("validation",)),
+
+        # Step 4: Search and analyze interview insights
+        Stage("search_results", search_interview_info, depends_on=("company_and_job_title",)),
+        Stage(
+            "interview_insights",
+            analyze_interview_data,
+            depends_on=("company_and_job_title", "search_results"),
+        ),
+    ]
+
+
+@dataclass
+class AnalysisResult:
+    """
+    Structured outcome of analyzing one resume against one job description.
+
+    Keeps the intermediate artifacts (parsed validation, extracted company and job title,
+    compatibility score) so callers can reuse them instead of recomputing them.
+    """
+    error: Optional[str] = None
+    details: List[str] = field(default_factory=list)
+    resume_validation: Optional[Tuple[str, str]] = None
+    job_validation: Optional[Tuple[str, str]] = None
+    company_name: Optional[str] = None
+    job_title: Optional[str] = None
+    compatibility_score: Optional[float] = None
+    keyword_score: Optional[float] = None
+    missing_skills: List[str] = field(default_factory=list)
+    analysis: Dict[str, str] = field(default_factory=dict)
+    search_results: List[dict] = field(default_factory=list)
+    interview_insights: Optional[str] = None
+    tokens_saved: int = 0
+
+    @classmethod
+    def from_stage_results(cls, results):
+        """
+        Build a successful result from completed stage results.
+        """
+        company_name, job_title = results["company_and_job_title"]
+        return cls(
+            resume_validation=results["resume_validation"],
+            job_validation=results["job_validation"],
+            company_name=company_name,
+            job_title=job_title,
+            compatibility_score=AnalysisService.parse_compatibility_score(results["compatibility_evaluation"]),
+            keyword_score=results["keyword_match"]["keyword_score"],
+            missing_skills=results["keyword_match"]["missing_skills"],
+            analysis={
+                "compatibility_evaluation": results["compatibility_evaluation"],
+                "suggestions": results["suggestions"],
+                "bullet_points": results["bullet_points"],
+            },
+            search_results=results["search_results"],
+            interview_insights=results["interview_insights"],
+        )
+
+    @classmethod
+    def from_error(cls, error):
+        """
+        Build a failed result from an error dict such as the one carried by GateClosed.
+        """
+        return cls(error=error["error"], details=error.get("details", []))
+
+    def to_dict(self):
+        """
+        Return the `run_full_analysis` response dict.
+        """
+        if self.error is not None:
+            error = {"error": self.error}
+            if self.details:
+                error["details"] = self.details
+            return error
+
+        return {
+            "validation_results": "Valid inputs.",
+            "analysis": {
+                **self.analysis,
+                "keyword_score": self.keyword_score,
+                "missing_skills": self.missing_skills,
+            },
+            "interview_insights": self.interview_insights,
+            "tokens_saved": self.tokens_saved,
+        }
+
 
-    # Step 2: Analyze resume-job description compatibility
-    analysis_results = analysis_service.analyze(resume_text, job_description)
+def _run_analysis_stages(llm_helper, serp_api_key, resume_text, job_description, resume_validation=None,
+                         fused=False, on_stage_complete=None, budget=None, keyword_match=None):
+    """
+    Execute the analysis stage graph and collect its results into an AnalysisResult.
 
-    # Step 3: Extract company name and job title
-    print("Extracting company name and job title from the job description...")
+    :param on_stage_complete: Optional callback invoked with (name, result) as each stage finishes.
+    :param budget: BudgetedInputs for these texts, e.g. one sharing the resume's fitted texts across a batch.
+    :param keyword_match: Already-computed keyword match to reuse (see `build_analysis_stages`).
+    """
+    if budget is None:
+        budget = BudgetedInputs(get_token_budgeter(), resume_text, job_description)
+    if fused:
+        stages = build_fused_analysis_stages(llm_helper, serp_api_key, resume_text, job_description, budget=budget)
+    else:
+        stages = build_analysis_stages(
+            llm_helper, serp_api_key, resume_text, job_description, resume_validation,
+            budget=budget, keyword_match=keyword_match,
+        )
     try:
-        company_name, job_title = llm_helper.extract_company_and_job_title(job_description)
-    except ValueError as e:
-        # Return the specific error message from the extraction method
-        return {"error": str(e)}
+        results = StageExecutor().run(stages, on_stage_complete=on_stage_complete)
+    except GateClosed as gate:
+        result = AnalysisResult.from_error(gate.result)
+    else:
+        result = AnalysisResult.from_stage_results(results)
 
-    print(f"Extracted Company Name: {company_name}, Job Title: {job_title}")
+    result.tokens_saved = budget.tokens_saved
+    return result
 
-    # Step 4: Search and analyze interview insights
-    search_results = interview_service.search_interview_info(company_name, job_title)
-    interview_insights = interview_service.analyze_interview_data(company_name, job_title, search_results)
 
-    return {
-        "validation_results": "Valid inputs.",
-        "analysis": analysis_results,
-        "interview_insights": interview_insights,
-    }
+@profiled("run_analysis")
+def run_analysis(resume_text, job_description, serp_api_key, openai_api_key, fused=False, llm_helper=None,
+                 on_stage_complete=None):
+    """
+    Run the full workflow and return an AnalysisResult with all intermediate artifacts.
+
+    Independent stages run concurrently: validation gates everything else, after which the
+    analysis chains and the extraction -> SERP search -> interview insights branch run side by side.
+    With `fused`, validation/extraction and the three analysis sections each come from a single JSON call.
+    `on_stage_complete` is called with (name, result) as each stage finishes.
+
+    Concurrent identical analyses (same inputs, keys and mode, e.g. a double-clicked submit or a
+    client retry) share one run, unless a custom `llm_helper` or `on_stage_complete` is passed.
+    """
+    def run():
+        helper = llm_helper if llm_helper is not None else LLMHelper(api_key=openai_api_key)
+        return _run_analysis_stages(
+            helper, serp_api_key, resume_text, job_description, fused=fused, on_stage_complete=on_stage_complete
+        )
+
+    if _analysis_flights is None or llm_helper is not None or on_stage_complete is not None:
+        return run()
+    key = make_cache_key("analysis", resume_text, job_description, serp_api_key, openai_api_key, fused)
+    return _analysis_flights.do(key, run)
+
+
+async def arun_analysis(resume_text, job_description, serp_api_key, openai_api_key, llm_helper=None):
+    """
+    Async counterpart of `run_analysis` for event-loop servers. Every LLM and SERP API call is awaited,
+    so one process can hold many analyses in flight without a thread per analysis.
+    Concurrent identical analyses on the same event loop share one run.
+    """
+    async def run():
+        helper = llm_helper if llm_helper is not None else LLMHelper(api_key=openai_api_key)
+        budget = BudgetedInputs(get_token_budgeter(), resume_text, job_description)
+        stages = build_async_analysis_stages(helper, serp_api_key, resume_text, job_description, budget=budget)
+        try:
+            results = await AsyncStageExecutor().run(stages)
+        except GateClosed as gate:
+            result = AnalysisResult.from_error(gate.result)
+        else:
+            result = AnalysisResult.from_stage_results(results)
+
+        result.tokens_saved = budget.tokens_saved
+        return result
+
+    if _analysis_flights is None or llm_helper is not None:
+        return await run()
+    key = make_cache_key("analysis", resume_text, job_description, serp_api_key, openai_api_key, False)
+    return await _analysis_flights.ado(key, run)
+
+
+@profiled("run_full_analysis")
+def run_full_analysis(resume_text, job_description, serp_api_key, openai_api_key, fused=False):
+    """
+    Combines validation, compatibility analysis, and interview research into a single workflow.
+    Concurrent identical calls share one analysis (see `run_analysis`).
+    """
+    return run_analysis(resume_text, job_description, serp_api_key, openai_api_key, fused=fused).to_dict()
+
+
+def run_batch_analysis(resume_text, job_descriptions, serp_api_key, openai_api_key,
+                       max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_keyword_score=None, job_slot=None):
+    """
+    Analyze one resume against several job descriptions.
+
+    The per-resume work runs once and is shared by every job: validation, tokenizing and skill extraction
+    for the keyword scores, and fitting the resume to each prompt's token budget. Per-job analyses run
+    with at most `max_concurrency` in flight. Results are ranked by compatibility score, highest first.
+    With `min_keyword_score`, jobs whose keyword score falls below it are skipped without any LLM calls.
+    The top-level `tokens_saved` adds the resume validation's savings to every job's.
+
+    :param job_slot: Optional callable returning a context manager that is held while the resume is
+        validated and while each job is analyzed, e.g. `ConcurrencyLimiter.slot`, so a batch holds one
+        analysis slot per job in flight.
+    """
+    job_slot = job_slot if job_slot is not None else nullcontext
+    llm_helper = LLMHelper(api_key=openai_api_key)
+    validation_service = ValidationService(llm_helper)
+
+    # Step 1: Validate the resume once for the whole batch
+    budget = BudgetedInputs(get_token_budgeter(), resume_text, "")
+    with job_slot():
+        resume_validation = validation_service.validate_resume(budget.fit("validate_resume", "resume_text"))
+    resume_validity, resume_sufficiency = resume_validation
+    errors = validation_service._collect_errors(resume_validity, resume_sufficiency, "Yes", "Sufficient")
+    if errors:
+        return {"error": "Validation failed for the resume.", "details": errors}
+
+    # Step 2: Score every job locally in one vectorized pass
+    keyword_matches = keyword_scorer.match_many(resume_text, job_descriptions)
+
+    # Step 3: Fan out the per-job analyses, skipping jobs below the keyword threshold
+    def analyze_job(job):
+        job_description, keyword_match = job
+        keyword_score = keyword_match["keyword_score"]
+        if min_keyword_score is not None and keyword_score < min_keyword_score:
+            return AnalysisResult(
+                error=f"Skipped: keyword match score {keyword_score:.3f} is below {min_keyword_score}.",
+                keyword_score=keyword_score,
+                missing_skills=keyword_match["missing_skills"],
+            )
+        with job_slot():
+            result = _run_analysis_stages(
+                llm_helper, serp_api_key, resume_text, job_description, resume_validation,
+                budget=budget.for_job_description(job_description), keyword_match=keyword_match,
+            )
+        # Jobs that fail validation still report their keyword match
+        result.keyword_score, result.missing_skills = keyword_match["keyword_score"], keyword_match["missing_skills"]
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        job_results = list(pool.map(analyze_job, zip(job_descriptions, keyword_matches)))
+
+    # Step 4: Rank by compatibility score (jobs that failed or have no score go last)
+    ranked = []
+    for index, result in enumerate(job_results):
+        ranked.append({
+            "job_index": index,
+            "compatibility_score": result.compatibility_score,
+            "keyword_score": result.keyword_score,
+            "company_name": result.company_name,
+            "job_title": result.job_title,
+            "results": result.to_dict(),
+        })
+    ranked.sort(key=lambda item: (
+        item["compatibility_score"] is None,
+        -(item["compatibility_score"] or 0),
+        -(item["keyword_score"] or 0),
+    ))
+
+    tokens_saved = budget.tokens_saved + sum(result.tokens_saved for result in job_results)
+    return {"validation_results": "Valid resume.", "ranked_results": ranked, "tokens_saved": tokens_saved}
+
+
+def summarize_stage_result(name, result):
+    """
+    Return the client-facing data for a finished stage, or None for internal stages
+    (used for streamed events and background job progress).
+    """
+    if name == "validation":
+        return "Valid inputs."
+    if name == "company_and_job_title":
+        company_name, job_title = result
+        return {"company_name": company_name, "job_title": job_title}
+    if name in STREAMED_SECTIONS:
+        return result
+    return None
+
+
+def stream_full_analysis(resume_text, job_description, serp_api_key, openai_api_key, stream_tokens=False,
+                         on_finish=None):
+    """
+    Run the same workflow as `run_full_analysis`, yielding each section as soon as it is ready.
+
+    Yields event dicts of the form {"event": <section>, "data": <value>}. With `stream_tokens`,
+    the suggestions and interview insights are also yielded chunk by chunk as
+    {"event": "token", "section": <section>, "data": <chunk>}. The stream ends with either an
+    "error" event carrying the usual error dict or a "done" event carrying the full results.
+
+    The analysis starts right away on a background thread. Closing the returned generator cancels it:
+    no further stages (or streamed tokens) are started. `on_finish` is called once the background
+    thread is done, so resources such as a concurrency slot can be held until no work is left.
+    """
+    llm_helper = LLMHelper(api_key=openai_api_key)
+    events = queue.Queue()
+    cancelled = threading.Event()
+
+    def on_token(section, chunk):
+        # Raising stops the streamed model call as well as the stage it belongs to
+        if cancelled.is_set():
+            raise PipelineCancelled()
+        events.put({"event": "token", "section": section, "data": chunk})
+
+    def on_stage_complete(name, result):
+        data = summarize_stage_result(name, result)
+        if data is not None:
+            events.put({"event": name, "data": data})
+
+    def run():
+        budget = BudgetedInputs(get_token_budgeter(), resume_text, job_description)
+        stages = build_analysis_stages(
+            llm_helper, serp_api_key, resume_text, job_description,
+            on_token=on_token if stream_tokens else None, budget=budget,
+        )
+        try:
+            results = StageExecutor().run(stages, on_stage_complete=on_stage_complete, cancel_event=cancelled)
+            result = AnalysisResult.from_stage_results(results)
+            result.tokens_saved = budget.tokens_saved
+            events.put({"event": "done", "data": result.to_dict()})
+        except GateClosed as gate:
+            events.put({"event": "error", "data": gate.result})
+        except Exception as e:
+            if cancelled.is_set():
+                logger.info("Streamed analysis cancelled after the client went away")
+            else:
+                events.put({"event": "error", "data": {"error": f"Analysis error:\n{str(e)}"}})
+        finally:
+            if on_finish is not None:
+                on_finish()
+
+    def stream_events():
+        try:
+            while True:
+                event = events.get()
+                yield event
+                if event["event"] in ("done", "error"):
+                    # The stream ends once the analysis has finished, `on_finish` included
+                    worker.join()
+                    return
+        finally:
+            # Runs on GeneratorExit too, i.e. when the client disconnects mid-stream
+            cancelled.set()
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    return stream_events()
@@ -0,0 +1,164 @@
+import asyncio
+import contextvars
+import inspect
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from app.metrics import STAGE_DURATION, timed
+from app.profiling import profile_span
+
+# Constants
+DEFAULT_MAX_WORKERS = 4
+
+
+class GateClosed(Exception):
+    """
+    Raised by a stage to stop the pipeline early with a final result.
+    Stages that have not started yet are cancelled.
+    """
+
+    def __init__(self, result):
+        super().__init__(result)
+        self.result = result
+
+
+class PipelineCancelled(Exception):
+    """
+    Raised when a pipeline's cancel event is set, e.g. because the client reading its results went away.
+    """
+
+
+class Stage:
+    """
+    A named unit of work in the analysis pipeline and the stages it depends on.
+
+    The stage function receives a dict mapping each dependency name to its result.
+    """
+
+    def __init__(self, name, func, depends_on=()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+
+class StageExecutor:
+    """
+    Runs a dependency graph of stages, starting each stage as soon as its dependencies have finished.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+
+    def run(self, stages, on_stage_complete=None, cancel_event=None):
+        """
+        Run all stages and return a dict mapping stage names to their results.
+        The first failing stage (or closed gate) cancels every stage that has not started yet.
+
+        :param on_stage_complete: Optional callback invoked with (name, result) as each stage finishes.
+        :param cancel_event: Optional threading.Event; once it is set, no further stages are started, the
+            running ones are waited for, and PipelineCancelled is raised.
+        """
+        pending = {stage.name: stage for stage in stages}
+        _check_dependencies(pending)
+
+        results = {}
+        running = {}
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or running:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise PipelineCancelled()
+                for name, stage in list(pending.items()):
+                    if all(dependency in results for dependency in stage.depends_on):
+                        inputs = {dependency: results[dependency] for dependency in stage.depends_on}
+                        # Copy the caller's context so stages see e.g. the request being profiled
+                        context = contextvars.copy_context()
+                        running[pool.submit(context.run, _run_stage, stage, inputs)] = name
+                        del pending[name]
+
+                if not running:
+                    raise ValueError(f"Stages have unresolvable dependencies: {', '.join(pending)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    if on_stage_complete is not None:
+                        on_stage_complete(name, results[name])
+        finally:
+            # Don't start work whose result can no longer be used, nor wait on it unless the pipeline was
+            # cancelled: then the caller holds resources (e.g. a concurrency slot) until its stages are done
+            cancelled = cancel_event is not None and cancel_event.is_set()
+            pool.shutdown(wait=not running or cancelled, cancel_futures=True)
+
+        return results
+
+
+class AsyncStageExecutor:
+    """
+    Runs the same dependency graph of stages on the running event loop.
+
+    Coroutine stage functions are awaited, so stages waiting on I/O hold no threads;
+    plain functions run in the default thread pool so they cannot block the loop.
+    """
+
+    async def run(self, stages, on_stage_complete=None):
+        """
+        Run all stages and return a dict mapping stage names to their results.
+        The first failing stage (or closed gate) cancels every stage that is still running.
+
+        :param on_stage_complete: Optional callback invoked with (name, result) as each stage finishes.
+        """
+        pending = {stage.name: stage for stage in stages}
+        _check_dependencies(pending)
+
+        results = {}
+        running = {}
+        try:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if all(dependency in results for dependency in stage.depends_on):
+                        inputs = {dependency: results[dependency] for dependency in stage.depends_on}
+                        running[asyncio.ensure_future(self._run_stage(stage, inputs))] = name
+                        del pending[name]
+
+                if not running:
+                    raise ValueError(f"Stages have unresolvable dependencies: {', '.join(pending)}")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    results[name] = task.result()
+                    if on_stage_complete is not None:
+                        on_stage_complete(name, results[name])
+        finally:
+            # Don't keep working on results that can no longer be used
+            for task in running:
+                task.cancel()
+
+        return results
+
+    @staticmethod
+    async def _run_stage(stage, inputs):
+        if not inspect.iscoroutinefunction(stage.func):
+            return await asyncio.to_thread(_run_stage, stage, inputs)
+        with timed(STAGE_DURATION, stage=stage.name), profile_span(stage.name):
+            return await stage.func(inputs)
+
+
+def _run_stage(stage, inputs):
+    """
+    Run a stage function, recording its duration (and its span, if the request is being profiled).
+    """
+    with timed(STAGE_DURATION, stage=stage.name), profile_span(stage.name):
+        return stage.func(inputs)
+
+
+def _check_dependencies(stages_by_name):
+    """
+    Ensure every declared dependency refers to a known stage.
+    """
+    for stage in stages_by_name.values():
+        unknown = [dependency for dependency in stage.depends_on if dependency not in stages_by_name]
+        if unknown:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {', '.join(unknown)}")
+
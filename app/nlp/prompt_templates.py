@@ -143,3 +143,56 @@ Clarifications (if applicable): [Suggestions or clarifications]
 """
 
 
+
+
+# Fused Validation and Extraction Template (JSON output)
+FUSED_VALIDATION_AND_EXTRACTION_TEMPLATE = """
+Evaluate the resume and job description below, then extract the company name and job title from the job description.
+
+Criteria:
+1. Valid Resume: Should include essential sections, such as experience, education, and skills. Partial validity can apply if key sections (e.g., experience) are present but others (e.g., skills) are missing.
+2. Sufficient Resume: Should explicitly state key qualifications, roles, achievements, or other details relevant for assessing compatibility with a job description.
+3. Valid Job Description: Should clearly describe responsibilities, qualifications, required skills, and expectations for the role.
+4. Sufficient Job Description: Should include specific details describing the role's key requirements, tasks, and qualifications.
+5. Company Name and Job Title: If either cannot be explicitly identified, return "Unknown" for it. Do not guess.
+
+Resume:
+{resume_text}
+
+Job Description:
+{job_description}
+
+Respond with a single JSON object and nothing else, using exactly these keys:
+{{
+  "resume_validity": "Yes" | "Partial" | "No",
+  "resume_sufficiency": "Sufficient" | "Insufficient",
+  "resume_reason": "[Reason or Missing Elements]",
+  "job_description_validity": "Yes" | "No",
+  "job_description_sufficiency": "Sufficient" | "Partially Insufficient" | "Insufficient",
+  "job_description_reason": "[Reason or Missing Elements]",
+  "company_name": "[Company Name or Unknown]",
+  "job_title": "[Job Title or Unknown]"
+}}
+"""
+
+# Fused Compatibility, Suggestions and Bullet Points Template (JSON output)
+FUSED_ANALYSIS_TEMPLATE = """
+Analyze the given resume against the job description and produce three sections.
+
+1. Compatibility Evaluation: Evaluate compatibility on a scale from 1 to 10, considering direct alignment with the explicit requirements, transferable skills, and structural issues in the resume.
+2. Suggestions: Provide actionable and specific suggestions that address key misalignments, including meta-role suggestions on tone or format if relevant. Do not recommend changes for areas that are already aligned.
+3. Bullet Points: Generate three concise, result-oriented resume bullet points aligned with the key requirements of the job description, using quantitative language wherever possible.
+
+Resume:
+{resume_text}
+
+Job Description:
+{job_description}
+
+Respond with a single JSON object and nothing else, using exactly these keys (each value is a string):
+{{
+  "compatibility_evaluation": "1. Compatibility Score: [1-10] \\n [Specific reasoning for the score]\\n2. Strengths: [...]\\n3. Weaknesses: [...]",
+  "suggestions": "Actionable Suggestions:\\n1. [Suggestion 1] - [Reason tied to job description]\\n2. [...]",
+  "bullet_points": "- [Bullet Point 1: Action - Impact - Result]\\n- [Bullet Point 2]\\n- [Bullet Point 3]"
+}}
+"""
@@ -0,0 +1,143 @@
+import re
+
+from app.cache import build_refreshing_cache, make_cache_key
+from app.metrics import cache_metric_families, get_metrics_registry
+
+# Constants
+DEFAULT_SERP_API_URL = "https://serpapi.com/search.json"
+DEFAULT_RESEARCH_TTL = 7 * 24 * 60 * 60  # seconds SERP results stay fresh
+DEFAULT_RESEARCH_STALE_TTL = 7 * 24 * 60 * 60  # further seconds stale results are served while refreshed
+DEFAULT_RESEARCH_MAX_ENTRIES = 2048
+
+# Legal-entity suffixes ignored when comparing company names ("Acme, Inc." == "acme")
+COMPANY_SUFFIX_PATTERN = r"(\s+(inc|incorporated|llc|ltd|limited|corp|corporation|co|company|plc|gmbh|ag|sa))+$"
+
+# Whole-name company aliases, applied after normalization
+COMPANY_ALIASES = {
+    "alphabet": "google",
+    "google llc": "google",
+    "facebook": "meta",
+    "meta platforms": "meta",
+    "aws": "amazon web services",
+    "msft": "microsoft",
+    "ibm corporation": "ibm",
+}
+
+# Word-level job title aliases, applied after normalization
+TITLE_ALIASES = {
+    "sr": "senior",
+    "snr": "senior",
+    "jr": "junior",
+    "swe": "software engineer",
+    "sde": "software engineer",
+    "eng": "engineer",
+    "engr": "engineer",
+    "dev": "developer",
+    "mgr": "manager",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+}
+
+
+def normalize_text(text):
+    """
+    Lowercase the text, drop punctuation other than characters that carry meaning in names
+    (e.g. "C++", "C#", "AT&T") and collapse whitespace.
+    """
+    text = re.sub(r"[^\w\s+#&]", " ", (text or "").lower())
+    return " ".join(text.split())
+
+
+def normalize_company(company_name):
+    """
+    Normalize a company name so spelling variants of the same company share cache entries.
+    """
+    name = re.sub(COMPANY_SUFFIX_PATTERN, "", normalize_text(company_name))
+    return COMPANY_ALIASES.get(name, name)
+
+
+def normalize_job_title(job_title):
+    """
+    Normalize a job title, expanding common abbreviations ("Sr. SWE" == "senior software engineer").
+    """
+    return " ".join(TITLE_ALIASES.get(word, word) for word in normalize_text(job_title).split())
+
+
+def research_cache_key(kind, company_name, job_title, *parts):
+    """
+    Build the cache key for a (company, job title) lookup.
+
+    :param kind: What is cached, e.g. "serp" or "interview_insights".
+    :param parts: Anything else the cached value depends on (model, prompt template).
+    """
+    return make_cache_key(kind, normalize_company(company_name), normalize_job_title(job_title), *parts)
+
+
+_serp_api_url = DEFAULT_SERP_API_URL
+
+
+def configure_serp_api(url=DEFAULT_SERP_API_URL):
+    """
+    Set the SERP API endpoint (e.g. a local stub for offline benchmarks).
+    """
+    global _serp_api_url
+    _serp_api_url = url
+
+
+def get_serp_api_url():
+    """
+    Return the SERP API endpoint.
+    """
+    return _serp_api_url
+
+
+# Process-wide caches for SERP results and analyzed interview insights
+_search_cache = build_refreshing_cache(
+    max_entries=DEFAULT_RESEARCH_MAX_ENTRIES, ttl=DEFAULT_RESEARCH_TTL, stale_ttl=DEFAULT_RESEARCH_STALE_TTL
+)
+_insights_cache = None
+
+
+def configure_research_cache(enabled=True, ttl=DEFAULT_RESEARCH_TTL, stale_ttl=DEFAULT_RESEARCH_STALE_TTL,
+                             max_entries=DEFAULT_RESEARCH_MAX_ENTRIES, path=None, cache_insights=False):
+    """
+    Replace the process-wide interview research caches.
+
+    :param enabled: When False, every analysis calls the SERP API.
+    :param ttl: Seconds cached results stay fresh.
+    :param stale_ttl: Further seconds stale results are served while a background refresh runs.
+    :param max_entries: Maximum number of (company, job title) pairs kept per cache tier.
+    :param path: Optional SQLite database path so results are shared across worker processes.
+    :param cache_insights: Also cache the LLM's interview insights per (company, job title).
+    """
+    global _search_cache, _insights_cache
+    if not enabled:
+        _search_cache = _insights_cache = None
+        return
+    options = {"max_entries": max_entries, "ttl": ttl, "stale_ttl": stale_ttl}
+    _search_cache = build_refreshing_cache(path=path, **options)
+    _insights_cache = build_refreshing_cache(path=path, **options) if cache_insights else None
+
+
+def get_search_cache():
+    """
+    Return the process-wide SERP results cache, or None if it is disabled.
+    """
+    return _search_cache
+
+
+def get_insights_cache():
+    """
+    Return the process-wide interview insights cache, or None if it is disabled.
+    """
+    return _insights_cache
+
+
+def _collect_metrics():
+    """
+    Report the research cache counters at scrape time.
+    """
+    return cache_metric_families({"serp": _search_cache, "interview_insights": _insights_cache})
+
+
+get_metrics_registry().register_collector(_collect_metrics)
@@ -0,0 +1,217 @@
+import email.utils
+import random
+import threading
+import time
+
+import httpx
+import openai
+
+# Constants
+DEFAULT_RPM_LIMIT = 0  # requests per minute per API key and model; 0 disables the limit
+DEFAULT_TPM_LIMIT = 0  # tokens per minute per API key and model; 0 disables the limit
+DEFAULT_EXPECTED_OUTPUT_TOKENS = 500  # reserved per call until the response reports its real usage
+DEFAULT_LLM_MAX_RETRIES = 3
+DEFAULT_RETRY_BASE_DELAY = 1.0  # seconds before the first retry, doubled on each further attempt
+DEFAULT_RETRY_MAX_DELAY = 30.0  # upper bound on a single backoff
+RETRY_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+NON_RETRYABLE_ERROR_CODES = ("insufficient_quota",)  # 429s that waiting will not fix
+
+
+class TokenBucket:
+    """
+    A token bucket that refills continuously up to `capacity`.
+
+    Callers reserve what they need up front, and the bucket may go into debt. The returned delay is
+    how long the caller must wait before its reservation is covered, so waiting callers are served
+    in order and the caller chooses how to sleep (`time.sleep` or `asyncio.sleep`).
+    """
+
+    def __init__(self, capacity, refill_per_second):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._level = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """
+        Take `amount` (at most the capacity) from the bucket and return the seconds to wait before using it.
+        """
+        with self._lock:
+            self._refill()
+            self._level -= min(amount, self.capacity)
+            return max(-self._level / self.refill_per_second, 0.0)
+
+    def refund(self, amount):
+        """
+        Return (or, with a negative amount, take) tokens after the real cost of a call is known.
+        """
+        with self._lock:
+            self._refill()
+            self._level = min(self._level + amount, self.capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._level = min(self._level + (now - self._updated) * self.refill_per_second, self.capacity)
+        self._updated = now
+
+
+class RateLimiter:
+    """
+    Client-side requests-per-minute and tokens-per-minute budget for one API key and model.
+
+    Each call reserves one request and its estimated tokens before it is sent, so a process stays
+    under its quota instead of discovering it through 429s. When the API does answer 429, `pause`
+    holds every caller back until the server's Retry-After has passed.
+    """
+
+    def __init__(self, rpm=DEFAULT_RPM_LIMIT, tpm=DEFAULT_TPM_LIMIT):
+        self.requests = TokenBucket(rpm, rpm / 60) if rpm else None
+        self.tokens = TokenBucket(tpm, tpm / 60) if tpm else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens):
+        """
+        Reserve one request and `tokens` tokens, and return the seconds to wait before sending it.
+        """
+        delays = [self._paused_until - time.monotonic()]
+        if self.requests is not None:
+            delays.append(self.requests.reserve(1))
+        if self.tokens is not None:
+            delays.append(self.tokens.reserve(tokens))
+        return max(max(delays), 0.0)
+
+    def settle(self, reserved_tokens, used_tokens):
+        """
+        Correct a reservation once the tokens a call actually used are known: the response's reported usage,
+        or 0 for an attempt that failed. With `used_tokens` None (usage not reported) the estimate stands.
+        """
+        if self.tokens is not None and used_tokens is not None:
+            self.tokens.refund(reserved_tokens - used_tokens)
+
+    def pause(self, seconds):
+        """
+        Hold back every call through this limiter for `seconds`, e.g. after a 429 with Retry-After.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, honoring the server's Retry-After when it asks for longer.
+    """
+
+    def __init__(self, max_retries=DEFAULT_LLM_MAX_RETRIES, base_delay=DEFAULT_RETRY_BASE_DELAY,
+                 max_delay=DEFAULT_RETRY_MAX_DELAY):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, error, attempt):
+        """
+        Whether a failed attempt (0-based) should be retried.
+        """
+        return attempt < self.max_retries and is_retryable(error)
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Seconds to wait before retrying after a failed attempt (0-based).
+        """
+        backoff = random.uniform(0, min(self.base_delay * 2 ** attempt, self.max_delay))
+        return max(backoff, retry_after or 0.0)
+
+
+def is_retryable(error):
+    """
+    Whether an error from an LLM call is transient: a timeout, a dropped connection,
+    a rate limit (other than an exhausted quota) or a server error.
+    """
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, httpx.TimeoutException, TimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        if getattr(error, "code", None) in NON_RETRYABLE_ERROR_CODES:
+            return False
+        return error.status_code in RETRY_STATUS_CODES
+    return False
+
+
+def is_rate_limit(error):
+    return isinstance(error, openai.RateLimitError)
+
+
+def retry_after(error):
+    """
+    Return the seconds an error response asked the client to wait (Retry-After / retry-after-ms), or None.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class ThrottleRegistry:
+    """
+    Process-wide rate limiters, one per (API key, model), since OpenAI quotas apply per model.
+    """
+
+    def __init__(self, rpm=DEFAULT_RPM_LIMIT, tpm=DEFAULT_TPM_LIMIT):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def get_limiter(self, api_key, model):
+        key = (api_key, model)
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = self._limiters[key] = RateLimiter(rpm=self.rpm, tpm=self.tpm)
+            return limiter
+
+
+_throttle_registry = ThrottleRegistry()
+_retry_policy = RetryPolicy()
+
+
+def configure_llm_resilience(rpm=DEFAULT_RPM_LIMIT, tpm=DEFAULT_TPM_LIMIT, max_retries=DEFAULT_LLM_MAX_RETRIES,
+                             base_delay=DEFAULT_RETRY_BASE_DELAY, max_delay=DEFAULT_RETRY_MAX_DELAY):
+    """
+    Replace the process-wide LLM rate limits and retry policy.
+
+    :param rpm: Requests per minute allowed per API key and model (0 for no limit).
+    :param tpm: Tokens per minute allowed per API key and model (0 for no limit).
+    :param max_retries: Retries of a failed LLM call before its stage fails.
+    :param base_delay: Seconds of backoff before the first retry, doubled on each further attempt.
+    :param max_delay: Upper bound on a single backoff, unless the server's Retry-After is longer.
+    """
+    global _throttle_registry, _retry_policy
+    _throttle_registry = ThrottleRegistry(rpm=rpm, tpm=tpm)
+    _retry_policy = RetryPolicy(max_retries=max_retries, base_delay=base_delay, max_delay=max_delay)
+
+
+def get_throttle_registry():
+    """
+    Return the process-wide LLM rate limiters.
+    """
+    return _throttle_registry
+
+
+def get_retry_policy():
+    """
+    Return the process-wide LLM retry policy.
+    """
+    return _retry_policy
@@ -0,0 +1,358 @@
+import cProfile
+import contextvars
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+from flask import make_response, request
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), "resume-tailor-profiles")
+DEFAULT_MAX_PROFILES = 100  # oldest profiles are deleted beyond this many
+PROFILE_HEADER = "X-Profile"
+AUTHORIZATION_HEADER = "Authorization"
+REQUEST_ID_HEADER = "X-Request-ID"
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+TOP_FUNCTIONS = 30
+TIMELINE_WIDTH = 40
+
+# From Python 3.12 cProfile is built on sys.monitoring: one profiler sees every thread, and only one
+# may be active in the process at a time. Before that, each thread needs its own profiler.
+PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+_current_profile = contextvars.ContextVar("current_profile", default=None)
+_profiler_lock = threading.Lock()
+_no_span = nullcontext()
+
+
+class RequestProfile:
+    """
+    The profile of one request: a cProfile of its work and the wall-clock span of each stage.
+    """
+
+    def __init__(self, request_id, name):
+        self.request_id = request_id
+        self.name = name
+        self.started_at = time.time()
+        self.duration = None
+        self.spans = []  # dicts with name, start and end (seconds since the profile started) and thread
+        self.cpu_profile_note = None
+        self._start = time.perf_counter()
+        self._owner_thread = threading.get_ident()
+        self._profiler = None
+        self._thread_profilers = []
+        self._holds_lock = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Start profiling the calling thread (and, from Python 3.12, every other thread as well).
+        """
+        if PROCESS_WIDE_PROFILER:
+            if not _profiler_lock.acquire(blocking=False):
+                self.cpu_profile_note = "skipped: another request was being profiled"
+                return
+            self._holds_lock = True
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            self._profiler = profiler
+        except ValueError as e:  # another profiling tool (e.g. a debugger or coverage) is active
+            self.cpu_profile_note = f"skipped: {e}"
+            self._release_lock()
+
+    def stop(self):
+        self.duration = time.perf_counter() - self._start
+        if self._profiler is not None:
+            self._profiler.disable()
+        self._release_lock()
+
+    def _release_lock(self):
+        if self._holds_lock:
+            self._holds_lock = False
+            _profiler_lock.release()
+
+    @contextmanager
+    def span(self, name):
+        """
+        Record the wall-clock time of a block. On Python versions where profilers are per thread,
+        blocks running on other threads (pipeline stages) are profiled separately and merged in.
+        """
+        thread_profiler = None
+        if not PROCESS_WIDE_PROFILER and self._profiler is not None and threading.get_ident() != self._owner_thread:
+            thread_profiler = cProfile.Profile()
+            thread_profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            if thread_profiler is not None:
+                thread_profiler.disable()
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "start": start - self._start,
+                    "end": end - self._start,
+                    "thread": threading.current_thread().name,
+                })
+                if thread_profiler is not None:
+                    self._thread_profilers.append(thread_profiler)
+
+    def stats(self):
+        """
+        Return the merged pstats.Stats of every profiler, or None if nothing was profiled.
+        """
+        profilers = [profiler for profiler in [self._profiler, *self._thread_profilers] if profiler is not None]
+        if not profilers:
+            return None
+        return pstats.Stats(*profilers, stream=io.StringIO())
+
+    def summary(self, stats=None):
+        """
+        Return a JSON-serializable summary: the stage timeline and the functions with the most cumulative time.
+        """
+        spans = sorted(self.spans, key=lambda span: span["start"])
+        return {
+            "request_id": self.request_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "cpu_profile": stats is not None,
+            "cpu_profile_note": self.cpu_profile_note,
+            "stages": [{**span, "duration": span["end"] - span["start"]} for span in spans],
+            "timeline": format_timeline(spans, self.duration),
+            "top_functions": top_functions(stats) if stats is not None else [],
+        }
+
+
+def format_timeline(spans, duration, width=TIMELINE_WIDTH):
+    """
+    Render spans as text bars on a shared time axis, e.g. `compatibility   0.210s  1.032s |   #####   |`.
+    """
+    scale = width / duration if duration else 0
+    lines = []
+    for span in spans:
+        first = min(int(span["start"] * scale), width - 1)
+        last = max(min(int(span["end"] * scale), width), first + 1)
+        bar = " " * first + "#" * (last - first) + " " * (width - last)
+        lines.append(f"{span['name']:<32}{span['start']:8.3f}s{span['end'] - span['start']:8.3f}s |{bar}|")
+    return lines
+
+
+def top_functions(stats, limit=TOP_FUNCTIONS):
+    """
+    Return the functions with the most cumulative time, as dicts with call counts and times in seconds.
+    """
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": pstats.func_std_string(function),
+            "calls": calls,
+            "total_time": total_time,
+            "cumulative_time": cumulative_time,
+        }
+        for function, (_, calls, total_time, cumulative_time, _) in rows
+    ]
+
+
+class Profiler:
+    """
+    Decides which requests are profiled and stores their profiles on local disk by request ID.
+
+    Each profile is saved as `<request_id>.prof` (cProfile data, readable with pstats or snakeviz)
+    and `<request_id>.json` (the stage timeline and top functions).
+    """
+
+    def __init__(self, enabled=False, header_enabled=False, directory=DEFAULT_PROFILE_DIR,
+                 max_profiles=DEFAULT_MAX_PROFILES, access_token=None):
+        """
+        :param enabled: Profile every request.
+        :param header_enabled: Profile requests that send an `X-Profile: true` header along with the access token.
+        :param directory: Where profiles are stored.
+        :param max_profiles: Number of profiles kept; the oldest are deleted first.
+        :param access_token: Bearer token required to request and read profiles. Without one, header-triggered
+            profiling is off and stored profiles are never served.
+        """
+        self.enabled = enabled
+        self.header_enabled = header_enabled
+        self.access_token = access_token
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    @property
+    def available(self):
+        """
+        Whether any request can be profiled, i.e. whether stored profiles may be served.
+        """
+        return self.enabled or self.header_enabled
+
+    def authorized(self, headers):
+        """
+        Whether the request carries the access token as an `Authorization: Bearer <token>` header.
+        """
+        if not self.access_token:
+            return False
+        scheme, _, token = headers.get(AUTHORIZATION_HEADER, "").partition(" ")
+        if scheme.lower() != "bearer":
+            return False
+        return hmac.compare_digest(token.strip().encode(), self.access_token.encode())
+
+    def should_profile(self, headers):
+        if self.enabled:
+            return True
+        if not self.header_enabled or headers.get(PROFILE_HEADER, "").lower() not in ("1", "true", "yes"):
+            return False
+        return self.authorized(headers)
+
+    @contextmanager
+    def profile(self, name, request_id=None):
+        """
+        Profile the block as one request, including pipeline stages it runs on other threads, and save it.
+        """
+        session = RequestProfile(request_id or uuid.uuid4().hex, name)
+        token = _current_profile.set(session)
+        session.start()
+        try:
+            with session.span(name):
+                yield session
+        finally:
+            session.stop()
+            _current_profile.reset(token)
+            self.save(session)
+
+    def save(self, session):
+        """
+        Write a finished profile to the profile directory. Failures are logged, never raised.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stats = session.stats()
+            if stats is not None:
+                stats.dump_stats(self._path(session.request_id, ".prof"))
+            with open(self._path(session.request_id, ".json"), "w", encoding="utf-8") as file:
+                json.dump(session.summary(stats), file, indent=2)
+            self._prune()
+        except OSError as e:
+            logger.warning("Could not save the profile of request %s: %s", session.request_id, e)
+        else:
+            logger.info("Saved the profile of request %s (%.3fs)", session.request_id, session.duration)
+
+    def load_summary(self, request_id):
+        """
+        Return the stored summary of a request's profile, or None if there is none.
+        """
+        path = self.path(request_id, ".json")
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def path(self, request_id, extension):
+        """
+        Return the path of a stored profile file, or None for a malformed request ID.
+        """
+        if not REQUEST_ID_PATTERN.match(request_id):
+            return None
+        return self._path(request_id, extension)
+
+    def _path(self, request_id, extension):
+        return os.path.join(self.directory, request_id + extension)
+
+    def _prune(self):
+        summaries = [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")
+        ]
+        if len(summaries) <= self.max_profiles:
+            return
+        summaries.sort(key=os.path.getmtime)
+        for summary in summaries[:len(summaries) - self.max_profiles]:
+            for path in (summary, summary[:-len(".json")] + ".prof"):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+
+_profiler = Profiler()
+
+
+def configure_profiling(enabled=False, header_enabled=False, directory=DEFAULT_PROFILE_DIR,
+                        max_profiles=DEFAULT_MAX_PROFILES, access_token=None):
+    """
+    Replace the process-wide profiler settings.
+    """
+    global _profiler
+    _profiler = Profiler(
+        enabled=enabled, header_enabled=header_enabled, directory=directory, max_profiles=max_profiles,
+        access_token=access_token,
+    )
+
+
+def get_profiler():
+    """
+    Return the process-wide profiler.
+    """
+    return _profiler
+
+
+def profile_span(name):
+    """
+    Record a block as a span of the request being profiled on this context, if any.
+    Returns a shared no-op context manager when nothing is being profiled.
+    """
+    session = _current_profile.get()
+    if session is None:
+        return _no_span
+    return session.span(name)
+
+
+def profiled(name):
+    """
+    Decorate a function so it shows up as a span of the request being profiled, or, when profiling
+    is enabled for every request, so calls made outside a profiled request are profiled on their own.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            session = _current_profile.get()
+            if session is not None:
+                with session.span(name):
+                    return func(*args, **kwargs)
+            if _profiler.enabled:
+                with _profiler.profile(name):
+                    return func(*args, **kwargs)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profile_view(view):
+    """
+    Decorate a Flask view so requests selected by the profiler are profiled. The profile's request ID
+    is generated on the server, so a client cannot overwrite another request's profile, and is returned
+    in the `X-Request-ID` response header.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _profiler.should_profile(request.headers):
+            return view(*args, **kwargs)
+
+        with _profiler.profile(view.__name__) as session:
+            response = make_response(view(*args, **kwargs))
+        response.headers[REQUEST_ID_HEADER] = session.request_id
+        return response
+    return wrapper
@@ -1,14 +1,25 @@
-from flask import Blueprint, request, jsonify
-from app.nlp.model import run_full_analysis
-from app.utils import allowed_file, parse_resume
-from api_keys.keys import OPENAI_API_KEY, SERP_API_KEY
-from app.nlp.model import LLMHelper  # Assuming LLMHelper is accessible here
+import asyncio
+import base64
+import json
+import io
+import pstats
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, url_for
+from app.concurrency import Overloaded, get_concurrency_limiter
+from app.jobs import ANALYSIS_JOB, get_job_queue
+from app.nlp.model import arun_analysis, run_analysis, run_batch_analysis, stream_full_analysis
+from app.profiling import get_profiler, profile_view
+from app.utils import allowed_file, parse_resume, read_file_bytes
+from config.keys import OPENAI_API_KEY, SERP_API_KEY
 
 # Define a Blueprint for routes
 resume_tailor_bp = Blueprint('resume', __name__)
 
+# Upper bound on job descriptions accepted by a single batch request
+MAX_BATCH_JOB_DESCRIPTIONS = 50
+
 
 @resume_tailor_bp.route('/resume/upload', methods=['POST'])
+@profile_view
 def upload_and_generate_response():
     """
     Upload a resume, parse its content, and analyze it against the job description.
@@ -22,59 +33,235 @@ def upload_and_generate_response():
         job_description = get_job_description()
 
         # Step 3: Parse the resume to extract text content
-        try:
-            resume_text = parse_resume(uploaded_file)
+        resume_text = get_resume_text(uploaded_file)
 
-            if not resume_text.strip():
-                raise ValueError(
-                    "The uploaded resume is empty or could not be parsed.\n"
-                    "Please upload a valid file."
+        # Step 4: Run the analysis
+        with get_concurrency_limiter().slot():
+            try:
+                result = run_analysis(
+                    resume_text=resume_text,
+                    job_description=job_description,
+                    serp_api_key=SERP_API_KEY,
+                    openai_api_key=OPENAI_API_KEY,
+                    fused=current_app.config.get('FUSED_ANALYSIS', False)
                 )
+            except Exception as analysis_error:
+                raise ValueError(f"Analysis error:\n{str(analysis_error)}")
 
-        except Exception as parse_error:
-            raise ValueError(f"Failed to parse the resume:\n{str(parse_error)}")
+        # Step 5: Return analysis results
+        return analysis_response(result)
 
-        # Step 4: Run the analysis
+    # Handle overload, validation or unexpected errors
+    except Overloaded as overloaded:
+        return overloaded_response(overloaded)
+    except ValueError as ve:
+        return jsonify({"error": str(ve).replace("\n", "<br>")}), 400
+    except Exception as e:
+        return jsonify({"error": f"Unexpected error:\n{str(e).replace('\n', '<br>')}"}), 500
+
+
+@resume_tailor_bp.route('/resume/upload/async', methods=['POST'])
+async def upload_and_generate_response_async():
+    """
+    Async variant of `/resume/upload` that awaits every LLM and SERP API call instead of blocking threads.
+    Served on the server's event loop by `app.asgi`; under a WSGI server Flask runs it in a per-request loop.
+    """
+    try:
+        # Step 1: Get and validate the uploaded file and job description
+        uploaded_file = get_uploaded_file()
+        job_description = get_job_description()
+
+        # Step 2: Parse the resume off the event loop, since parsing and OCR are CPU-bound
+        resume_text = await asyncio.to_thread(get_resume_text, uploaded_file)
+
+        # Step 3: Run the analysis once a slot is free
+        async with get_concurrency_limiter().aslot():
+            try:
+                result = await arun_analysis(
+                    resume_text=resume_text,
+                    job_description=job_description,
+                    serp_api_key=SERP_API_KEY,
+                    openai_api_key=OPENAI_API_KEY,
+                )
+            except Exception as analysis_error:
+                raise ValueError(f"Analysis error:\n{str(analysis_error)}")
+
+        # Step 4: Return analysis results
+        return analysis_response(result)
+
+    except Overloaded as overloaded:
+        return overloaded_response(overloaded)
+    except ValueError as ve:
+        return jsonify({"error": str(ve).replace("\n", "<br>")}), 400
+    except Exception as e:
+        return jsonify({"error": f"Unexpected error:\n{str(e).replace('\n', '<br>')}"}), 500
+
+
+@resume_tailor_bp.route('/resume/upload/stream', methods=['POST'])
+def upload_and_stream_response():
+    """
+    Upload a resume and stream each analysis section as soon as it is ready.
+    Responds with Server-Sent Events when the client accepts `text/event-stream`, otherwise NDJSON.
+    Set the `stream_tokens` form field to "true" to also stream suggestions and interview insights token by token.
+    """
+    try:
+        # Step 1: Get and validate the inputs before the stream starts
+        uploaded_file = get_uploaded_file()
+        job_description = get_job_description()
+        resume_text = get_resume_text(uploaded_file)
+    except ValueError as ve:
+        return jsonify({"error": str(ve).replace("\n", "<br>")}), 400
+
+    # Step 2: Hold an analysis slot until the analysis has finished (or, once the client disconnects, stopped)
+    limiter = get_concurrency_limiter()
+    try:
+        limiter.acquire()
+    except Overloaded as overloaded:
+        return overloaded_response(overloaded)
+
+    # Step 3: Stream analysis events
+    events = stream_full_analysis(
+        resume_text=resume_text,
+        job_description=job_description,
+        serp_api_key=SERP_API_KEY,
+        openai_api_key=OPENAI_API_KEY,
+        stream_tokens=request.form.get('stream_tokens', '').lower() == 'true',
+        on_finish=limiter.release,
+    )
+    use_sse = request.accept_mimetypes.best == 'text/event-stream'
+    response = Response(
+        (format_sse_event(event) if use_sse else json.dumps(event) + "\n" for event in events),
+        mimetype='text/event-stream' if use_sse else 'application/x-ndjson',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Closing the event stream cancels the stages that have not started yet
+    response.call_on_close(events.close)
+    return response
+
+
+@resume_tailor_bp.route('/resume/batch', methods=['POST'])
+def upload_and_generate_batch_response():
+    """
+    Upload a resume once and analyze it against several job descriptions.
+    Returns per-job results ranked by compatibility score.
+    """
+    try:
+        # Step 1: Get and validate the uploaded file and job descriptions
+        uploaded_file = get_uploaded_file()
+        job_descriptions = get_job_descriptions()
+
+        # Step 2: Parse the resume once for the whole batch
+        resume_text = get_resume_text(uploaded_file)
+
+        # Step 3: Run the batch analysis, holding one analysis slot per job in flight
         try:
-            results = run_full_analysis(
+            results = run_batch_analysis(
                 resume_text=resume_text,
-                job_description=job_description,
+                job_descriptions=job_descriptions,
                 serp_api_key=SERP_API_KEY,
-                openai_api_key=OPENAI_API_KEY
+                openai_api_key=OPENAI_API_KEY,
+                min_keyword_score=get_min_keyword_score(),
+                job_slot=get_concurrency_limiter().slot,
             )
-
-            # Handle specific errors
-            if "error" in results:
-                return jsonify({
-                    "error": results["error"].replace("\n", "<br>"),
-                    "details": results.get("details", [])
-                }), 400
-
+        except Overloaded:
+            raise
         except Exception as analysis_error:
             raise ValueError(f"Analysis error:\n{str(analysis_error)}")
 
-        # Step 4.5: Extract and validate company name and job title
-        try:
-            llm_helper = LLMHelper(api_key=OPENAI_API_KEY)  # Instantiate the LLM helper
-            company_name, job_title = llm_helper.extract_company_and_job_title(job_description)
-        except ValueError as extraction_error:
-            return jsonify({"error": str(extraction_error)}), 400
+        if "error" in results:
+            return jsonify({
+                "error": results["error"].replace("\n", "<br>"),
+                "details": results.get("details", [])
+            }), 400
 
-        # Step 5: Return analysis results (success response)
+        # Step 4: Return ranked results
         return jsonify({
-            "message": "Analysis conducted successfully.",
+            "message": "Batch analysis conducted successfully.",
             "results": results,
-            "company_name": company_name,
-            "job_title": job_title,
         }), 200
 
-    # Handle any validation or unexpected errors
+    except Overloaded as overloaded:
+        return overloaded_response(overloaded)
     except ValueError as ve:
         return jsonify({"error": str(ve).replace("\n", "<br>")}), 400
     except Exception as e:
         return jsonify({"error": f"Unexpected error:\n{str(e).replace('\n', '<br>')}"}), 500
 
 
+@resume_tailor_bp.route('/jobs', methods=['POST'])
+def submit_analysis_job():
+    """
+    Queue an analysis of an uploaded resume against a job description and return its job ID right away.
+    Poll the returned status URL for progress, partial results and the final result.
+    """
+    try:
+        # Step 1: Get and validate the uploaded file and job description
+        uploaded_file = get_uploaded_file()
+        job_description = get_job_description()
+
+        # Step 2: Queue the job; parsing and analysis run on the job workers
+        file_bytes, file_name = read_file_bytes(uploaded_file)
+        job_id = get_job_queue().submit(ANALYSIS_JOB, {
+            "resume_file": base64.b64encode(file_bytes).decode("ascii"),
+            "file_name": file_name,
+            "job_description": job_description,
+            "fused": current_app.config.get('FUSED_ANALYSIS', False),
+        })
+
+    except Overloaded as overloaded:
+        return overloaded_response(overloaded)
+    except ValueError as ve:
+        return jsonify({"error": str(ve).replace("\n", "<br>")}), 400
+
+    # Step 3: Point the client at the job's status URL
+    status_url = url_for('resume.get_job_status', job_id=job_id)
+    response = jsonify({"job_id": job_id, "status": "queued", "status_url": status_url})
+    response.status_code = 202
+    response.headers["Location"] = status_url
+    return response
+
+
+@resume_tailor_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """
+    Return a background job's status, completed stages, partial results and, once finished, its result or error.
+    """
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found. It may have expired."}), 404
+    return jsonify(job), 200
+
+
+@resume_tailor_bp.route('/profiles/<request_id>', methods=['GET'])
+def get_request_profile(request_id):
+    """
+    Return the stored profile of a profiled request: by default its JSON summary (stage timeline and top
+    functions), with `?format=text` a plain-text report, and with `?format=pstats` the raw cProfile data.
+    Requires the profiling access token as an `Authorization: Bearer <token>` header.
+    """
+    profiler = get_profiler()
+    if not profiler.authorized(request.headers):
+        return jsonify({"error": "A valid profiling access token is required."}), 401, {"WWW-Authenticate": "Bearer"}
+    summary = profiler.load_summary(request_id) if profiler.available else None
+    if summary is None:
+        return jsonify({"error": "Profile not found."}), 404
+
+    output_format = request.args.get('format', 'json')
+    stats_path = profiler.path(request_id, ".prof")
+    if output_format == 'pstats':
+        if not summary["cpu_profile"]:
+            return jsonify({"error": f"No CPU profile was recorded ({summary['cpu_profile_note']})."}), 404
+        return send_file(stats_path, mimetype='application/octet-stream', as_attachment=True)
+    if output_format == 'text':
+        report = io.StringIO()
+        report.write(f"{summary['name']} {summary['request_id']}: {summary['duration']:.3f}s\n\n")
+        report.write("\n".join(summary["timeline"]) + "\n\n")
+        if summary["cpu_profile"]:
+            pstats.Stats(stats_path, stream=report).sort_stats("cumulative").print_stats(40)
+        return Response(report.getvalue(), mimetype='text/plain')
+    return jsonify(summary), 200
+
+
 # Helper functions remain unchanged.
 def get_uploaded_file():
     """
@@ -102,3 +289,83 @@ def get_job_description():
     if not job_description or not job_description.strip():
         raise ValueError("Job description is required and cannot be empty.")
     return job_description
+
+
+def get_job_descriptions():
+    """
+    Retrieve and validate the list of job descriptions provided for a batch request.
+    """
+    job_descriptions = [text for text in request.form.getlist('job_descriptions') if text.strip()]
+    if not job_descriptions:
+        raise ValueError("At least one job description is required.")
+    if len(job_descriptions) > MAX_BATCH_JOB_DESCRIPTIONS:
+        raise ValueError(f"A batch may contain at most {MAX_BATCH_JOB_DESCRIPTIONS} job descriptions.")
+    return job_descriptions
+
+
+def get_resume_text(uploaded_file):
+    """
+    Parse the uploaded resume and return its text content.
+    """
+    try:
+        resume_text = parse_resume(uploaded_file)
+
+        if not resume_text.strip():
+            raise ValueError(
+                "The uploaded resume is empty or could not be parsed.\n"
+                "Please upload a valid file."
+            )
+
+    except Exception as parse_error:
+        raise ValueError(f"Failed to parse the resume:\n{str(parse_error)}")
+
+    return resume_text
+
+
+def analysis_response(result):
+    """
+    Build the JSON response for an AnalysisResult, reusing the extracted company name and job title.
+    """
+    # Handle specific errors
+    if result.error is not None:
+        return jsonify({
+            "error": result.error.replace("\n", "<br>"),
+            "details": result.details
+        }), 400
+
+    return jsonify({
+        "message": "Analysis conducted successfully.",
+        "results": result.to_dict(),
+        "company_name": result.company_name,
+        "job_title": result.job_title,
+    }), 200
+
+
+def overloaded_response(error):
+    """
+    Build the 429/503 response for a request rejected by the concurrency limiter.
+    """
+    response = jsonify({"error": str(error)})
+    response.status_code = error.status_code
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def format_sse_event(event):
+    """
+    Format an analysis event as a Server-Sent Events message.
+    """
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+def get_min_keyword_score():
+    """
+    Retrieve the optional keyword score threshold below which batch jobs are skipped.
+    """
+    value = request.form.get('min_keyword_score')
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError("min_keyword_score must be a number between 0 and 1.")
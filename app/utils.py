@@ -1,128 +1,485 @@
+import hashlib
+import io
+import logging
+import multiprocessing
 import tempfile
 import os
+import threading
+import zipfile
+from contextlib import ExitStack, contextmanager
 from werkzeug.datastructures import FileStorage
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice, repeat
 from pdf2image import convert_from_path
 import PyPDF2
 from docx import Document
 import pytesseract
+from app.cache import build_cache, make_cache_key
+from app.metrics import (
+    DOCUMENT_PARSE_DURATION, DOCUMENT_STEP_DURATION, OCR_PAGES, cache_metric_families, get_metrics_registry, timed,
+)
+
+logger = logging.getLogger(__name__)
+
+# Constants
+OCR_DPI = 300
+DEFAULT_OCR_MAX_WORKERS = os.cpu_count() or 1
+DEFAULT_MIN_PAGE_CHARS = 50  # pages with less native text than this are OCR'd
+PARSER_VERSION = "4"  # bump when extraction changes, so cached text from older parsers is not reused
+DOCUMENT_CACHE_MAX_ENTRIES = 256
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+MAGIC_SEARCH_BYTES = 1024  # PDF readers accept junk before the header, so look a little past the start
+
+_ocr_max_workers = DEFAULT_OCR_MAX_WORKERS
+_ocr_min_page_chars = DEFAULT_MIN_PAGE_CHARS
+_ocr_pool = None  # process-wide OCR worker pool, created on first use
+_ocr_pool_lock = threading.Lock()
+_max_pages = None
+_max_chars = None
+_document_cache = build_cache(max_entries=DOCUMENT_CACHE_MAX_ENTRIES)
 
 
 def parse_resume(file_obj):
     """
     Parse a resume file, handling both Flask (FileStorage), Streamlit (UploadedFile), and file paths (string).
-    Converts the file into a temporary file for processing and extracts text based on the file type.
+    Uploads are parsed in memory, and the file type is detected from the contents rather than the file name.
+    Extraction stops at the configured page and character caps (see `configure_extraction_limits`).
+    Extracted text is cached by the SHA-256 of the file contents, so re-uploading the same file skips parsing.
 
     :param file_obj: The file object (Flask FileStorage, Streamlit UploadedFile, or file path as string).
     :return: A string containing all extracted text from the resume.
     """
+    # Step 1: Read the file contents from the supported input types
+    file_bytes, file_name = read_file_bytes(file_obj)
 
-    temp_file_path = None  # Store the temporary file path for cleanup and debugging
-    try:
-        # Step 1: Handle different input types (Flask FileStorage, Streamlit UploadedFile, or file path)
-        if isinstance(file_obj, str):  # If it's a file path
-            file_path = file_obj
-
-        elif isinstance(file_obj, FileStorage):  # Flask's FileStorage object
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file_obj.filename)[1]) as temp_file:
-                file_obj.save(temp_file.name)
-                temp_file_path = temp_file.name
-            file_path = temp_file_path
-
-        elif hasattr(file_obj, "read") and hasattr(file_obj, "name"):  # Streamlit's UploadedFile object
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file_obj.name)[1]) as temp_file:
-                temp_file.write(file_obj.read())
-                temp_file.flush()
-                temp_file_path = temp_file.name
-            file_path = temp_file_path
+    # Step 2: Detect the file type from its magic bytes
+    file_type = detect_file_type(file_bytes)
+    if file_type is None:
+        raise ValueError(f"Unsupported file format: {os.path.splitext(file_name)[1].lower() or file_name}")
 
+    # Step 3: Return the cached text if this exact file was parsed before
+    cache_key = make_cache_key(
+        PARSER_VERSION, file_type, _max_pages, _max_chars, hashlib.sha256(file_bytes).hexdigest()
+    )
+    if _document_cache is not None:
+        text = _document_cache.get(cache_key)
+        if text is not None:
+            logger.debug("Using cached text for %s", file_name)
+            return text
+
+    # Step 4: Parse the file based on its type and cache the result
+    with timed(DOCUMENT_PARSE_DURATION, file_type=file_type):
+        if file_type == 'pdf':
+            # Use the text layer where there is one and OCR only the pages without it.
+            # An existing path is passed through so OCR does not need to write the file again.
+            source = file_obj if isinstance(file_obj, str) else file_bytes
+            text = extract_text_from_pdf_hybrid(source, max_pages=_max_pages, max_chars=_max_chars)
         else:
-            raise ValueError(f"Unsupported file object type: {type(file_obj)}")
+            text = extract_text_from_docx(file_bytes, max_chars=_max_chars)
 
-        # Debugging: Log the file path being processed
-        print(f"Temporary file created at: {file_path}")
+    if _document_cache is not None:
+        _document_cache.set(cache_key, text)
+    return text
 
-        # Step 2: Determine the file type from its extension
-        file_extension = os.path.splitext(file_path)[1].lower()
 
-        # Step 3: Parse the file based on its type
-        if file_extension == '.pdf':
-            text = extract_text_from_pdf(file_path)  # Extract text from PDF
-            if not text.strip():  # Attempt OCR if no text is extracted
-                print("No text extracted from PDF. Trying OCR...")
-                text = extract_text_from_pdf_with_ocr(file_path)
-            return text
+def read_file_bytes(file_obj):
+    """
+    Read the contents and name of a Flask FileStorage, Streamlit UploadedFile, or file path.
 
-        elif file_extension == '.docx':
-            return extract_text_from_docx(file_path)  # Extract text from DOCX files
+    :param file_obj: The file object (Flask FileStorage, Streamlit UploadedFile, or file path as string).
+    :return: A (bytes, file name) tuple.
+    """
+    if isinstance(file_obj, str):  # If it's a file path
+        with open(file_obj, 'rb') as file:
+            return file.read(), file_obj
+
+    elif isinstance(file_obj, FileStorage):  # Flask's FileStorage object
+        file_obj.stream.seek(0)
+        return file_obj.stream.read(), file_obj.filename
+
+    elif hasattr(file_obj, "read") and hasattr(file_obj, "name"):  # Streamlit's UploadedFile object
+        if hasattr(file_obj, "getvalue"):
+            return file_obj.getvalue(), file_obj.name
+        return file_obj.read(), file_obj.name
+
+    else:
+        raise ValueError(f"Unsupported file object type: {type(file_obj)}")
+
+
+def detect_file_type(file_bytes):
+    """
+    Detect a document's type from its magic bytes.
+
+    :param file_bytes: The file contents.
+    :return: 'pdf', 'docx', or None if the contents are neither.
+    """
+    if PDF_MAGIC in file_bytes[:MAGIC_SEARCH_BYTES]:
+        return 'pdf'
+
+    if file_bytes.startswith(ZIP_MAGIC):
+        # DOCX files are ZIP archives that contain a Word document part
+        try:
+            with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+                if 'word/document.xml' in archive.namelist():
+                    return 'docx'
+        except zipfile.BadZipFile:
+            return None
+
+    return None
+
+
+def configure_document_cache(enabled=True, max_entries=None, ttl=None, path=None):
+    """
+    Replace the process-wide cache of parsed document text.
+
+    :param enabled: When False, every upload is parsed.
+    :param max_entries: Maximum number of parsed documents kept per cache tier.
+    :param ttl: Seconds before a cached document expires.
+    :param path: Optional SQLite database path so parsed text is shared across worker processes.
+    """
+    global _document_cache
+    if not enabled:
+        _document_cache = None
+        return
+    options = {"max_entries": max_entries, "ttl": ttl}
+    _document_cache = build_cache(path=path, **{key: value for key, value in options.items() if value is not None})
+
+
+def _collect_metrics():
+    """
+    Report the document cache counters at scrape time.
+    """
+    return cache_metric_families({"document": _document_cache})
 
-        else:
-            raise ValueError(f"Unsupported file format: {file_extension}")
 
+get_metrics_registry().register_collector(_collect_metrics)
+
+
+def collect_text(chunks, max_chunks=None, max_chars=None):
+    """
+    Join the text chunks (pages or paragraphs) yielded by an extractor, stopping once a cap is reached.
+    Stopping early closes the extractor, so the remaining pages are never parsed or OCR'd.
+
+    :param chunks: An iterable of strings, usually one of the `iter_*` extractors.
+    :param max_chunks: Maximum number of chunks to keep (None for no limit).
+    :param max_chars: Maximum number of characters to keep; the last chunk is truncated to fit (None for no limit).
+    :return: The joined text.
+    """
+    parts = []
+    length = 0
+    try:
+        for chunk in chunks:
+            if max_chars is not None and length + len(chunk) >= max_chars:
+                parts.append(chunk[:max_chars - length])
+                break
+            parts.append(chunk)
+            length += len(chunk)
+            if max_chunks is not None and len(parts) >= max_chunks:
+                break
     finally:
-        # Step 4: Cleanup temporary file after processing
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)  # Delete the temp file
-                print(f"Temporary file deleted: {temp_file_path}")
-            except PermissionError as e:
-                print(f"Permission error while deleting temp file: {e}")
-            except Exception as e:
-                print(f"Error while deleting temp file: {e}")
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return "".join(parts)
 
 
-def extract_text_from_pdf(file_path):
+def configure_extraction_limits(max_pages=None, max_chars=None):
+    """
+    Set the caps applied by `parse_resume`. Extraction stops once either is reached,
+    so long documents only pay for the text the LLM prompts can actually use.
+
+    :param max_pages: Maximum number of PDF pages to extract (None for no limit).
+    :param max_chars: Maximum number of characters to extract (None for no limit).
+    """
+    global _max_pages, _max_chars
+    _max_pages = max_pages
+    _max_chars = max_chars
+
+
+def extract_text_from_pdf(source, max_pages=None, max_chars=None):
     """
     Extracts text from a PDF file using PyPDF2.
 
-    :param file_path: Path to the PDF file.
+    :param source: Path to the PDF file, its contents as bytes, or a binary file object.
+    :param max_pages: Stop after this many pages (None for no limit).
+    :param max_chars: Stop after this many characters (None for no limit).
     :return: Extracted text as a string.
     """
-    text = ""
-    with open(file_path, 'rb') as file:
-        pdf_reader = PyPDF2.PdfReader(file)
-        print(f"Number of pages in PDF: {len(pdf_reader.pages)}")
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text
-    return text
+    return collect_text(iter_pdf_pages(source), max_pages, max_chars)
+
+
+def iter_pdf_pages(source):
+    """
+    Yields the text layer of each page of a PDF file using PyPDF2, one page at a time.
+
+    :param source: Path to the PDF file, its contents as bytes, or a binary file object.
+    :return: A generator of one string per page (empty for pages without a text layer).
+    """
+    pdf_reader = PyPDF2.PdfReader(_as_stream(source))
+    logger.debug("Number of pages in PDF: %d", len(pdf_reader.pages))
+    for page in pdf_reader.pages:
+        with timed(DOCUMENT_STEP_DURATION, step="pdf_text_page"):
+            text = page.extract_text() or ""
+        yield text
+
+
+def extract_text_from_pdf_hybrid(source, min_page_chars=None, max_workers=None, max_pages=None, max_chars=None):
+    """
+    Extracts text from a PDF page by page, using the native text layer where one exists and
+    running OCR only on pages whose text layer has fewer than `min_page_chars` characters.
+
+    :param source: Path to the PDF file or its contents as bytes.
+    :param min_page_chars: Character threshold below which a page is OCR'd (defaults to the configured value).
+    :param max_workers: Number of OCR worker processes.
+    :param max_pages: Stop after this many pages (None for no limit).
+    :param max_chars: Stop after this many characters (None for no limit).
+    :return: Extracted text as a string, in page order.
+    """
+    pages = iter_pdf_pages_hybrid(source, min_page_chars, max_workers, max_pages)
+    return collect_text(pages, max_pages, max_chars)
+
+
+def iter_pdf_pages_hybrid(source, min_page_chars=None, max_workers=None, max_pages=None):
+    """
+    Yields the text of each PDF page in order, from the native text layer or, for pages with too
+    little native text, from OCR. Sparse pages are OCR'd in batches of `max_workers` so they run in
+    parallel, and later pages are not read until the caller asks for them.
+
+    :param source: Path to the PDF file or its contents as bytes.
+    :param min_page_chars: Character threshold below which a page is OCR'd (defaults to the configured value).
+    :param max_workers: Number of OCR worker processes (defaults to the configured OCR worker count).
+    :param max_pages: Stop reading (and OCR'ing) after this many pages (None for no limit).
+    :return: A generator of one string per page.
+    """
+    min_page_chars = _ocr_min_page_chars if min_page_chars is None else min_page_chars
+    workers = max_workers or _ocr_max_workers
+    pending = []  # pages held back until the sparse pages among them are OCR'd
+    sparse_pages = []
+
+    with ExitStack() as resources:
+        run_ocr = None  # the OCR pool and temp file are only set up once a page needs them
+        # A batch waiting for more sparse pages is flushed at the cap rather than reading past it
+        for page_number, text in enumerate(islice(iter_pdf_pages(source), max_pages), start=1):
+            if len(text.strip()) < min_page_chars:
+                sparse_pages.append(page_number)
+            elif not pending:
+                yield text
+                continue
+            pending.append(text)
+
+            if len(sparse_pages) >= workers:
+                run_ocr = run_ocr or _open_ocr(resources, source, workers)
+                yield from _merge_ocr_text(pending, sparse_pages, _run_ocr_batch(run_ocr, sparse_pages))
+                pending, sparse_pages = [], []
 
+        if sparse_pages:
+            run_ocr = run_ocr or _open_ocr(resources, source, workers)
+            yield from _merge_ocr_text(pending, sparse_pages, _run_ocr_batch(run_ocr, sparse_pages))
 
-def extract_text_from_pdf_with_ocr(file_path):
+
+def _run_ocr_batch(run_ocr, page_numbers):
+    """
+    OCR a batch of pages and record the batch duration and page count.
+    """
+    OCR_PAGES.inc(len(page_numbers))
+    with timed(DOCUMENT_STEP_DURATION, step="ocr_batch"):
+        return list(run_ocr(page_numbers))
+
+
+def _merge_ocr_text(pending, sparse_pages, ocr_texts):
+    """
+    Yield the pending pages in order, replacing the text of sparse pages with their OCR text
+    where it recovered more of the page.
+    """
+    first_page = sparse_pages[0]
+    ocr_by_page = dict(zip(sparse_pages, ocr_texts))
+    logger.info("Pages without enough text: %s. Used OCR.", sparse_pages)
+    for offset, text in enumerate(pending):
+        ocr_text = ocr_by_page.get(first_page + offset, "")
+        # Keep whichever source recovered more of the page
+        yield ocr_text if len(ocr_text.strip()) > len(text.strip()) else text
+
+
+def extract_text_from_pdf_with_ocr(source, max_workers=None, max_pages=None, max_chars=None):
     """
     Extracts text from a PDF by converting it to images and running OCR (using pytesseract).
 
-    :param file_path: Path to the PDF file.
-    :return: Extracted text as a string.
+    :param source: Path to the PDF file or its contents as bytes.
+    :param max_workers: Number of OCR worker processes (defaults to the configured OCR worker count).
+    :param max_pages: Stop after this many pages (None for no limit).
+    :param max_chars: Stop after this many characters (None for no limit).
+    :return: Extracted text as a string, in page order.
+    """
+    page_count = len(PyPDF2.PdfReader(_as_stream(source)).pages)
+    page_numbers = list(range(1, min(page_count, max_pages or page_count) + 1))
+    return collect_text(iter_ocr_pages(source, page_numbers, max_workers), max_pages, max_chars)
+
+
+def ocr_pdf_pages(source, page_numbers, max_workers=None):
+    """
+    Runs OCR on the given pages of a PDF.
+
+    :param source: Path to the PDF file or its contents as bytes.
+    :param page_numbers: 1-based page numbers to OCR.
+    :param max_workers: Number of OCR worker processes (defaults to the configured OCR worker count).
+    :return: A list with the OCR text of each requested page, in the order given.
     """
-    text = ""
+    return list(iter_ocr_pages(source, page_numbers, max_workers))
 
+
+def iter_ocr_pages(source, page_numbers, max_workers=None):
+    """
+    Yields the OCR text of the given pages of a PDF, in the order given. Pages are rasterized one at a
+    time and OCR'd in parallel on a process pool, so peak memory is bounded by the number of workers
+    rather than the number of pages. Closing the generator early cancels the pages not yet started.
+
+    :param source: Path to the PDF file or its contents as bytes.
+    :param page_numbers: 1-based page numbers to OCR.
+    :param max_workers: Number of OCR worker processes (defaults to the configured OCR worker count).
+    :return: A generator of one string per requested page.
+    """
+    if not page_numbers:
+        return
+    workers = min(max_workers or _ocr_max_workers, len(page_numbers))
+    OCR_PAGES.inc(len(page_numbers))
     try:
-        # Convert PDF pages to images
-        pages = convert_from_path(file_path, dpi=300)  # Removed 'use_temp=True'
-        for page_index, page in enumerate(pages):
-            print(f"Running OCR on page {page_index + 1}...")
-            text += pytesseract.image_to_string(page)
-    except Exception as e:
-        print(f"Error during OCR processing: {e}")
-        raise e
+        with ExitStack() as resources:
+            yield from _open_ocr(resources, source, workers)(page_numbers)
+    except Exception:
+        logger.exception("Error during OCR processing")
+        raise
 
-    return text
 
+def _open_ocr(resources, source, workers):
+    """
+    Set up OCR for a PDF and return a function mapping page numbers to an iterator of their OCR text.
+    Poppler only reads from disk, so in-memory contents are written to one temporary file shared by all pages.
+    The temporary file is deleted when `resources` (an ExitStack) closes. With more than one worker, pages
+    run on the process-wide OCR pool, which is shared by every document.
+    """
+    file_path = resources.enter_context(_pdf_path(source))
+    if workers <= 1:
+        return lambda page_numbers: (_ocr_pdf_page(file_path, page_number) for page_number in page_numbers)
+
+    pool = _get_ocr_pool()
 
+    def run_ocr(page_numbers):
+        try:
+            # map() yields results in submission order, i.e. page order, and closing it cancels pending pages
+            yield from pool.map(_ocr_pdf_page, repeat(file_path), page_numbers)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory on a huge page); start a fresh pool for the next document
+            _discard_ocr_pool(pool)
+            raise
+    return run_ocr
 
-def extract_text_from_docx(file_path):
+
+def _get_ocr_pool():
+    """
+    Return the process-wide OCR worker pool, creating it on first use. Its workers are started by a
+    fork server where available, rather than forked from this (possibly multi-threaded) process.
+    """
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver") if "forkserver" in methods else None
+            _ocr_pool = ProcessPoolExecutor(max_workers=_ocr_max_workers, mp_context=context)
+        return _ocr_pool
+
+
+def _discard_ocr_pool(pool=None):
+    """
+    Shut down the process-wide OCR pool (only if it is still `pool`, when given) so the next document starts a new one.
+    """
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None or (pool is not None and _ocr_pool is not pool):
+            return
+        previous, _ocr_pool = _ocr_pool, None
+    previous.shutdown(wait=False)
+
+
+def _ocr_pdf_page(file_path, page_number):
+    """
+    Rasterizes a single PDF page and runs OCR on it. Runs inside an OCR worker process.
+
+    :param file_path: Path to the PDF file.
+    :param page_number: 1-based page number.
+    :return: Extracted text for the page.
+    """
+    logger.debug("Running OCR on page %d", page_number)
+    images = convert_from_path(file_path, dpi=OCR_DPI, first_page=page_number, last_page=page_number)
+    return "".join(pytesseract.image_to_string(image) for image in images)
+
+
+def configure_ocr(max_workers=None, min_page_chars=DEFAULT_MIN_PAGE_CHARS):
+    """
+    Set the default OCR worker count and the per-page text threshold below which a page is OCR'd.
+    The shared OCR pool is replaced, so its next use starts the new number of workers.
+
+    :param max_workers: Worker count; None uses one worker per CPU.
+    :param min_page_chars: Pages whose text layer has fewer characters than this are OCR'd.
+    """
+    global _ocr_max_workers, _ocr_min_page_chars
+    _ocr_max_workers = max_workers or DEFAULT_OCR_MAX_WORKERS
+    _ocr_min_page_chars = min_page_chars
+    _discard_ocr_pool()
+
+
+def extract_text_from_docx(source, max_chars=None):
     """
     Extracts text from a DOCX file.
 
-    :param file_path: Path to the DOCX file.
+    :param source: Path to the DOCX file, its contents as bytes, or a binary file object.
+    :param max_chars: Stop after this many characters (None for no limit).
     :return: Extracted text as a string.
     """
-    text = ""
-    doc = Document(file_path)
+    return collect_text(iter_docx_paragraphs(source), max_chars=max_chars)
+
+
+def iter_docx_paragraphs(source):
+    """
+    Yields the text of each paragraph of a DOCX file, each followed by a newline.
+
+    :param source: Path to the DOCX file, its contents as bytes, or a binary file object.
+    :return: A generator of one string per paragraph.
+    """
+    with timed(DOCUMENT_STEP_DURATION, step="docx"):
+        doc = Document(_as_stream(source))
     for paragraph in doc.paragraphs:
-        text += paragraph.text + '\n'
-    return text
+        yield paragraph.text + '\n'
+
+
+def _as_stream(source):
+    """
+    Wrap in-memory contents in a BytesIO; paths and file objects are returned unchanged.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return source
+
+
+@contextmanager
+def _pdf_path(source):
+    """
+    Yield a filesystem path for a PDF, writing in-memory contents to a temporary file only when there is no path.
+    """
+    if isinstance(source, str):
+        yield source
+        return
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+        temp_file.write(source)
+        temp_file_path = temp_file.name
+    try:
+        yield temp_file_path
+    finally:
+        try:
+            os.unlink(temp_file_path)  # Delete the temp file
+        except Exception as e:
+            logger.warning("Error while deleting temp file: %s", e)
 
 
 def allowed_file(filename):
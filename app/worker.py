@@ -0,0 +1,34 @@
+# app/worker.py
+
+import logging
+import os
+
+from config.config import get_config
+from app.bootstrap import configure_services
+from app.jobs import SQLiteJobStore, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Run background analysis jobs in a dedicated process, so job workers scale separately from web processes.
+
+    Shares jobs with the web processes through the SQLite store at JOB_STORE_PATH and runs JOB_WORKERS jobs at a time.
+    Usage: `JOB_STORE_PATH=/var/lib/resume-tailor/jobs.db python -m app.worker`
+    """
+    config = get_config(os.environ.get('FLASK_ENV', 'development'))
+    configure_services(config)
+
+    job_queue = get_job_queue()
+    if not isinstance(job_queue.store, SQLiteJobStore):
+        raise SystemExit("JOB_STORE_PATH must be set so the worker can share jobs with the web processes.")
+    if job_queue.max_workers < 1:
+        raise SystemExit("JOB_WORKERS must be at least 1 for a worker process.")
+
+    logger.info("Processing jobs from %s with %d workers.", job_queue.store.path, job_queue.max_workers)
+    job_queue.run_forever()
+
+
+if __name__ == '__main__':
+    main()
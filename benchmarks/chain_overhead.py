@@ -0,0 +1,56 @@
+"""
+Micro-benchmark: per-request cost of building prompt chains versus reusing precompiled ones.
+
+Usage:
+    python -m benchmarks.chain_overhead [--iterations N]
+"""
+import argparse
+import time
+
+from langchain.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from app.nlp.chains import PROMPTS, chain_registry
+
+
+def build_per_call(client):
+    """
+    Build every chain the way each request used to: a new PromptTemplate and pipeline per call.
+    """
+    for template, input_variables in PROMPTS.values():
+        PromptTemplate(template=template, input_variables=input_variables) | client
+
+
+def reuse_compiled(client):
+    """
+    Fetch every chain from the precompiled registry.
+    """
+    for name in PROMPTS:
+        chain_registry.get_chain(name, client)
+
+
+def time_per_request(func, client, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(client)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    # A stand-in client: only chain construction is measured, never invocation
+    client = RunnableLambda(lambda prompt: prompt)
+
+    rebuilt = time_per_request(build_per_call, client, args.iterations)
+    compiled = time_per_request(reuse_compiled, client, args.iterations)
+    print(f"Chains per request:  {len(PROMPTS)}")
+    print(f"Rebuilt per request: {rebuilt * 1e6:10.1f} us")
+    print(f"Precompiled:         {compiled * 1e6:10.1f} us")
+    print(f"Saved per request:   {(rebuilt - compiled) * 1e6:10.1f} us ({rebuilt / compiled:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Generate a synthetic corpus of resumes (text PDF, DOCX and scanned image-only PDF) and job descriptions.
+
+Everything is derived from a seed, so the same arguments always produce the same documents.
+
+Usage:
+    python -m benchmarks.corpus --output benchmarks/corpus [--documents N] [--pages N] [--seed N]
+"""
+import argparse
+import os
+import random
+
+from docx import Document
+from PIL import Image, ImageDraw
+
+KINDS = ("pdf", "docx", "scanned")
+LINES_PER_PAGE = 50
+SCAN_DPI = 150
+
+FIRST_NAMES = ("Alex", "Jordan", "Sam", "Taylor", "Morgan", "Casey", "Riley", "Jamie")
+LAST_NAMES = ("Rivera", "Chen", "Okafor", "Novak", "Haddad", "Larsen", "Silva", "Kim")
+COMPANIES = ("Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Enterprises")
+TITLES = ("Software Engineer", "Senior Data Scientist", "Backend Engineer", "Product Manager", "DevOps Engineer")
+SKILLS = (
+    "Python", "SQL", "AWS", "Docker", "Kubernetes", "React", "TypeScript", "Spark", "Airflow",
+    "Terraform", "PostgreSQL", "Redis", "Kafka", "Go", "Java", "Machine Learning", "CI/CD",
+)
+ACTIONS = ("Built", "Led", "Designed", "Migrated", "Optimized", "Automated", "Launched", "Scaled")
+OBJECTS = (
+    "a real-time analytics pipeline", "the payments API", "an internal deployment platform",
+    "a recommendation service", "the data warehouse", "customer onboarding flows", "observability tooling",
+)
+RESULTS = (
+    "cutting latency by {n}%", "saving ${n}k per year", "serving {n}M requests per day",
+    "reducing incidents by {n}%", "raising conversion by {n}%", "shrinking build times by {n}%",
+)
+
+
+def generate_resume_text(rng, pages=1):
+    """
+    Return a plain-text resume of roughly `pages` pages.
+    """
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [
+        name, f"{name.lower().replace(' ', '.')}@example.com | +1 555 010 {rng.randint(1000, 9999)}", "",
+        "Summary", f"{rng.choice(TITLES)} with {rng.randint(3, 15)} years of experience shipping production systems.", "",
+        "Skills", ", ".join(rng.sample(SKILLS, 8)), "",
+        "Experience",
+    ]
+    while len(lines) < pages * LINES_PER_PAGE - 6:
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({rng.randint(2010, 2020)} - {rng.randint(2021, 2025)})")
+        for _ in range(4):
+            result = rng.choice(RESULTS).format(n=rng.randint(5, 90))
+            lines.append(f"- {rng.choice(ACTIONS)} {rng.choice(OBJECTS)} with {rng.choice(SKILLS)}, {result}.")
+        lines.append("")
+    lines += ["Education", f"B.Sc. Computer Science, State University ({rng.randint(2005, 2018)})"]
+    return "\n".join(lines)
+
+
+def generate_job_description(rng):
+    """
+    Return a job description with explicit "Company:" and "Job Title:" lines.
+    """
+    company, title = rng.choice(COMPANIES), rng.choice(TITLES)
+    skills = rng.sample(SKILLS, 6)
+    return "\n".join([
+        f"Company: {company}",
+        f"Job Title: {title}",
+        "",
+        f"{company} is looking for a {title} to join our platform team.",
+        "",
+        "Responsibilities",
+        *(f"- {rng.choice(ACTIONS)} {rng.choice(OBJECTS)} using {skill}." for skill in skills[:3]),
+        "",
+        "Requirements",
+        f"- {rng.randint(2, 8)}+ years of experience with {skills[3]} and {skills[4]}.",
+        f"- Familiarity with {skills[5]} is preferred.",
+        "- Strong communication skills and ownership of outcomes.",
+        "",
+        "Benefits",
+        "- Competitive salary, equity and remote-friendly culture.",
+    ])
+
+
+def write_pdf(path, text):
+    """
+    Write the text as a PDF with a real text layer, using only the standard Helvetica font.
+    """
+    lines = text.splitlines()
+    pages = [lines[start:start + LINES_PER_PAGE] for start in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+    objects = []  # object bodies; object N is objects[N - 1]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(None)  # page tree, filled in once the page objects are numbered
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    page_numbers = []
+    for page_lines in pages:
+        operations = ["BT", "/F1 10 Tf", "14 TL", "50 760 Td"]
+        for line in page_lines:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            operations.append(f"({escaped}) Tj T*")
+        operations.append("ET")
+        stream = "\n".join(operations).encode("cp1252", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_number = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_number
+        )
+        page_numbers.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % number for number in page_numbers)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_numbers))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+
+    with open(path, "wb") as file:
+        file.write(output)
+
+
+def write_docx(path, text):
+    """
+    Write the text as a DOCX document, one paragraph per line.
+    """
+    document = Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def write_scanned_pdf(path, text):
+    """
+    Write the text as an image-only PDF, like a scanned resume with no text layer.
+    """
+    lines = text.splitlines()
+    width, height = int(8.5 * SCAN_DPI), 11 * SCAN_DPI
+    images = []
+    for start in range(0, max(len(lines), 1), LINES_PER_PAGE):
+        image = Image.new("L", (width, height), color=255)
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines[start:start + LINES_PER_PAGE]):
+            draw.text((SCAN_DPI // 2, SCAN_DPI // 2 + row * 30), line, fill=0)
+        images.append(image)
+    images[0].save(path, "PDF", resolution=SCAN_DPI, save_all=True, append_images=images[1:])
+
+
+WRITERS = {"pdf": (".pdf", write_pdf), "docx": (".docx", write_docx), "scanned": (".pdf", write_scanned_pdf)}
+
+
+def build_corpus(directory, documents=3, pages=1, seed=0, kinds=KINDS):
+    """
+    Write `documents` resumes of each kind, plus as many job descriptions, into a directory.
+
+    :return: A dict with "resumes" (a list of (kind, path) tuples) and "job_descriptions" (a list of strings).
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    resumes = []
+    for index in range(documents):
+        text = generate_resume_text(rng, pages)
+        for kind in kinds:
+            extension, write = WRITERS[kind]
+            path = os.path.join(directory, f"resume_{index}_{kind}{extension}")
+            write(path, text)
+            resumes.append((kind, path))
+    job_descriptions = [generate_job_description(rng) for _ in range(documents)]
+    return {"resumes": resumes, "job_descriptions": job_descriptions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", required=True, help="Directory to write the corpus into.")
+    parser.add_argument("--documents", type=int, default=3, help="Resumes per kind.")
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.output, args.documents, args.pages, args.seed)
+    for index, job_description in enumerate(corpus["job_descriptions"]):
+        with open(os.path.join(args.output, f"job_description_{index}.txt"), "w", encoding="utf-8") as file:
+            file.write(job_description)
+    print(f"Wrote {len(corpus['resumes'])} resumes and {len(corpus['job_descriptions'])} job descriptions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
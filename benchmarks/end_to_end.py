@@ -0,0 +1,282 @@
+"""
+End-to-end benchmark of resume parsing, the full analysis and the Flask upload route, fully offline.
+
+The LLM is replaced by a deterministic local model and the SERP API by a local HTTP stub, and resumes
+come from a synthetic corpus. Reports p50/p95 latency, throughput at each client count and peak RSS
+of this process for every stage. Response, document and research caches and request coalescing are
+disabled so every request does the full work.
+
+Usage:
+    python -m benchmarks.end_to_end [--clients 1,8,32] [--requests 32] [--llm-latency 0.2]
+        [--serp-latency 0.1] [--output-tokens 200] [--json results.json] [--max-p95 analysis@8=1500]
+
+`--max-p95 STAGE=MS` (repeatable) exits with status 1 when a stage's p95 latency exceeds the limit,
+so the benchmark can gate a CI pipeline.
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.bootstrap import configure_services
+from app.main import create_app
+from app.nlp.clients import configure_clients
+from app.nlp.model import run_full_analysis
+from app.utils import parse_resume
+from benchmarks.corpus import KINDS, build_corpus
+from benchmarks.fakes import FakeChatModel, FakeSerpServer
+
+RSS_SAMPLE_INTERVAL = 0.01  # seconds
+
+
+def current_rss():
+    """
+    Return this process's resident set size in bytes, or None where it cannot be read.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports kilobytes
+
+
+class RssMonitor:
+    """
+    Samples the process RSS on a background thread while a stage runs and records the peak.
+    """
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.peak = current_rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._record(current_rss())
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._record(current_rss())
+
+    def _record(self, rss):
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile of a non-empty list of numbers.
+    """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def run_stage(name, func, workloads, clients):
+    """
+    Run `func(workload)` for every workload with `clients` concurrent callers and summarize the stage.
+    A call fails if it raises or returns an error response (a dict with an "error" key).
+    """
+    latencies = []
+    errors = 0
+
+    def timed(workload):
+        start = time.perf_counter()
+        try:
+            result = func(workload)
+        finally:
+            latencies.append(time.perf_counter() - start)
+        if isinstance(result, dict) and result.get("error"):
+            raise RuntimeError(f"{result['error']} {result.get('details') or ''}".strip())
+
+    with RssMonitor() as rss:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            for future in [pool.submit(timed, workload) for workload in workloads]:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors += 1
+                    print(f"  {name}: {e}")
+        elapsed = time.perf_counter() - start
+
+    return {
+        "stage": name,
+        "clients": clients,
+        "requests": len(workloads),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "throughput_rps": len(workloads) / elapsed,
+        "peak_rss_mb": rss.peak / 2 ** 20 if rss.peak is not None else None,
+    }
+
+
+def configure_offline(app, llm, serp, max_clients):
+    """
+    Point the app's services at the fake LLM and SERP stub, with caching and coalescing disabled.
+    """
+    config = dict(app.config)
+    config.update(
+        SERP_API_URL=serp.url,
+        LLM_CACHE_ENABLED=False,
+        DOCUMENT_CACHE_ENABLED=False,
+        RESEARCH_CACHE_ENABLED=False,
+        REQUEST_COALESCING_ENABLED=False,
+        MAX_CONCURRENT_ANALYSES=max_clients,
+        MAX_QUEUED_ANALYSES=max_clients,
+        HTTP_POOL_SIZE=max(config["HTTP_POOL_SIZE"], max_clients),
+        JOB_WORKERS=1,
+    )
+    configure_services(config)
+    configure_clients(
+        pool_size=config["HTTP_POOL_SIZE"],
+        timeout=config["HTTP_TIMEOUT"],
+        max_retries=config["HTTP_MAX_RETRIES"],
+        backoff_factor=config["HTTP_BACKOFF_FACTOR"],
+        async_pool_size=config["HTTP_ASYNC_POOL_SIZE"],
+        llm_factory=lambda **kwargs: llm,
+        llm_timeout=config["LLM_TIMEOUT"],
+    )
+
+
+def ocr_available():
+    return shutil.which("tesseract") is not None and shutil.which("pdftoppm") is not None
+
+
+def print_report(rows):
+    print(f"\n{'stage':<22}{'clients':>8}{'reqs':>6}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>9}{'peak MB':>9}")
+    for row in rows:
+        peak = f"{row['peak_rss_mb']:>9.1f}" if row["peak_rss_mb"] is not None else f"{'n/a':>9}"
+        print(
+            f"{row['stage']:<22}{row['clients']:>8}{row['requests']:>6}{row['errors']:>8}"
+            f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['throughput_rps']:>9.2f}{peak}"
+        )
+
+
+def check_limits(rows, limits):
+    """
+    Return a message for every stage whose p95 latency exceeds its limit (or that has errors).
+    """
+    by_stage = {row["stage"]: row for row in rows}
+    failures = [f"{row['stage']}: {row['errors']} errors" for row in rows if row["errors"]]
+    for limit in limits:
+        stage, _, max_ms = limit.partition("=")
+        row = by_stage.get(stage)
+        if row is None:
+            failures.append(f"{stage}: no such stage")
+        elif row["p95_ms"] > float(max_ms):
+            failures.append(f"{stage}: p95 {row['p95_ms']:.1f} ms exceeds {float(max_ms):.1f} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", default="1,8,32", help="Comma-separated concurrent client counts.")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per client count.")
+    parser.add_argument("--documents", type=int, default=4, help="Synthetic resumes per kind.")
+    parser.add_argument("--pages", type=int, default=2, help="Pages per synthetic resume.")
+    parser.add_argument("--parse-repeat", type=int, default=3, help="Parses of each resume in the parse stages.")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per fake LLM call.")
+    parser.add_argument("--llm-jitter", type=float, default=0.05, help="Extra seconds of deterministic jitter.")
+    parser.add_argument("--output-tokens", type=int, default=200, help="Filler tokens added to each LLM response.")
+    parser.add_argument("--serp-latency", type=float, default=0.1, help="Seconds per SERP stub request.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this JSON file.")
+    parser.add_argument("--max-p95", action="append", default=[], metavar="STAGE=MS")
+    args = parser.parse_args()
+    client_counts = [int(count) for count in args.clients.split(",")]
+
+    app = create_app()
+    llm = FakeChatModel(
+        latency=args.llm_latency, jitter=args.llm_jitter, output_tokens=args.output_tokens, seed=args.seed
+    )
+    rows = []
+    with FakeSerpServer(latency=args.serp_latency) as serp, tempfile.TemporaryDirectory() as directory:
+        configure_offline(app, llm, serp, max(client_counts))
+        kinds = KINDS if ocr_available() else tuple(kind for kind in KINDS if kind != "scanned")
+        if "scanned" not in kinds:
+            print("tesseract/pdftoppm not found; skipping the scanned-resume stage.")
+        corpus = build_corpus(directory, args.documents, args.pages, args.seed, kinds)
+        resumes, job_descriptions = corpus["resumes"], corpus["job_descriptions"]
+
+        # Stage 1: Parse each kind of resume, one at a time
+        for kind in kinds:
+            paths = [path for resume_kind, path in resumes if resume_kind == kind] * args.parse_repeat
+            rows.append(run_stage(f"parse:{kind}", parse_resume, paths, clients=1))
+
+        # Stage 2: Full analysis at each concurrency level; every request has a unique job description
+        resume_texts = [parse_resume(path) for kind, path in resumes if kind == "pdf"]
+        for clients in client_counts:
+            workloads = [
+                (resume_texts[index % len(resume_texts)],
+                 f"{job_descriptions[index % len(job_descriptions)]}\nReference: {clients}-{index}")
+                for index in range(args.requests)
+            ]
+            rows.append(run_stage(
+                f"analysis@{clients}",
+                lambda workload: run_full_analysis(workload[0], workload[1], "offline", "offline"),
+                workloads, clients,
+            ))
+
+        # Stage 3: The upload route, including multipart handling and parsing
+        pdf_paths = [path for kind, path in resumes if kind == "pdf"]
+
+        def upload(workload):
+            path, job_description = workload
+            with open(path, "rb") as file:
+                response = app.test_client().post(
+                    "/api/resume/upload",
+                    data={"file": (file, os.path.basename(path)), "job_description": job_description},
+                    content_type="multipart/form-data",
+                )
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+        for clients in client_counts:
+            workloads = [
+                (pdf_paths[index % len(pdf_paths)],
+                 f"{job_descriptions[index % len(job_descriptions)]}\nReference: route-{clients}-{index}")
+                for index in range(args.requests)
+            ]
+            rows.append(run_stage(f"route@{clients}", upload, workloads, clients))
+
+        print(f"\nFake LLM latency {args.llm_latency}s (+{args.llm_jitter}s jitter), "
+              f"SERP stub latency {args.serp_latency}s, {serp.request_count} SERP requests served.")
+
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"arguments": vars(args), "results": rows}, file, indent=2)
+
+    failures = check_limits(rows, args.max_p95)
+    if failures:
+        print("\nPerformance limits exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Offline stand-ins for the external services the analysis pipeline calls: a deterministic chat model
+with configurable latency and output size, and a local HTTP stub for the SERP API.
+"""
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from app.nlp.chains import JSON_PROMPTS, PROMPTS
+
+CHARS_PER_TOKEN = 4
+FILLER_WORDS = ("aligned", "impact", "stakeholders", "delivered", "scalable", "metrics", "ownership", "roadmap")
+
+# Template-shaped responses that the pipeline's parsers accept, per registered prompt
+CANNED_RESPONSES = {
+    "validate_resume": (
+        "1. Resume Validity: Yes - Contains experience, education and skills sections.\n"
+        "2. Resume Sufficiency: Sufficient - Lists roles, achievements and qualifications.\n"
+        "3. Structural Issues: No - Sections are clearly labeled."
+    ),
+    "validate_job_description": (
+        "1. Job Description Validity: Yes - Describes responsibilities and requirements.\n"
+        "2. Job Description Sufficiency: Sufficient - Lists the key tasks and qualifications.\n"
+        "3. Clarity Issues: No - The role is clearly described."
+    ),
+    "compatibility": (
+        "1. Compatibility Score: 7 \n The resume covers most of the listed requirements.\n"
+        "2. Strengths: Relevant engineering experience and tooling.\n"
+        "3. Weaknesses: Limited evidence of leading cross-team projects."
+    ),
+    "suggestions": (
+        "Actionable Suggestions:\n"
+        "1. Quantify the impact of recent projects - The role emphasizes measurable outcomes.\n"
+        "2. Move the skills section above education - Key tools should be visible first.\n"
+        "3. Adopt a more technical tone - The team is engineering-led."
+    ),
+    "bullet_points": (
+        "- Built data pipelines that cut reporting latency by 40%\n"
+        "- Led a migration to containerized services, reducing deploy time from hours to minutes\n"
+        "- Mentored four engineers, raising team velocity by 25%"
+    ),
+    "interview_insights": (
+        "1. Known Questions: Describe a system you designed; How do you handle conflicting priorities?\n"
+        "2. Number of Rounds: 4 (recruiter screen, technical, system design, behavioral)\n"
+        "3. Key Insights: Candidates report a focus on practical problem solving."
+    ),
+    "fused_analysis": json.dumps({
+        "compatibility_evaluation": "1. Compatibility Score: 7 \n The resume covers most of the listed requirements.",
+        "suggestions": "Actionable Suggestions:\n1. Quantify the impact of recent projects - The role emphasizes outcomes.",
+        "bullet_points": "- Built data pipelines that cut reporting latency by 40%",
+    }),
+}
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic local chat model that answers every registered prompt with a template-shaped response.
+
+    Each call waits `latency` seconds (plus up to `jitter`, derived from the prompt so runs are repeatable)
+    and appends `output_tokens` filler tokens to the canned response. Token usage is reported like OpenAI's.
+    Company names and job titles are read from "Company:" and "Job Title:" lines of the job description.
+    """
+
+    latency: float = 0.5
+    jitter: float = 0.0
+    output_tokens: int = 0
+    seed: int = 0
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = self._prompt_text(messages)
+        time.sleep(self._delay(prompt))
+        return ChatResult(generations=[ChatGeneration(message=self._respond(prompt))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = self._prompt_text(messages)
+        await asyncio.sleep(self._delay(prompt))
+        return ChatResult(generations=[ChatGeneration(message=self._respond(prompt))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = self._prompt_text(messages)
+        response = self._respond(prompt)
+        words = response.content.split(" ")
+        pause = self._delay(prompt) / len(words)
+        for index, word in enumerate(words):
+            time.sleep(pause)
+            # Like OpenAI with `stream_usage`, the usage arrives with the last chunk
+            usage = response.usage_metadata if index == len(words) - 1 else None
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(content=word if index == 0 else f" {word}", usage_metadata=usage)
+            )
+
+    @staticmethod
+    def _prompt_text(messages):
+        return "\n".join(message.content for message in messages)
+
+    def _delay(self, prompt):
+        return self.latency + random.Random(f"{self.seed}:{prompt}").uniform(0, self.jitter)
+
+    def _respond(self, prompt):
+        name = identify_prompt(prompt)
+        if name == "extract_company_and_job_title":
+            company_name, job_title = read_company_and_job_title(prompt)
+            content = f"Company Name: {company_name}\nJob Title: {job_title}\nClarifications (if applicable): None"
+        elif name == "fused_validation_and_extraction":
+            company_name, job_title = read_company_and_job_title(prompt)
+            content = json.dumps({
+                "resume_validity": "Yes", "resume_sufficiency": "Sufficient",
+                "resume_reason": "Contains experience, education and skills sections.",
+                "job_description_validity": "Yes", "job_description_sufficiency": "Sufficient",
+                "job_description_reason": "Describes responsibilities and requirements.",
+                "company_name": company_name, "job_title": job_title,
+            })
+        else:
+            content = CANNED_RESPONSES.get(name, "No response configured for this prompt.")
+
+        if self.output_tokens and name not in JSON_PROMPTS:
+            content = f"{content}\n{self._filler(prompt)}"
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": len(prompt) // CHARS_PER_TOKEN,
+            "output_tokens": len(content) // CHARS_PER_TOKEN,
+            "total_tokens": (len(prompt) + len(content)) // CHARS_PER_TOKEN,
+        })
+
+    def _filler(self, prompt):
+        rng = random.Random(f"{self.seed}:filler:{prompt}")
+        # Filler words average about two tokens each
+        return " ".join(rng.choice(FILLER_WORDS) for _ in range(max(self.output_tokens // 2, 1)))
+
+
+def identify_prompt(prompt):
+    """
+    Return the name of the registered prompt a rendered prompt was built from, or None.
+    """
+    for name, (template, _) in {**PROMPTS, **JSON_PROMPTS}.items():
+        if prompt.strip().startswith(template.strip().splitlines()[0]):
+            return name
+    return None
+
+
+def read_company_and_job_title(prompt):
+    """
+    Read the "Company:" and "Job Title:" lines of a job description embedded in a prompt.
+    """
+    company = re.search(r"^Company:\s*(.+)$", prompt, re.MULTILINE)
+    title = re.search(r"^Job Title:\s*(.+)$", prompt, re.MULTILINE)
+    return (company.group(1).strip() if company else "Unknown", title.group(1).strip() if title else "Unknown")
+
+
+class FakeSerpServer:
+    """
+    Local HTTP stub for the SERP API search endpoint, returning `results` organic results per query
+    after `latency` seconds. Use as a context manager; point SERP_API_URL at `url`.
+    """
+
+    def __init__(self, latency=0.3, results=10, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.results = results
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/search.json"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def search(self, query):
+        """
+        Return the SERP API response body for a query.
+        """
+        with self._lock:
+            self.request_count += 1
+        return {
+            "search_parameters": {"q": query},
+            "organic_results": [
+                {
+                    "position": index + 1,
+                    "title": f"{query} - interview experience #{index + 1}",
+                    "snippet": "Four rounds: recruiter screen, coding, system design and a behavioral interview.",
+                    "link": f"https://example.com/interviews/{index + 1}",
+                }
+                for index in range(self.results)
+            ],
+        }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+                time.sleep(stub.latency)
+                body = json.dumps(stub.search(query)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
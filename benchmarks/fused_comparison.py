@@ -0,0 +1,108 @@
+"""
+Compare the multi-call analysis path with the fused two-call mode.
+
+Reports LLM calls, input/output tokens and wall-clock latency for each mode, and checks that
+both modes agree on validation outcome, company name, job title and compatibility score.
+
+Usage:
+    OPENAI_API_KEY=... SERP_API_KEY=... python -m benchmarks.fused_comparison \
+        --resume path/to/resume.pdf --job-description path/to/job.txt [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import time
+
+from app.nlp.model import LLMHelper, configure_llm_cache, run_analysis
+from app.utils import parse_resume
+
+MODES = {"multi-call": False, "fused": True}
+
+
+def run_mode(fused, resume_text, job_description, serp_api_key, openai_api_key, repeat):
+    """
+    Run one mode `repeat` times and return its last result, latencies and token usage per run.
+    """
+    latencies = []
+    usage = []
+    result = None
+    for _ in range(repeat):
+        llm_helper = LLMHelper(api_key=openai_api_key)
+        start = time.perf_counter()
+        result = run_analysis(
+            resume_text, job_description, serp_api_key, openai_api_key, fused=fused, llm_helper=llm_helper
+        )
+        latencies.append(time.perf_counter() - start)
+        usage.append(dict(llm_helper.token_usage))
+    return result, latencies, usage
+
+
+def compare_outputs(baseline, fused):
+    """
+    Return a list of (check, passed, detail) parity checks between two AnalysisResults.
+    """
+    checks = [("validation outcome", baseline.error == fused.error, f"{baseline.error!r} vs {fused.error!r}")]
+    if baseline.error is None and fused.error is None:
+        checks.append((
+            "company name",
+            (baseline.company_name or "").casefold() == (fused.company_name or "").casefold(),
+            f"{baseline.company_name!r} vs {fused.company_name!r}",
+        ))
+        checks.append((
+            "job title",
+            (baseline.job_title or "").casefold() == (fused.job_title or "").casefold(),
+            f"{baseline.job_title!r} vs {fused.job_title!r}",
+        ))
+        score_delta = None
+        if baseline.compatibility_score is not None and fused.compatibility_score is not None:
+            score_delta = abs(baseline.compatibility_score - fused.compatibility_score)
+        checks.append((
+            "compatibility score within 1 point",
+            score_delta is not None and score_delta <= 1,
+            f"{baseline.compatibility_score} vs {fused.compatibility_score}",
+        ))
+        checks.append((
+            "all sections present",
+            all(fused.analysis.get(section) for section in baseline.analysis),
+            ", ".join(section for section in baseline.analysis if not fused.analysis.get(section)) or "ok",
+        ))
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resume", required=True, help="Resume file (PDF or DOCX).")
+    parser.add_argument("--job-description", required=True, help="Text file containing the job description.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    openai_api_key = os.environ["OPENAI_API_KEY"]
+    serp_api_key = os.environ["SERP_API_KEY"]
+    resume_text = parse_resume(args.resume)
+    with open(args.job_description, encoding="utf-8") as file:
+        job_description = file.read()
+
+    # Every run must reach the model for the token and latency numbers to mean anything
+    configure_llm_cache(enabled=False)
+
+    results = {}
+    print(f"{'mode':<12}{'calls':>8}{'input tok':>12}{'output tok':>12}{'p50 s':>10}{'max s':>10}")
+    for mode, fused in MODES.items():
+        result, latencies, usage = run_mode(
+            fused, resume_text, job_description, serp_api_key, openai_api_key, args.repeat
+        )
+        results[mode] = result
+        print(
+            f"{mode:<12}{usage[-1]['calls']:>8}"
+            f"{statistics.mean(run['input_tokens'] for run in usage):>12.0f}"
+            f"{statistics.mean(run['output_tokens'] for run in usage):>12.0f}"
+            f"{statistics.median(latencies):>10.2f}{max(latencies):>10.2f}"
+        )
+
+    print("\nParity (fused vs multi-call):")
+    for check, passed, detail in compare_outputs(results["multi-call"], results["fused"]):
+        print(f"  [{'ok' if passed else 'FAIL'}] {check}: {detail}")
+
+
+if __name__ == "__main__":
+    main()
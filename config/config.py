@@ -1,6 +1,8 @@
 # config/config.py
 
+import json
 import os
+import tempfile
 
 
 class Config:
@@ -17,6 +19,109 @@ class Config:
     # File Paths
     DATA_FOLDER = os.path.join(os.getcwd(), 'test_data')
 
+    # Pooled HTTP/LLM clients
+    HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 10))
+    HTTP_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT', 60))
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+    HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', 0.5))
+    # Connections per event loop for the async serving path
+    HTTP_ASYNC_POOL_SIZE = int(os.environ.get('HTTP_ASYNC_POOL_SIZE', 100))
+
+    # LLM call timeout, retries with jittered exponential backoff (honoring Retry-After), and client-side
+    # rate limits per API key and model; set the limits to your OpenAI quota (0 disables a limit)
+    LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', 60))
+    LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 3))
+    LLM_RETRY_BASE_DELAY = float(os.environ.get('LLM_RETRY_BASE_DELAY', 1.0))
+    LLM_RETRY_MAX_DELAY = float(os.environ.get('LLM_RETRY_MAX_DELAY', 30.0))
+    LLM_RPM_LIMIT = int(os.environ.get('LLM_RPM_LIMIT', 0))
+    LLM_TPM_LIMIT = int(os.environ.get('LLM_TPM_LIMIT', 0))
+
+    # Model tiering: validation and extraction prompts run on gpt-4o-mini and fall back to gpt-4o when
+    # its answer cannot be parsed; LLM_PROMPT_MODELS overrides the model per prompt as JSON,
+    # e.g. '{"bullet_points": "gpt-4o-mini"}'
+    MODEL_TIERING_ENABLED = os.environ.get('MODEL_TIERING_ENABLED', 'true').lower() == 'true'
+    LLM_PROMPT_MODELS = json.loads(os.environ.get('LLM_PROMPT_MODELS', '{}'))
+
+    # Process-wide cap on concurrent analyses; excess requests queue, then get 429 (queue full) or 503 (timeout)
+    MAX_CONCURRENT_ANALYSES = int(os.environ.get('MAX_CONCURRENT_ANALYSES', 100))
+    MAX_QUEUED_ANALYSES = int(os.environ.get('MAX_QUEUED_ANALYSES', 200))
+    ANALYSIS_QUEUE_TIMEOUT = float(os.environ.get('ANALYSIS_QUEUE_TIMEOUT', 30))
+    OVERLOAD_RETRY_AFTER = int(os.environ.get('OVERLOAD_RETRY_AFTER', 5))
+
+    # Fused mode: two multi-section JSON calls instead of seven single-purpose prompts
+    FUSED_ANALYSIS = os.environ.get('FUSED_ANALYSIS', 'false').lower() == 'true'
+
+    # Parallel OCR for scanned PDFs (defaults to one worker per CPU)
+    OCR_MAX_WORKERS = int(os.environ['OCR_MAX_WORKERS']) if os.environ.get('OCR_MAX_WORKERS') else None
+    # Pages whose text layer has fewer characters than this are OCR'd
+    OCR_MIN_PAGE_CHARS = int(os.environ.get('OCR_MIN_PAGE_CHARS', 50))
+
+    # Stop extracting resume text after this many PDF pages / characters (unset for no limit)
+    DOCUMENT_MAX_PAGES = int(os.environ['DOCUMENT_MAX_PAGES']) if os.environ.get('DOCUMENT_MAX_PAGES') else None
+    DOCUMENT_MAX_CHARS = int(os.environ['DOCUMENT_MAX_CHARS']) if os.environ.get('DOCUMENT_MAX_CHARS') else None
+
+    # Parsed-document cache keyed by file content hash (set DOCUMENT_CACHE_PATH to share it across workers)
+    DOCUMENT_CACHE_ENABLED = os.environ.get('DOCUMENT_CACHE_ENABLED', 'true').lower() == 'true'
+    DOCUMENT_CACHE_MAX_ENTRIES = int(os.environ.get('DOCUMENT_CACHE_MAX_ENTRIES', 256))
+    DOCUMENT_CACHE_TTL = int(os.environ.get('DOCUMENT_CACHE_TTL', 7 * 24 * 60 * 60))
+    DOCUMENT_CACHE_PATH = os.environ.get('DOCUMENT_CACHE_PATH')
+
+    # Heuristic validation that runs before the LLM validation chains
+    HEURISTIC_VALIDATION_ENABLED = os.environ.get('HEURISTIC_VALIDATION_ENABLED', 'true').lower() == 'true'
+    HEURISTIC_REJECT_THRESHOLD = float(os.environ.get('HEURISTIC_REJECT_THRESHOLD', 0.9))
+    HEURISTIC_ACCEPT_THRESHOLD = float(os.environ.get('HEURISTIC_ACCEPT_THRESHOLD', 0.95))
+    HEURISTIC_SKIP_LLM_FOR_VALID = os.environ.get('HEURISTIC_SKIP_LLM_FOR_VALID', 'false').lower() == 'true'
+
+    # LLM response cache (set LLM_CACHE_PATH to share cached responses across worker processes)
+    LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 1024))
+    LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', 24 * 60 * 60))
+    LLM_CACHE_PATH = os.environ.get('LLM_CACHE_PATH')
+
+    # Share one computation between concurrent identical analyses and LLM calls (double submits, client retries)
+    REQUEST_COALESCING_ENABLED = os.environ.get('REQUEST_COALESCING_ENABLED', 'true').lower() == 'true'
+
+    # SERP API endpoint (point at a local stub for offline benchmarks)
+    SERP_API_URL = os.environ.get('SERP_API_URL', 'https://serpapi.com/search.json')
+
+    # SERP interview research cache keyed by normalized (company, job title); stale entries are served
+    # for RESEARCH_CACHE_STALE_TTL more seconds while refreshed in the background
+    RESEARCH_CACHE_ENABLED = os.environ.get('RESEARCH_CACHE_ENABLED', 'true').lower() == 'true'
+    RESEARCH_CACHE_TTL = int(os.environ.get('RESEARCH_CACHE_TTL', 7 * 24 * 60 * 60))
+    RESEARCH_CACHE_STALE_TTL = int(os.environ.get('RESEARCH_CACHE_STALE_TTL', 7 * 24 * 60 * 60))
+    RESEARCH_CACHE_MAX_ENTRIES = int(os.environ.get('RESEARCH_CACHE_MAX_ENTRIES', 2048))
+    RESEARCH_CACHE_PATH = os.environ.get('RESEARCH_CACHE_PATH')
+    # Also share the LLM's interview insights between users applying to the same company and title
+    INTERVIEW_INSIGHTS_CACHE_ENABLED = os.environ.get('INTERVIEW_INSIGHTS_CACHE_ENABLED', 'false').lower() == 'true'
+
+    # Per-prompt input token budgets; TOKEN_BUDGETS overrides defaults as JSON,
+    # e.g. '{"compatibility": {"resume_text": 4000}}'
+    TOKEN_BUDGET_ENABLED = os.environ.get('TOKEN_BUDGET_ENABLED', 'true').lower() == 'true'
+    TOKEN_BUDGETS = json.loads(os.environ.get('TOKEN_BUDGETS', '{}'))
+
+    # Background analysis jobs (set JOB_STORE_PATH to share the queue with `python -m app.worker` processes;
+    # JOB_WORKERS=0 leaves running jobs to those workers and requires JOB_STORE_PATH)
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_MAX_QUEUED = int(os.environ.get('JOB_MAX_QUEUED', 100))
+    JOB_RESULT_TTL = int(os.environ.get('JOB_RESULT_TTL', 60 * 60))
+    JOB_STORE_PATH = os.environ.get('JOB_STORE_PATH')
+    # Seconds a running job may go without a worker heartbeat before it is reclaimed, and starts allowed per job
+    JOB_LEASE_TIMEOUT = int(os.environ.get('JOB_LEASE_TIMEOUT', 5 * 60))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+
+    # Logging level for the app's loggers, and the Prometheus `/metrics` endpoint
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+
+    # Request profiling: PROFILING_ENABLED profiles every analysis, PROFILING_HEADER_ENABLED lets clients holding
+    # PROFILING_ACCESS_TOKEN ask for a profile with an `X-Profile: true` header. Profiles are kept in PROFILING_DIR
+    # and served only to requests bearing the token.
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_HEADER_ENABLED = os.environ.get('PROFILING_HEADER_ENABLED', 'false').lower() == 'true'
+    PROFILING_ACCESS_TOKEN = os.environ.get('PROFILING_ACCESS_TOKEN')
+    PROFILING_DIR = os.environ.get('PROFILING_DIR', os.path.join(tempfile.gettempdir(), 'resume-tailor-profiles'))
+    PROFILING_MAX_PROFILES = int(os.environ.get('PROFILING_MAX_PROFILES', 100))
+
     # Add other base configurations here
 
 
@@ -34,12 +139,16 @@ class TestingConfig(Config):
     DEBUG = True
     ENV = 'testing'
     DATABASE_URI = 'sqlite:///test_database.db'
+    LLM_CACHE_ENABLED = False
+    DOCUMENT_CACHE_ENABLED = False
+    RESEARCH_CACHE_ENABLED = False
 
 
 class ProductionConfig(Config):
     """Production configuration."""
     ENV = 'production'
     DATABASE_URI = os.environ.get('PRODUCTION_DATABASE_URI')
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING').upper()
     # Add other production-specific config
 
 
@@ -0,0 +1,10 @@
+# config/keys.py
+
+import os
+
+try:
+    from api_keys.keys import OPENAI_API_KEY, SERP_API_KEY
+except ImportError:
+    # No local api_keys module (e.g. containers, CI, offline benchmarks): read the keys from the environment
+    OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+    SERP_API_KEY = os.environ.get('SERP_API_KEY')
@@ -7,6 +7,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import streamlit as st
 from app.utils import parse_resume  # Parse resume text from uploaded files
 from app.nlp.model import run_full_analysis
+from app.bootstrap import configure_services
+from config.config import get_config
 
 # Constants for messages
 ERROR_INVALID_API_KEY = "❌ Invalid API key format. API keys usually start with 'sk-'. Please check and try again."
@@ -20,6 +22,14 @@ SUCCESS_API_KEY = "✅ API keys verified successfully!"
 SUCCESS_RESUME_PROCESSED = "✅ Resume successfully processed."
 
 
+@st.cache_resource
+def configure_shared_services():
+    """
+    Configure the pooled clients and caches once per process, not on every Streamlit rerun.
+    """
+    configure_services(get_config(os.environ.get('FLASK_ENV', 'development')))
+
+
 def validate_api_keys(openai_api_key_input, serp_api_key_input):
     """
     Validate the OpenAI and SERP API keys entered by the user.
@@ -93,6 +103,13 @@ def display_results(results):
     compatibility = results.get("analysis", {}).get("compatibility_evaluation", "N/A")
     st.write(f"**{compatibility}**")
 
+    st.subheader("🧮 Keyword Match")
+    keyword_score = results.get("analysis", {}).get("keyword_score")
+    if keyword_score is not None:
+        st.write(f"**Keyword score:** {keyword_score:.0%}")
+    missing_skills = results.get("analysis", {}).get("missing_skills", [])
+    st.write(f"**Missing skills:** {', '.join(missing_skills)}" if missing_skills else "No missing skills detected.")
+
     st.subheader("🔍 Suggestions for Improvement")
     suggestions = results.get("analysis", {}).get("suggestions", "No suggestions available.")
     st.write(suggestions)
@@ -138,6 +155,8 @@ def main():
     """
     Main entry-point function for running the Streamlit app.
     """
+    configure_shared_services()
+
     # Title and description
     st.title("Resume Tailor 1.0")
     st.markdown(
@@ -0,0 +1,159 @@
+import io
+
+import pytest
+from docx import Document
+from langchain_core.messages import AIMessage
+from pydantic import Field
+
+from app.bootstrap import configure_services
+from app.main import create_app
+from app.nlp.clients import configure_clients
+from benchmarks.fakes import CHARS_PER_TOKEN, FakeChatModel, FakeSerpServer, identify_prompt
+from config.config import get_config
+
+# A job description the fake chat model can read the company name and job title from
+JOB_DESCRIPTION = """Company: Acme Analytics
+Job Title: Senior Data Engineer
+
+Responsibilities
+- Build and operate batch and streaming data pipelines in Python and Spark.
+- Own the data warehouse on Snowflake and its dbt models.
+
+Requirements
+- 5+ years of experience with Python, SQL and Airflow.
+- Experience with AWS, Docker and CI/CD.
+"""
+
+RESUME_TEXT = """Jane Doe
+jane.doe@example.com | +1 555 010 2000
+
+Summary
+Data engineer who builds reliable pipelines and warehouses.
+
+Experience
+Data Engineer, Example Corp (2019 - present)
+- Developed Python and Spark pipelines processing 2 TB per day.
+- Managed the migration of reporting to Snowflake and dbt.
+
+Education
+B.Sc. Computer Science, State University
+
+Skills
+Python, SQL, Spark, Airflow, Docker, PostgreSQL
+"""
+
+
+class ScriptedChatModel(FakeChatModel):
+    """
+    The benchmark's fake chat model, answering the prompts in `overrides` with fixed content
+    and recording the registered prompt name of every call.
+    """
+
+    overrides: dict = Field(default_factory=dict)
+    calls: list = Field(default_factory=list)
+
+    def _respond(self, prompt):
+        name = identify_prompt(prompt)
+        self.calls.append(name)
+        if name not in self.overrides:
+            return super()._respond(prompt)
+        content = self.overrides[name]
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": len(prompt) // CHARS_PER_TOKEN,
+            "output_tokens": len(content) // CHARS_PER_TOKEN,
+            "total_tokens": (len(prompt) + len(content)) // CHARS_PER_TOKEN,
+        })
+
+
+@pytest.fixture(scope="session")
+def serp_server():
+    with FakeSerpServer(latency=0, results=3) as server:
+        yield server
+
+
+class FakeModels(dict):
+    """
+    ScriptedChatModels by model name, created on first use by the client registry.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.overrides = {}
+
+    def create(self, model_name):
+        if model_name not in self:
+            self[model_name] = ScriptedChatModel(latency=0, overrides=self.overrides)
+        return self[model_name]
+
+    def script(self, prompt_name, content, model=None):
+        """
+        Answer a prompt with fixed content on one model, or on every model (including ones created later).
+        """
+        models = [self.create(model)] if model is not None else list(self.values())
+        if model is None:
+            self.overrides[prompt_name] = content
+        for llm in models:
+            llm.overrides[prompt_name] = content
+
+    def calls(self, model=None):
+        """
+        Return the prompt names called on one model, or on every model.
+        """
+        models = [self[model]] if model is not None else self.values()
+        return [call for llm in models for call in llm.calls]
+
+
+def docx_bytes(text):
+    """
+    Return a DOCX document with one paragraph per line of the text.
+    """
+    document = Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def fake_llms():
+    return FakeModels()
+
+
+def configure_testing_services(fake_llms, serp_url):
+    """
+    Configure the process-wide services with the testing config (caches disabled), the SERP stub
+    and the fake chat models of `fake_llms`.
+    """
+    config = get_config("testing")
+    configure_services({
+        **{key: getattr(config, key) for key in dir(config) if key.isupper()},
+        "SERP_API_URL": serp_url,
+        "JOB_WORKERS": 1,
+    })
+
+    configure_clients(llm_factory=lambda **kwargs: fake_llms.create(kwargs["model_name"]))
+
+
+@pytest.fixture
+def services(fake_llms, serp_server):
+    """
+    Offline process-wide services; yields the fake chat models by model name.
+    """
+    configure_testing_services(fake_llms, serp_server.url)
+    yield fake_llms
+    configure_services(get_config("testing"))
+
+
+@pytest.fixture
+def app(services, serp_server, monkeypatch):
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    flask_app = create_app()
+    # create_app configured the services from the environment; point them back at the fakes
+    configure_testing_services(services, serp_server.url)
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,80 @@
+import io
+
+import pytest
+
+from app.nlp.model import AnalysisResult, AnalysisService, run_analysis, run_full_analysis
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT, docx_bytes
+
+
+def test_run_analysis_returns_every_intermediate_artifact(services):
+    result = run_analysis(RESUME_TEXT, JOB_DESCRIPTION, "serp-key", "openai-key")
+
+    assert result.error is None
+    assert (result.company_name, result.job_title) == ("Acme Analytics", "Senior Data Engineer")
+    assert result.resume_validation[0] == "Yes"
+    assert result.compatibility_score == 7
+    assert len(result.search_results) == 3
+    assert set(result.analysis) == {"compatibility_evaluation", "suggestions", "bullet_points"}
+
+
+def test_run_full_analysis_keeps_the_response_shape(services):
+    response = run_full_analysis(RESUME_TEXT, JOB_DESCRIPTION, "serp-key", "openai-key")
+
+    assert response["validation_results"] == "Valid inputs."
+    assert set(response["analysis"]) == {
+        "compatibility_evaluation", "suggestions", "bullet_points", "keyword_score", "missing_skills",
+    }
+    assert response["interview_insights"]
+
+
+def test_failed_validation_becomes_an_error_result(services):
+    services.script(
+        "validate_job_description",
+        "1. Job Description Validity: No - Not a job.\n2. Job Description Sufficiency: Insufficient - Not a job.",
+    )
+
+    result = run_analysis(RESUME_TEXT, JOB_DESCRIPTION, "serp-key", "openai-key")
+
+    assert result.to_dict() == {
+        "error": "Validation failed for one or both inputs.",
+        "details": ["Invalid Job Description: Not a job."],
+    }
+    assert "compatibility" not in services.calls()
+
+
+@pytest.mark.parametrize("evaluation, score", [
+    ("1. Compatibility Score: 7 \n Good match.", 7.0),
+    ("Compatibility Score: **8.5**", 8.5),
+    ("No score here.", None),
+    (None, None),
+])
+def test_parse_compatibility_score(evaluation, score):
+    assert AnalysisService.parse_compatibility_score(evaluation) == score
+
+
+def test_from_error_keeps_details():
+    result = AnalysisResult.from_error({"error": "Bad input.", "details": ["Missing title."]})
+
+    assert result.to_dict() == {"error": "Bad input.", "details": ["Missing title."]}
+
+
+def test_upload_route_extracts_the_company_and_title_once(client, services):
+    response = client.post("/api/resume/upload", data={
+        "file": (io.BytesIO(docx_bytes(RESUME_TEXT)), "resume.docx"),
+        "job_description": JOB_DESCRIPTION,
+    }, content_type="multipart/form-data")
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body["company_name"], body["job_title"]) == ("Acme Analytics", "Senior Data Engineer")
+    assert services.calls().count("extract_company_and_job_title") == 1
+
+
+def test_upload_route_rejects_unsupported_files(client):
+    response = client.post("/api/resume/upload", data={
+        "file": (io.BytesIO(b"plain text"), "resume.txt"),
+        "job_description": JOB_DESCRIPTION,
+    }, content_type="multipart/form-data")
+
+    assert response.status_code == 400
+    assert "Unsupported file format" in response.get_json()["error"]
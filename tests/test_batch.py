@@ -0,0 +1,145 @@
+import io
+import threading
+from contextlib import contextmanager
+
+from app.concurrency import configure_concurrency_limiter, get_concurrency_limiter
+from app.nlp import model
+from app.nlp.budget import configure_token_budgets, get_token_budgeter
+from app.nlp.model import run_batch_analysis
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT, docx_bytes
+
+JOB_DESCRIPTIONS = [
+    JOB_DESCRIPTION,
+    JOB_DESCRIPTION.replace("Acme Analytics", "Globex").replace("Snowflake", "BigQuery"),
+    """Company: Initech
+Job Title: Sales Associate
+
+Responsibilities
+- Sell printers and office supplies to local businesses.
+- Meet monthly sales targets and keep the CRM up to date.
+
+Requirements
+- 2+ years of experience in sales and customer service.
+""",
+]
+
+
+def test_batch_validates_the_resume_once_and_ranks_every_job(services):
+    results = run_batch_analysis(RESUME_TEXT, JOB_DESCRIPTIONS, "serp-key", "openai-key")
+
+    ranked = results["ranked_results"]
+    assert sorted(item["job_index"] for item in ranked) == [0, 1, 2]
+    assert [item["company_name"] for item in ranked if item["job_index"] == 1] == ["Globex"]
+    assert services.calls().count("validate_resume") == 1
+    assert services.calls().count("validate_job_description") == len(JOB_DESCRIPTIONS)
+
+
+def test_batch_shares_the_resumes_keyword_match_and_fitted_texts(services, monkeypatch):
+    budgeter = get_token_budgeter()
+    fitted_variables = []
+    original_fit = budgeter.fit
+
+    def counting_fit(text, variable, max_tokens):
+        fitted_variables.append(variable)
+        return original_fit(text, variable, max_tokens)
+
+    def fail_match(*args):
+        raise AssertionError("the keyword match of a batch job should come from the batch's score matrix")
+
+    monkeypatch.setattr(budgeter, "fit", counting_fit)
+    monkeypatch.setattr(model.keyword_scorer, "match", fail_match)
+
+    results = run_batch_analysis(RESUME_TEXT, JOB_DESCRIPTIONS, "serp-key", "openai-key")
+
+    resume_budgets = {
+        budget["resume_text"] for name, budget in budgeter.budgets.items()
+        if "resume_text" in budget and not name.startswith("fused")
+    }
+    assert fitted_variables.count("resume_text") == len(resume_budgets)
+    scores = {item["job_index"]: item["keyword_score"] for item in results["ranked_results"]}
+    assert scores[0] > scores[2]
+
+
+def test_batch_reports_the_tokens_saved_by_validation_and_every_job(services):
+    configure_token_budgets(budgets={
+        "validate_resume": {"resume_text": 40},
+        "compatibility": {"resume_text": 40},
+    })
+
+    results = run_batch_analysis(RESUME_TEXT, JOB_DESCRIPTIONS[:2], "serp-key", "openai-key")
+
+    per_job = sum(item["results"]["tokens_saved"] for item in results["ranked_results"])
+    assert per_job > 0
+    assert results["tokens_saved"] > per_job
+
+
+def test_batch_skips_jobs_below_the_keyword_threshold_without_llm_calls(services):
+    results = run_batch_analysis(RESUME_TEXT, JOB_DESCRIPTIONS[2:], "serp-key", "openai-key", min_keyword_score=0.9)
+
+    (skipped,) = results["ranked_results"]
+    assert skipped["results"]["error"].startswith("Skipped: keyword match score")
+    assert services.calls() == ["validate_resume"]
+
+
+def test_batch_reports_an_invalid_resume_without_analyzing_jobs(services):
+    services.script(
+        "validate_resume", "1. Resume Validity: No - Not a resume.\n2. Resume Sufficiency: Insufficient - Not a resume."
+    )
+
+    results = run_batch_analysis(RESUME_TEXT, JOB_DESCRIPTIONS, "serp-key", "openai-key")
+
+    assert results["error"] == "Validation failed for the resume."
+    assert services.calls() == ["validate_resume"]
+
+
+def test_batch_holds_one_slot_per_job_in_flight(services):
+    lock = threading.Lock()
+    held = []
+    peak = []
+
+    @contextmanager
+    def job_slot():
+        with lock:
+            held.append(None)
+            peak.append(len(held))
+        try:
+            yield
+        finally:
+            with lock:
+                held.pop()
+
+    run_batch_analysis(RESUME_TEXT, JOB_DESCRIPTIONS, "serp-key", "openai-key", max_concurrency=2, job_slot=job_slot)
+
+    # One slot for the resume validation, then one per analyzed job
+    assert len(peak) == 1 + len(JOB_DESCRIPTIONS)
+    assert max(peak) <= 2
+
+
+def test_batch_route_does_not_deadlock_on_a_single_slot(client):
+    configure_concurrency_limiter(max_concurrent=1, max_queued=10, queue_timeout=5)
+
+    response = client.post("/api/resume/batch", data={
+        "file": (io.BytesIO(docx_bytes(RESUME_TEXT)), "resume.docx"),
+        "job_descriptions": JOB_DESCRIPTIONS,
+    }, content_type="multipart/form-data")
+
+    assert response.status_code == 200
+    assert len(response.get_json()["results"]["ranked_results"]) == len(JOB_DESCRIPTIONS)
+    assert get_concurrency_limiter().active == 0
+
+
+def test_batch_route_responds_429_when_no_slot_can_be_queued(client):
+    configure_concurrency_limiter(max_concurrent=1, max_queued=0, queue_timeout=5)
+    limiter = get_concurrency_limiter()
+    limiter.acquire()
+    try:
+        response = client.post("/api/resume/batch", data={
+            "file": (io.BytesIO(docx_bytes(RESUME_TEXT)), "resume.docx"),
+            "job_descriptions": JOB_DESCRIPTIONS,
+        }, content_type="multipart/form-data")
+    finally:
+        limiter.release()
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"]
+
@@ -0,0 +1,35 @@
+import pytest
+
+from benchmarks.end_to_end import check_limits, percentile, run_stage
+
+
+def analyze(workload):
+    if workload == "raise":
+        raise RuntimeError("crashed")
+    if workload == "invalid":
+        return {"error": "Validation failed for one or both inputs.", "details": ["Invalid Resume: Not a resume."]}
+    return {"validation_results": "Valid inputs."}
+
+
+def test_run_stage_counts_raised_exceptions_and_error_results(capsys):
+    row = run_stage("analysis@2", analyze, ["ok", "raise", "invalid", "ok"], clients=2)
+
+    assert (row["requests"], row["errors"]) == (4, 2)
+    assert "Validation failed for one or both inputs." in capsys.readouterr().out
+    assert check_limits([row], []) == ["analysis@2: 2 errors"]
+
+
+def test_check_limits_reports_slow_and_unknown_stages():
+    row = run_stage("parse:pdf", lambda workload: "text", ["a", "b"], clients=1)
+    row["p95_ms"] = 250.0
+
+    assert check_limits([row], ["parse:pdf=300"]) == []
+    assert check_limits([row], ["parse:pdf=200", "missing=1"]) == [
+        "parse:pdf: p95 250.0 ms exceeds 200.0 ms",
+        "missing: no such stage",
+    ]
+
+
+@pytest.mark.parametrize("percent, value", [(50, 5), (95, 10), (100, 10), (0, 1)])
+def test_percentile_uses_the_nearest_rank(percent, value):
+    assert percentile(range(1, 11), percent) == value
@@ -0,0 +1,109 @@
+import pytest
+
+from app.nlp.budget import RESUME_SECTIONS, BudgetedInputs, TokenBudgeter, TokenCounter, _share_budget
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT
+
+REFERENCES = "\nReferences\n" + "Available on request from former managers and colleagues.\n" * 20
+HOBBIES = "\nHobbies\n" + "Climbing, chess and long-distance cycling across Europe.\n" * 20
+
+
+class EstimatingCounter(TokenCounter):
+    """
+    The characters-per-token estimate, so token counts do not depend on tiktoken being available.
+    """
+
+    @property
+    def encoding(self):
+        return None
+
+
+@pytest.fixture
+def budgeter():
+    return TokenBudgeter(counter=EstimatingCounter())
+
+
+def test_text_within_budget_is_returned_unchanged(budgeter):
+    fitted = budgeter.fit(RESUME_TEXT, "resume_text", 10_000)
+
+    assert fitted.text == RESUME_TEXT
+    assert fitted.tokens == fitted.original_tokens
+
+
+def test_boilerplate_is_dropped_before_valuable_sections(budgeter):
+    resume = RESUME_TEXT + REFERENCES + HOBBIES
+    budget = budgeter.counter.count(RESUME_TEXT) + 20
+
+    fitted = budgeter.fit(resume, "resume_text", budget)
+
+    assert fitted.tokens <= budget
+    assert "References" not in fitted.text and "Hobbies" not in fitted.text
+    assert "Experience" in fitted.text and "Python, SQL, Spark" in fitted.text
+
+
+@pytest.mark.parametrize("budget", [5, 40, 120])
+def test_fitted_text_never_exceeds_the_budget(budgeter, budget):
+    for variable, text in (("resume_text", RESUME_TEXT + REFERENCES), ("job_description", JOB_DESCRIPTION * 4)):
+        fitted = budgeter.fit(text, variable, budget)
+
+        assert fitted.tokens <= budget
+        assert budgeter.counter.count(fitted.text) == fitted.tokens
+
+
+def test_truncation_keeps_the_highest_priority_sections(budgeter):
+    fitted = budgeter.fit(RESUME_TEXT + REFERENCES, "resume_text", 40)
+
+    assert "Experience" in fitted.text
+    assert "Education" not in fitted.text
+
+
+def test_segment_splits_at_recognized_headers():
+    sections = TokenBudgeter.segment(RESUME_TEXT, RESUME_SECTIONS)
+
+    assert [section.name for section in sections] == ["header", "summary", "experience", "education", "skills"]
+    assert sections[0].lines[0] == "Jane Doe"
+
+
+@pytest.mark.parametrize("sizes, budget, allowances", [
+    ({"a": 10, "b": 10}, 100, {"a": 10, "b": 10}),
+    ({"a": 10, "b": 100, "c": 100}, 70, {"a": 10, "b": 30, "c": 30}),
+    ({"a": 10}, -5, {"a": 0}),
+])
+def test_share_budget_gives_small_sections_all_they_need(sizes, budget, allowances):
+    assert _share_budget(sizes, budget) == allowances
+
+
+def test_budgeted_inputs_fit_once_per_budget_and_count_saved_tokens(budgeter, monkeypatch):
+    fits = []
+    original_fit = budgeter.fit
+    monkeypatch.setattr(budgeter, "fit", lambda *args: fits.append(args[1:]) or original_fit(*args))
+    budgeter.budgets = {"compatibility": {"resume_text": 30}, "suggestions": {"resume_text": 30}}
+    inputs = BudgetedInputs(budgeter, RESUME_TEXT + REFERENCES, JOB_DESCRIPTION)
+
+    first = inputs.fit("compatibility", "resume_text")
+    second = inputs.fit("suggestions", "resume_text")
+
+    assert first == second
+    assert fits == [("resume_text", 30)]
+    assert inputs.tokens_saved == 2 * (budgeter.counter.count(RESUME_TEXT + REFERENCES) - budgeter.counter.count(first))
+    assert inputs.fit("bullet_points", "job_description") == JOB_DESCRIPTION
+
+
+def test_inputs_for_another_job_description_share_the_resume_fits(budgeter, monkeypatch):
+    fits = []
+    original_fit = budgeter.fit
+    monkeypatch.setattr(budgeter, "fit", lambda *args: fits.append(args[1]) or original_fit(*args))
+    inputs = BudgetedInputs(budgeter, RESUME_TEXT * 30, JOB_DESCRIPTION)
+    other = inputs.for_job_description(JOB_DESCRIPTION * 30)
+
+    inputs.inputs("compatibility")
+    other_inputs = other.inputs("compatibility")
+
+    assert sorted(fits) == ["job_description", "job_description", "resume_text"]
+    assert other_inputs["resume_text"] == inputs.fit("compatibility", "resume_text")
+    assert other_inputs["job_description"] != inputs.fit("compatibility", "job_description")
+
+
+def test_without_a_budgeter_texts_are_passed_through():
+    inputs = BudgetedInputs(None, RESUME_TEXT, JOB_DESCRIPTION)
+
+    assert inputs.inputs("compatibility") == {"resume_text": RESUME_TEXT, "job_description": JOB_DESCRIPTION}
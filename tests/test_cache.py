@@ -0,0 +1,106 @@
+import time
+
+from app.cache import MemoryCache, SQLiteCache, TieredCache, build_cache, make_cache_key
+from app.nlp.model import LLMHelper, configure_llm_cache, get_llm_cache
+
+
+def test_cache_key_is_stable_and_depends_on_every_part():
+    key = make_cache_key("template", "gpt-4o", 0, "prompt")
+
+    assert key == make_cache_key("template", "gpt-4o", 0, "prompt")
+    assert key != make_cache_key("template", "gpt-4o-mini", 0, "prompt")
+    assert key != make_cache_key("template", "gpt-4o", 0, "other prompt")
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_memory_cache_expires_entries_after_ttl():
+    cache = MemoryCache(ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_round_trips_json_and_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteCache(path).set("key", {"text": "value", "items": [1, 2]})
+
+    assert SQLiteCache(path).get("key") == {"text": "value", "items": [1, 2]}
+    assert SQLiteCache(path).get("missing") is None
+
+
+def test_sqlite_cache_expires_entries_after_ttl(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), ttl=0.05)
+    cache.set("old", "value")
+
+    time.sleep(0.1)
+    cache.set("new", "value")
+
+    assert cache.get("old") is None
+    assert cache.get("new") == "value"
+    assert len(cache) == 1
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_tiered_cache_promotes_disk_hits_and_counts_them(tmp_path):
+    path = str(tmp_path / "cache.db")
+    build_cache(path=path).set("key", "value")
+    cache = TieredCache(MemoryCache(), SQLiteCache(path))
+
+    assert cache.get("key") == "value"
+    assert cache.memory.get("key") == "value"
+    assert cache.get("missing") is None
+    assert cache.stats() == {"hits": 1, "disk_hits": 1, "misses": 1, "memory_entries": 1}
+
+
+def test_llm_helper_serves_repeated_calls_from_the_cache(services):
+    configure_llm_cache(enabled=True)
+    helper = LLMHelper(api_key="test", prompt_models={})
+    chain = helper.get_chain("bullet_points")
+
+    first = helper.invoke_chain(chain, job_description="Build pipelines.")
+    second = helper.invoke_chain(chain, job_description="Build pipelines.")
+    helper.invoke_chain(chain, job_description="Design APIs.")
+
+    assert first == second
+    assert services["gpt-4o"].calls == ["bullet_points", "bullet_points"]
+    assert get_llm_cache().stats()["hits"] == 1
+
+
+def test_llm_helper_without_cache_always_calls_the_model(services):
+    configure_llm_cache(enabled=False)
+    helper = LLMHelper(api_key="test", prompt_models={})
+    chain = helper.get_chain("bullet_points")
+
+    helper.invoke_chain(chain, job_description="Build pipelines.")
+    helper.invoke_chain(chain, job_description="Build pipelines.")
+
+    assert services["gpt-4o"].calls == ["bullet_points", "bullet_points"]
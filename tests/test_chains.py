@@ -0,0 +1,32 @@
+import pytest
+
+from app.nlp.chains import PROMPTS, ChainRegistry, chain_registry
+from benchmarks.fakes import FakeChatModel
+
+
+def test_registry_compiles_every_prompt():
+    for name, (template, input_variables) in PROMPTS.items():
+        assert sorted(chain_registry.get_prompt(name).input_variables) == sorted(input_variables)
+        assert chain_registry.find_name(template) == name
+
+
+def test_register_rejects_mismatched_input_variables():
+    with pytest.raises(ValueError, match="declares input variables"):
+        ChainRegistry({"greeting": ("Hello {name}", ["first_name"])})
+
+
+def test_get_prompt_rejects_unknown_names():
+    with pytest.raises(ValueError, match="Unknown prompt"):
+        chain_registry.get_prompt("missing")
+
+
+def test_chains_are_built_once_per_prompt_and_client():
+    registry = ChainRegistry(PROMPTS)
+    client = FakeChatModel(latency=0)
+
+    chain = registry.get_chain("bullet_points", client)
+
+    assert registry.get_chain("bullet_points", client) is chain
+    assert registry.get_chain("suggestions", client) is not chain
+    assert registry.get_chain("bullet_points", FakeChatModel(latency=0)) is not chain
+    assert registry.build_chain("bullet_points", client) is not chain
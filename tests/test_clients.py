@@ -0,0 +1,103 @@
+import asyncio
+import io
+
+from app.nlp.clients import ClientRegistry, get_client_registry
+from benchmarks.fakes import FakeChatModel
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT, docx_bytes
+
+
+def make_registry():
+    return ClientRegistry(llm_factory=lambda **kwargs: FakeChatModel(latency=0))
+
+
+def test_llm_clients_are_shared_per_key():
+    registry = make_registry()
+
+    client = registry.get_llm_client("key", "gpt-4o", 0)
+
+    assert registry.get_llm_client("key", "gpt-4o", 0) is client
+    assert registry.get_llm_client("key", "gpt-4o-mini", 0) is not client
+    assert registry.get_llm_client("other-key", "gpt-4o", 0) is not client
+
+
+def test_http_session_is_shared_and_retries():
+    registry = make_registry()
+
+    session = registry.get_http_session()
+
+    assert registry.get_http_session() is session
+    assert session.get_adapter("https://serpapi.com").max_retries.total == registry.max_retries
+
+
+def test_async_clients_are_shared_within_a_loop_but_not_across_loops():
+    registry = make_registry()
+
+    async def clients():
+        first = (registry.get_async_http_client(), registry.get_async_llm_client("key", "gpt-4o", 0))
+        second = (registry.get_async_http_client(), registry.get_async_llm_client("key", "gpt-4o", 0))
+        assert first[0] is second[0] and first[1] is second[1]
+        return first
+
+    first_loop = asyncio.run(clients())
+    second_loop = asyncio.run(clients())
+
+    assert first_loop[0] is not second_loop[0]
+    assert first_loop[1] is not second_loop[1]
+
+
+def test_close_forgets_cached_clients():
+    registry = make_registry()
+    client = registry.get_llm_client("key", "gpt-4o", 0)
+    session = registry.get_http_session()
+
+    registry.close()
+
+    assert registry.get_llm_client("key", "gpt-4o", 0) is not client
+    assert registry.get_http_session() is not session
+
+
+def test_async_view_under_wsgi_closes_its_loops_clients(client, monkeypatch):
+    registry = get_client_registry()
+    loop_clients = []
+    original = registry._get_loop_clients
+
+    def recording_loop_clients():
+        clients = original()
+        loop_clients.append(clients["http"])
+        return clients
+
+    monkeypatch.setattr(registry, "_get_loop_clients", recording_loop_clients)
+
+    for _ in range(2):
+        response = client.post("/api/resume/upload/async", data={
+            "file": (io.BytesIO(docx_bytes(RESUME_TEXT)), "resume.docx"),
+            "job_description": JOB_DESCRIPTION,
+        }, content_type="multipart/form-data")
+        assert response.status_code == 200
+
+    assert len(set(map(id, loop_clients))) == 2
+    assert all(http_client.is_closed for http_client in loop_clients)
+    assert len(registry._async_clients) == 0
+
+
+def test_aclose_loop_clients_leaves_other_loops_alone():
+    registry = make_registry()
+
+    async def open_clients():
+        return registry.get_async_http_client()
+
+    async def open_and_close_clients():
+        http_client = registry.get_async_http_client()
+        await registry.aclose_loop_clients()
+        await registry.aclose_loop_clients()
+        return http_client
+
+    loop = asyncio.new_event_loop()
+    try:
+        kept = loop.run_until_complete(open_clients())
+        closed = asyncio.run(open_and_close_clients())
+        assert closed.is_closed and not kept.is_closed
+        assert registry._async_clients.get(loop)["http"] is kept
+    finally:
+        loop.run_until_complete(kept.aclose())
+        loop.close()
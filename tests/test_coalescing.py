@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.cache import SingleFlight
+from app.nlp.model import configure_request_coalescing, run_analysis
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT
+
+CALLERS = 4
+
+
+def run_concurrently(flights, key, func):
+    """
+    Call `flights.do(key, func)` from CALLERS threads at once; returns each caller's result or exception.
+    """
+    def call():
+        try:
+            return flights.do(key, func)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        return list(pool.map(lambda _: call(), range(CALLERS)))
+
+
+def wait_for_followers(flights, started, release):
+    """
+    Once the leader is running, let it finish after every other caller has joined its flight.
+    """
+    started.wait(5)
+    while flights.saved_calls < CALLERS - 1:
+        time.sleep(0.001)
+    release.set()
+
+
+def test_concurrent_identical_calls_share_one_result():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(None)
+        started.set()
+        release.wait(5)
+        return object()
+
+    threading.Thread(target=wait_for_followers, args=(flights, started, release)).start()
+    results = run_concurrently(flights, "key", compute)
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flights.stats() == {"saved_calls": CALLERS - 1, "in_flight": 0}
+
+
+def test_concurrent_identical_calls_share_one_exception():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("upstream failed")
+
+    threading.Thread(target=wait_for_followers, args=(flights, started, release)).start()
+    results = run_concurrently(flights, "key", compute)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flights.do("key", lambda: "retried") == "retried"
+
+
+def test_sequential_calls_are_not_coalesced():
+    flights = SingleFlight()
+
+    assert [flights.do("key", lambda value=value: value) for value in (1, 2)] == [1, 2]
+    assert flights.saved_calls == 0
+
+
+def test_async_calls_share_one_result_and_exception():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    async def main():
+        results = await asyncio.gather(*(flights.ado("key", compute) for _ in range(CALLERS)))
+        errors = await asyncio.gather(*(flights.ado("fail", fail) for _ in range(CALLERS)), return_exceptions=True)
+        return results, errors
+
+    results, errors = asyncio.run(main())
+
+    assert results == [1] * CALLERS
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert flights.stats() == {"saved_calls": 2 * (CALLERS - 1), "in_flight": 0}
+
+
+def test_cancelled_async_caller_does_not_cancel_the_shared_call():
+    flights = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.create_task(flights.ado("key", compute))
+        second = asyncio.create_task(flights.ado("key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_concurrent_identical_analyses_share_one_run(services):
+    configure_request_coalescing(enabled=True)
+    for model in ("gpt-4o", "gpt-4o-mini"):
+        # Slow enough that the second analysis starts while the first is still running
+        services.create(model).latency = 0.05
+    barrier = threading.Barrier(2)
+
+    def analyze():
+        barrier.wait(5)
+        return run_analysis(RESUME_TEXT, JOB_DESCRIPTION, "serp-key", "openai-key")
+
+    with ThreadPoolExecutor(2) as pool:
+        first, second = pool.map(lambda _: analyze(), range(2))
+
+    assert first is second
+    assert services.calls().count("compatibility") == 1
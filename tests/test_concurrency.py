@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.concurrency import ConcurrencyLimiter, QueueFull, QueueTimeout
+
+
+def test_slot_is_held_for_the_block():
+    limiter = ConcurrencyLimiter(max_concurrent=2)
+
+    with limiter.slot():
+        assert limiter.active == 1
+
+    assert limiter.active == 0
+
+
+def test_full_queue_rejects_with_429():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queued=0, retry_after=7)
+    limiter.acquire()
+
+    with pytest.raises(QueueFull) as rejected:
+        limiter.acquire()
+
+    assert (rejected.value.status_code, rejected.value.retry_after) == (429, 7)
+
+
+def test_queued_request_times_out_with_503_and_leaves_the_queue():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=0.05)
+    limiter.acquire()
+
+    with pytest.raises(QueueTimeout) as rejected:
+        limiter.acquire()
+
+    assert rejected.value.status_code == 503
+    assert limiter.queued == 0
+
+
+def test_release_hands_the_slot_to_waiters_in_order():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=5)
+    limiter.acquire()
+    order = []
+
+    def wait(name):
+        with limiter.slot():
+            order.append(name)
+
+    threads = []
+    for name in ("first", "second"):
+        threads.append(threading.Thread(target=wait, args=(name,)))
+        threads[-1].start()
+        while limiter.queued < len(threads):
+            time.sleep(0.001)
+
+    limiter.release()
+    for thread in threads:
+        thread.join()
+
+    assert order == ["first", "second"]
+    assert (limiter.active, limiter.queued) == (0, 0)
+
+
+def test_async_and_sync_callers_share_the_slots():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=5)
+    limiter.acquire()
+
+    async def wait():
+        async with limiter.aslot():
+            return limiter.active
+
+    async def main():
+        task = asyncio.create_task(wait())
+        while limiter.queued == 0:
+            await asyncio.sleep(0.001)
+        threading.Thread(target=limiter.release).start()
+        return await task
+
+    assert asyncio.run(main()) == 1
+    assert limiter.active == 0
+
+
+def test_async_queue_timeout():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=0.05)
+    limiter.acquire()
+
+    with pytest.raises(QueueTimeout):
+        asyncio.run(limiter.acquire_async())
+
+    assert limiter.queued == 0
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=5)
+    limiter.acquire()
+
+    async def main():
+        task = asyncio.create_task(limiter.acquire_async())
+        while limiter.queued == 0:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    limiter.release()
+
+    assert (limiter.active, limiter.queued) == (0, 0)
+
+
+def test_waiter_on_a_closed_loop_is_skipped():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=5)
+    limiter.acquire()
+    loop = asyncio.new_event_loop()
+    loop.create_task(limiter.acquire_async())
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+
+    limiter.release()
+
+    assert (limiter.active, limiter.queued) == (0, 0)
@@ -0,0 +1,281 @@
+import io
+import shutil
+import zipfile
+from contextlib import ExitStack
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app import utils
+from app.utils import (
+    collect_text, configure_document_cache, configure_extraction_limits, configure_ocr, detect_file_type,
+    extract_text_from_pdf, extract_text_from_pdf_hybrid, extract_text_from_pdf_with_ocr, iter_pdf_pages_hybrid,
+    ocr_pdf_pages, parse_resume,
+)
+from benchmarks.corpus import LINES_PER_PAGE, write_pdf, write_scanned_pdf
+from tests.conftest import RESUME_TEXT, docx_bytes
+
+
+def pdf_bytes(tmp_path, pages):
+    """
+    Return a text-layer PDF whose page N reads "Page N" followed by the given line text.
+    """
+    lines = []
+    for number, text in enumerate(pages, start=1):
+        lines += [f"Page {number} {text}"] + [""] * (LINES_PER_PAGE - 1)
+    path = tmp_path / "document.pdf"
+    write_pdf(path, "\n".join(lines))
+    return path.read_bytes()
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """
+    Replace the per-page OCR worker with one that records the pages it was asked for.
+    """
+    pages = []
+
+    def ocr_page(file_path, page_number):
+        pages.append(page_number)
+        return f"OCR text of page {page_number} " * 5
+
+    monkeypatch.setattr(utils, "_ocr_pdf_page", ocr_page)
+    configure_ocr(max_workers=1)
+    yield pages
+    configure_ocr()
+
+
+def test_ocr_returns_pages_in_the_order_requested(tmp_path, fake_ocr):
+    texts = ocr_pdf_pages(pdf_bytes(tmp_path, ["a", "b", "c"]), [3, 1])
+
+    assert texts == ["OCR text of page 3 " * 5, "OCR text of page 1 " * 5]
+    assert ocr_pdf_pages(b"%PDF-", []) == []
+
+
+def test_full_ocr_stops_at_the_page_cap(tmp_path, fake_ocr):
+    text = extract_text_from_pdf_with_ocr(pdf_bytes(tmp_path, ["a", "b", "c"]), max_pages=2)
+
+    assert fake_ocr == [1, 2]
+    assert "page 2" in text and "page 3" not in text
+
+
+@pytest.mark.skipif(not (shutil.which("tesseract") and shutil.which("pdftoppm")), reason="needs tesseract and poppler")
+def test_ocr_runs_pages_in_parallel_on_a_process_pool(tmp_path):
+    path = tmp_path / "scanned.pdf"
+    write_scanned_pdf(path, "\n".join(f"Page {number} text" + "\n" * (LINES_PER_PAGE - 1) for number in (1, 2, 3)))
+
+    texts = ocr_pdf_pages(str(path), [1, 2, 3], max_workers=2)
+
+    assert ["Page 1" in texts[0], "Page 2" in texts[1], "Page 3" in texts[2]] == [True, True, True]
+
+
+LONG_TEXT = "native text layer with plenty of characters"
+
+
+def test_hybrid_extraction_ocrs_only_pages_without_text(tmp_path, fake_ocr):
+    text = extract_text_from_pdf_hybrid(pdf_bytes(tmp_path, [LONG_TEXT, "", LONG_TEXT, ""]))
+
+    assert fake_ocr == [2, 4]
+    markers = ("Page 1 native", "OCR text of page 2", "Page 3 native", "OCR text of page 4")
+    positions = [text.index(marker) for marker in markers]
+    assert positions == sorted(positions)
+
+
+def test_hybrid_extraction_ocrs_sparse_pages_in_worker_sized_batches(tmp_path, monkeypatch):
+    batches = []
+
+    def open_ocr(resources, source, workers):
+        def run_ocr(page_numbers):
+            batches.append(list(page_numbers))
+            return [f"OCR text of page {number} " * 5 for number in page_numbers]
+        return run_ocr
+
+    monkeypatch.setattr(utils, "_open_ocr", open_ocr)
+    pages = iter_pdf_pages_hybrid(pdf_bytes(tmp_path, ["", LONG_TEXT, "", "", LONG_TEXT]), max_workers=2)
+
+    assert next(pages).startswith("OCR text of page 1")
+    assert batches == [[1, 3]]
+    assert len(list(pages)) == 4
+    assert batches == [[1, 3], [4]]
+
+
+def test_hybrid_extraction_flushes_its_batch_at_the_page_cap(tmp_path, monkeypatch):
+    batches = []
+    read = []
+    original = utils.iter_pdf_pages
+
+    def counting_pages(source):
+        for text in original(source):
+            read.append(text)
+            yield text
+
+    def open_ocr(resources, source, workers):
+        def run_ocr(page_numbers):
+            batches.append(list(page_numbers))
+            return [f"OCR text of page {number} " * 5 for number in page_numbers]
+        return run_ocr
+
+    monkeypatch.setattr(utils, "iter_pdf_pages", counting_pages)
+    monkeypatch.setattr(utils, "_open_ocr", open_ocr)
+
+    text = extract_text_from_pdf_hybrid(
+        pdf_bytes(tmp_path, ["", LONG_TEXT, LONG_TEXT, "", ""]), max_workers=4, max_pages=3
+    )
+
+    assert batches == [[1]]
+    assert len(read) == 3
+    assert "OCR text of page 1" in text and "Page 3" in text
+
+
+def test_ocr_pool_is_shared_between_documents_and_replaced_on_reconfiguration(tmp_path):
+    source = pdf_bytes(tmp_path, ["a"])
+    with ExitStack() as first, ExitStack() as second:
+        utils._open_ocr(first, source, 2)
+        pool = utils._ocr_pool
+        utils._open_ocr(second, source, 2)
+        assert pool is not None and utils._ocr_pool is pool
+
+    configure_ocr(max_workers=2)
+    try:
+        assert utils._ocr_pool is None
+    finally:
+        configure_ocr()
+
+
+def test_hybrid_extraction_keeps_the_text_layer_when_ocr_recovers_less(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "_ocr_pdf_page", lambda file_path, page_number: "")
+    configure_ocr(max_workers=1)
+    try:
+        text = extract_text_from_pdf_hybrid(pdf_bytes(tmp_path, ["short"]))
+    finally:
+        configure_ocr()
+
+    assert text.strip() == "Page 1 short"
+
+
+@pytest.fixture
+def count_docx_parses(services, monkeypatch):
+    """
+    Count the DOCX documents `parse_resume` actually parses, with the document cache enabled.
+    """
+    parses = []
+    original = utils.extract_text_from_docx
+
+    def counting_extract(source, max_chars=None):
+        parses.append(source)
+        return original(source, max_chars=max_chars)
+
+    monkeypatch.setattr(utils, "extract_text_from_docx", counting_extract)
+    configure_document_cache(enabled=True)
+    return parses
+
+
+def test_reuploading_the_same_file_skips_parsing(count_docx_parses):
+    contents = docx_bytes(RESUME_TEXT)
+    first = parse_resume(FileStorage(io.BytesIO(contents), filename="resume.docx"))
+    second = parse_resume(FileStorage(io.BytesIO(contents), filename="renamed.docx"))
+
+    assert first == second
+    assert "Jane Doe" in first
+    assert len(count_docx_parses) == 1
+
+
+def test_different_contents_or_limits_are_parsed_again(count_docx_parses):
+    contents = docx_bytes(RESUME_TEXT)
+    parse_resume(FileStorage(io.BytesIO(contents), filename="resume.docx"))
+    parse_resume(FileStorage(io.BytesIO(docx_bytes(RESUME_TEXT + "Kafka")), filename="resume.docx"))
+    configure_extraction_limits(max_chars=100)
+    try:
+        capped = parse_resume(FileStorage(io.BytesIO(contents), filename="resume.docx"))
+    finally:
+        configure_extraction_limits()
+
+    assert len(count_docx_parses) == 3
+    assert len(capped) == 100
+
+
+def test_disabled_document_cache_parses_every_upload(count_docx_parses):
+    configure_document_cache(enabled=False)
+    contents = docx_bytes(RESUME_TEXT)
+
+    parse_resume(FileStorage(io.BytesIO(contents), filename="resume.docx"))
+    parse_resume(FileStorage(io.BytesIO(contents), filename="resume.docx"))
+
+    assert len(count_docx_parses) == 2
+
+
+def zip_bytes(names):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name in names:
+            archive.writestr(name, "<xml/>")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("contents, file_type", [
+    (b"%PDF-1.4\n...", "pdf"),
+    (b"\xef\xbb\xbf junk before the header %PDF-1.7\n", "pdf"),
+    (zip_bytes(["word/document.xml", "[Content_Types].xml"]), "docx"),
+    (zip_bytes(["xl/workbook.xml"]), None),
+    (b"PK\x03\x04 truncated archive", None),
+    (b"plain text resume", None),
+    (b"", None),
+])
+def test_detect_file_type_reads_magic_bytes(contents, file_type):
+    assert detect_file_type(contents) == file_type
+
+
+def test_parse_resume_ignores_a_misleading_extension(services, tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(docx_bytes(RESUME_TEXT))
+
+    assert "Jane Doe" in parse_resume(str(path))
+    assert "Jane Doe" in parse_resume(FileStorage(io.BytesIO(path.read_bytes()), filename="resume.pdf"))
+
+
+def test_parse_resume_rejects_contents_that_are_not_a_document(services):
+    with pytest.raises(ValueError, match="Unsupported file format: .pdf"):
+        parse_resume(FileStorage(io.BytesIO(b"MZ\x90\x00 not a pdf"), filename="resume.pdf"))
+
+    with pytest.raises(ValueError, match="Unsupported file object type"):
+        parse_resume(12345)
+
+
+def test_collect_text_stops_at_the_chunk_cap_and_closes_the_extractor():
+    produced = []
+    closed = []
+
+    def chunks():
+        try:
+            for number in range(10):
+                produced.append(number)
+                yield f"{number};"
+        finally:
+            closed.append(True)
+
+    assert collect_text(chunks(), max_chunks=3) == "0;1;2;"
+    assert produced == [0, 1, 2]
+    assert closed == [True]
+
+
+@pytest.mark.parametrize("max_chars, text", [(5, "0;1;2"), (6, "0;1;2;"), (100, "0;1;2;3;"), (None, "0;1;2;3;")])
+def test_collect_text_truncates_the_last_chunk_to_the_character_cap(max_chars, text):
+    assert collect_text(iter(["0;", "1;", "2;", "3;"]), max_chars=max_chars) == text
+
+
+def test_pdf_extraction_stops_reading_pages_at_the_cap(tmp_path, monkeypatch):
+    read = []
+    original = utils.iter_pdf_pages
+
+    def counting_pages(source):
+        for text in original(source):
+            read.append(text)
+            yield text
+
+    monkeypatch.setattr(utils, "iter_pdf_pages", counting_pages)
+
+    text = extract_text_from_pdf_hybrid(pdf_bytes(tmp_path, [LONG_TEXT] * 5), max_pages=2)
+
+    assert len(read) == 2
+    assert "Page 2" in text and "Page 3" not in text
+    assert extract_text_from_pdf(pdf_bytes(tmp_path, [LONG_TEXT] * 5), max_chars=10) == "Page 1 nat"
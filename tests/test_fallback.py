@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.nlp.model import (
+    DEFAULT_MODEL, SMALL_MODEL, LLMHelper, OutputParseError, ValidationService, configure_llm_cache,
+)
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT
+
+MALFORMED = "I could not find that information."
+UNKNOWN_COMPANY = "Company Name: Unknown\nJob Title: Senior Data Engineer\nClarifications (if applicable): None"
+
+
+SMALL_PROMPTS = {"extract_company_and_job_title": SMALL_MODEL, "validate_resume": SMALL_MODEL}
+
+
+@pytest.fixture
+def helper(services):
+    return LLMHelper(api_key="test", prompt_models=SMALL_PROMPTS)
+
+
+def test_malformed_small_model_output_falls_back_to_the_default_model(services, helper):
+    services.script("extract_company_and_job_title", MALFORMED, model=SMALL_MODEL)
+
+    assert helper.extract_company_and_job_title(JOB_DESCRIPTION) == ("Acme Analytics", "Senior Data Engineer")
+    assert services.calls(SMALL_MODEL) == ["extract_company_and_job_title"]
+    assert services.calls(DEFAULT_MODEL) == ["extract_company_and_job_title"]
+
+
+def test_async_extraction_falls_back_on_malformed_output(services, helper):
+    services.script("extract_company_and_job_title", MALFORMED, model=SMALL_MODEL)
+
+    result = asyncio.run(helper.aextract_company_and_job_title(JOB_DESCRIPTION))
+
+    assert result == ("Acme Analytics", "Senior Data Engineer")
+    assert services.calls(DEFAULT_MODEL) == ["extract_company_and_job_title"]
+
+
+def test_an_unknown_company_reaches_the_caller_without_a_fallback(services, helper):
+    services.script("extract_company_and_job_title", UNKNOWN_COMPANY, model=SMALL_MODEL)
+
+    with pytest.raises(ValueError) as error:
+        helper.extract_company_and_job_title(JOB_DESCRIPTION)
+
+    assert not isinstance(error.value, OutputParseError)
+    assert str(error.value).startswith("The company name could not be determined.")
+    assert services.calls(DEFAULT_MODEL) == []
+
+
+def test_malformed_validation_output_falls_back_to_the_default_model(services, helper):
+    services.script("validate_resume", MALFORMED, model=SMALL_MODEL)
+
+    validity, _ = ValidationService(helper)._run_validation("validate_resume", resume_text=RESUME_TEXT)
+
+    assert validity == "Yes"
+    assert services.calls(DEFAULT_MODEL) == ["validate_resume"]
+
+
+def test_malformed_output_is_not_cached(services):
+    configure_llm_cache(enabled=True)
+    helper = LLMHelper(api_key="test", prompt_models=SMALL_PROMPTS)
+    services.script("extract_company_and_job_title", MALFORMED, model=SMALL_MODEL)
+
+    helper.extract_company_and_job_title(JOB_DESCRIPTION)
+    services.script("extract_company_and_job_title", UNKNOWN_COMPANY, model=SMALL_MODEL)
+    with pytest.raises(ValueError, match="company name could not be determined"):
+        helper.extract_company_and_job_title(JOB_DESCRIPTION)
+
+    # The well-formed "Unknown" answer is cached like any other
+    with pytest.raises(ValueError, match="company name could not be determined"):
+        helper.extract_company_and_job_title(JOB_DESCRIPTION)
+    assert services.calls(SMALL_MODEL) == ["extract_company_and_job_title"] * 2
+    assert services.calls(DEFAULT_MODEL) == ["extract_company_and_job_title"]
@@ -0,0 +1,49 @@
+import pytest
+
+from app.nlp.model import LLMHelper, run_analysis
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT
+
+
+def test_fused_mode_makes_two_analysis_calls_with_the_same_result_shape(services):
+    result = run_analysis(RESUME_TEXT, JOB_DESCRIPTION, "serp-key", "openai-key", fused=True)
+    fused = result.to_dict()
+
+    assert services.calls().count("fused_validation_and_extraction") == 1
+    assert services.calls().count("fused_analysis") == 1
+    assert not {"validate_resume", "compatibility", "suggestions"} & set(services.calls())
+    assert fused["validation_results"] == "Valid inputs."
+    assert (result.company_name, result.job_title) == ("Acme Analytics", "Senior Data Engineer")
+    assert set(fused["analysis"]) == {
+        "compatibility_evaluation", "suggestions", "bullet_points", "keyword_score", "missing_skills",
+    }
+
+
+def test_fused_validation_failure_is_reported_like_the_staged_mode(services):
+    services.script("fused_validation_and_extraction", """{
+        "resume_validity": "No", "resume_reason": "Not a resume.",
+        "job_description_validity": "Yes", "job_description_reason": "",
+        "company_name": "Acme Analytics", "job_title": "Senior Data Engineer"
+    }""")
+
+    result = run_analysis(RESUME_TEXT, JOB_DESCRIPTION, "serp-key", "openai-key", fused=True)
+
+    assert result.error == "Validation failed for one or both inputs."
+    assert result.details == ["Invalid Resume: Not a resume."]
+    assert "fused_analysis" not in services.calls()
+
+
+@pytest.mark.parametrize("content, message", [
+    ("not json", "Failed to parse JSON result"),
+    ('{"compatibility_evaluation": "Good.", "suggestions": "None."}', "missing keys \\['bullet_points'\\]"),
+    ('{"compatibility_evaluation": "Good.", "suggestions": "None.", "bullet_points": 3}', "missing keys"),
+])
+def test_invoke_json_chain_rejects_malformed_responses(services, content, message):
+    services.script("fused_analysis", content)
+    helper = LLMHelper(api_key="test", prompt_models={})
+
+    with pytest.raises(ValueError, match=message):
+        helper.invoke_json_chain(
+            helper.get_chain("fused_analysis"),
+            required_keys=("compatibility_evaluation", "suggestions", "bullet_points"),
+            resume_text=RESUME_TEXT, job_description=JOB_DESCRIPTION,
+        )
@@ -0,0 +1,83 @@
+import pytest
+
+from app.nlp.heuristics import HeuristicValidator, match_section_header
+from app.nlp.model import LLMHelper, ValidationService
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT
+
+SHORT_POSTING = "Senior Python Engineer at Acme, remote, 5+ yrs Django/AWS"
+
+
+@pytest.fixture
+def validator():
+    return HeuristicValidator()
+
+
+def test_short_posting_with_a_role_is_not_rejected(validator):
+    verdict = validator.assess_job_description(SHORT_POSTING)
+
+    assert verdict.status == "uncertain"
+    assert validator.decide(verdict) is None
+
+
+def test_short_resume_with_contact_details_is_not_rejected(validator):
+    verdict = validator.assess_resume("Jane Doe\njane.doe@example.com\nData engineer, Python and SQL.")
+
+    assert verdict.status == "uncertain"
+    assert validator.decide(verdict) is None
+
+
+def test_short_text_without_any_signal_is_rejected(validator):
+    job_verdict = validator.assess_job_description("Hello there, how are you doing today?")
+    resume_verdict = validator.assess_resume("Hello there, how are you doing today?")
+
+    assert validator.decide(job_verdict) == "reject"
+    assert validator.decide(resume_verdict) == "reject"
+    assert "too short" in job_verdict.reason
+
+
+@pytest.mark.parametrize("text, reason", [
+    ("", "empty"),
+    ("1234 5678 %%%% 9999 ---- 0000", "symbols or digits"),
+    (" ".join(["xz qr tk"] * 20), "OCR noise"),
+])
+def test_noise_is_rejected(validator, text, reason):
+    verdict = validator.assess_job_description(text)
+
+    assert validator.decide(verdict) == "reject"
+    assert reason in verdict.reason
+
+
+def test_job_description_pasted_as_resume_is_flagged(validator):
+    text = JOB_DESCRIPTION + "\nWe are looking for someone who will apply. Preferred: Kafka. Required: SQL.\n" * 3
+
+    verdict = validator.assess_resume(text)
+
+    assert verdict.status == "invalid"
+    assert "job description" in verdict.reason
+
+
+def test_well_structured_inputs_are_accepted_only_when_configured():
+    resume = RESUME_TEXT + "\n".join(["Developed and operated data pipelines with Python, Spark and SQL."] * 15)
+    verdict = HeuristicValidator().assess_resume(resume)
+
+    assert verdict.status == "valid"
+    assert HeuristicValidator().decide(verdict) is None
+    assert HeuristicValidator(skip_llm_for_valid=True, accept_threshold=0.8).decide(verdict) == "accept"
+
+
+@pytest.mark.parametrize("line, name", [
+    ("Work Experience:", "experience"),
+    ("## Skills", "skills"),
+    ("I have experience with Python", None),
+])
+def test_match_section_header(line, name):
+    assert match_section_header(line, {"experience": r"(work )?experience", "skills": r"skills"}) == name
+
+
+def test_short_posting_is_deferred_to_the_llm(services):
+    service = ValidationService(LLMHelper(api_key="test"), heuristic_validator=HeuristicValidator())
+
+    assert service.prescreen_job_description("")[0] == "No"
+    assert service.prescreen_job_description(SHORT_POSTING) is None
+    assert service.validate_job_description(SHORT_POSTING)[0] == "Yes"
+    assert services.calls() == ["validate_job_description"]
@@ -0,0 +1,211 @@
+import io
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app.concurrency import QueueFull
+from app.jobs import (
+    FAILED, QUEUED, RUNNING, SUCCEEDED, JobFailed, JobQueue, MemoryJobStore, SQLiteJobStore, configure_job_queue,
+    get_job_queue, new_job_record,
+)
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT, docx_bytes
+
+
+def wait_for(queue, job_id, statuses=(SUCCEEDED, FAILED), timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        record = queue.get(job_id)
+        if record is not None and record["status"] in statuses:
+            return record
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not reach {statuses}")
+
+
+def add_job(store, job_id="job-1", payload=None):
+    store.add(new_job_record(job_id, "echo"), payload if payload is not None else {"value": 1})
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return MemoryJobStore() if request.param == "memory" else SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+
+def echo(payload, report_stage):
+    report_stage("echo", {"value": payload["value"]})
+    return payload
+
+
+def fail(payload, report_stage):
+    raise JobFailed("Bad input.", ["Missing title."])
+
+
+def test_jobs_run_in_the_background_and_report_stages(store):
+    queue = JobQueue(store, max_workers=1, handlers={"echo": echo, "fail": fail})
+    try:
+        succeeded = wait_for(queue, queue.submit("echo", {"value": 3}))
+        failed = wait_for(queue, queue.submit("fail", {}))
+    finally:
+        queue.stop()
+
+    assert succeeded["result"] == {"value": 3}
+    assert succeeded["completed_stages"] == ["echo"]
+    assert succeeded["partial_results"] == {"echo": {"value": 3}}
+    assert succeeded["attempts"] == 1
+    assert (failed["status"], failed["error"], failed["details"]) == (FAILED, "Bad input.", ["Missing title."])
+
+
+def test_submit_rejects_unknown_kinds_and_full_queues(store):
+    queue = JobQueue(store, max_workers=0, max_queued=1, handlers={"echo": echo})
+
+    with pytest.raises(ValueError, match="Unknown job kind"):
+        queue.submit("missing", {})
+    queue.submit("echo", {"value": 1})
+    with pytest.raises(QueueFull):
+        queue.submit("echo", {"value": 2})
+
+
+def test_expired_jobs_are_hidden_from_reads_and_purged_on_enqueue(store):
+    add_job(store, "old")
+    store.update("old", lambda record: record.update(status=SUCCEEDED, expires_at=time.time() - 1))
+
+    assert store.get("old") is None
+    add_job(store, "new")
+
+    store.update("old", lambda record: record.update(expires_at=None))
+    assert store.get("old") is None
+    assert store.get("new")["status"] == QUEUED
+
+
+def test_sqlite_reads_do_not_take_the_write_lock(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    add_job(store)
+    writer = sqlite3.connect(store.path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        assert store.get("job-1")["status"] == QUEUED
+        assert store.count_queued() == 1
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+
+def test_sqlite_job_whose_lease_expired_is_reclaimed_with_its_payload(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    add_job(store, payload={"value": 7})
+
+    assert store.claim_next(lease_timeout=0.05) == ("job-1", "echo", {"value": 7}, 1)
+    assert store.claim_next(lease_timeout=0.05) is None
+    time.sleep(0.1)
+
+    assert store.claim_next(lease_timeout=60) == ("job-1", "echo", {"value": 7}, 2)
+    assert store.get("job-1")["status"] == RUNNING
+
+
+def test_sqlite_renewed_lease_is_not_reclaimed(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    add_job(store)
+    store.claim_next(lease_timeout=0.05)
+
+    store.renew_leases(["job-1"], lease_timeout=60)
+    time.sleep(0.1)
+
+    assert store.claim_next(lease_timeout=60) is None
+
+
+def test_sqlite_finished_job_drops_its_payload_and_is_never_reclaimed(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    add_job(store)
+    store.claim_next(lease_timeout=0.05)
+    store.update("job-1", lambda record: record.update(status=SUCCEEDED))
+    time.sleep(0.1)
+
+    assert store.claim_next(lease_timeout=60) is None
+    with sqlite3.connect(store.path) as connection:
+        assert connection.execute("SELECT payload, lease_expires_at FROM jobs").fetchone() == (None, None)
+
+
+def test_heartbeat_keeps_a_long_job_leased(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    started = threading.Event()
+
+    def slow(payload, report_stage):
+        started.set()
+        time.sleep(0.5)
+        return payload
+
+    queue = JobQueue(SQLiteJobStore(path), max_workers=1, handlers={"slow": slow}, lease_timeout=0.15)
+    try:
+        job_id = queue.submit("slow", {})
+        started.wait(5)
+        time.sleep(0.3)
+        # Another worker process finds nothing to reclaim while the heartbeat renews the lease
+        assert SQLiteJobStore(path).claim_next(lease_timeout=60) is None
+        assert wait_for(queue, job_id)["status"] == SUCCEEDED
+    finally:
+        queue.stop()
+
+
+def test_job_abandoned_too_many_times_is_failed(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    add_job(store)
+    for _ in range(2):
+        store.claim_next(lease_timeout=0)
+        time.sleep(0.01)
+
+    queue = JobQueue(store, max_workers=1, handlers={"echo": echo}, max_attempts=2)
+    queue.start()
+    try:
+        record = wait_for(queue, "job-1")
+    finally:
+        queue.stop()
+
+    assert record["status"] == FAILED
+    assert "interrupted" in record["error"]
+    assert record["attempts"] == 3
+
+
+def test_store_created_before_leases_is_migrated(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL, "
+            "expires_at REAL, record TEXT NOT NULL, payload TEXT)"
+        )
+
+    store = SQLiteJobStore(path)
+    add_job(store)
+
+    assert store.claim_next(lease_timeout=60)[0] == "job-1"
+
+
+def test_jobs_route_queues_an_analysis_and_reports_its_result(client):
+    configure_job_queue(max_workers=1)
+
+    response = client.post("/api/jobs", data={
+        "file": (io.BytesIO(docx_bytes(RESUME_TEXT)), "resume.docx"),
+        "job_description": JOB_DESCRIPTION,
+    }, content_type="multipart/form-data")
+
+    assert response.status_code == 202
+    status_url = response.headers["Location"]
+    deadline = time.monotonic() + 10
+    while (job := client.get(status_url).get_json())["status"] not in (SUCCEEDED, FAILED):
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    assert job["status"] == SUCCEEDED
+    assert job["result"]["company_name"] == "Acme Analytics"
+    assert "parse_resume" in job["completed_stages"]
+    assert client.get("/api/jobs/unknown").status_code == 404
+
+
+def test_queue_without_workers_requires_a_shared_store(tmp_path):
+    with pytest.raises(ValueError, match="JOB_STORE_PATH"):
+        configure_job_queue(max_workers=0)
+
+    configure_job_queue(max_workers=0, path=str(tmp_path / "jobs.db"))
+    try:
+        assert isinstance(get_job_queue().store, SQLiteJobStore)
+    finally:
+        configure_job_queue()
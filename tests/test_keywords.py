@@ -0,0 +1,63 @@
+import pytest
+
+from app.nlp.keywords import KeywordScorer, keyword_scorer
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT
+
+
+@pytest.mark.parametrize("text, skill", [
+    ("Maintain our CI/CD pipelines.", "ci/cd"),
+    ("Run A/B testing on onboarding flows.", "a/b testing"),
+    ("Train models with scikit-learn.", "scikit-learn"),
+    ("Ship features in C++ and C#.", "c++"),
+    ("Build services in Node.js.", "node.js"),
+])
+def test_extract_skills_matches_skills_with_symbols(text, skill):
+    assert skill in keyword_scorer.extract_skills(text)
+
+
+def test_compound_tokens_that_are_not_skills_are_split():
+    assert keyword_scorer.tokenize("Python/Django, full-time") == ["python", "django", "full", "time"]
+    assert {"python", "django"} <= keyword_scorer.extract_skills("Python/Django")
+
+
+def test_missing_skills_are_in_the_job_but_not_the_resume():
+    missing = keyword_scorer.missing_skills(RESUME_TEXT, JOB_DESCRIPTION)
+
+    assert missing == sorted(missing)
+    assert {"aws", "ci/cd"} <= set(missing)
+    assert "snowflake" not in missing
+    assert "python" not in missing
+
+
+def test_score_is_a_cosine_similarity():
+    assert keyword_scorer.score(RESUME_TEXT, RESUME_TEXT) == pytest.approx(1.0)
+    assert keyword_scorer.score(RESUME_TEXT, "") == 0.0
+    assert 0 < keyword_scorer.score(RESUME_TEXT, JOB_DESCRIPTION) < 1
+
+
+def test_score_matrix_matches_pairwise_scores():
+    resumes = [RESUME_TEXT, "Sales associate who led retail teams."]
+    jobs = [JOB_DESCRIPTION, "Sell printers to local businesses.", ""]
+
+    matrix = keyword_scorer.score_matrix(resumes, jobs)
+
+    assert matrix.shape == (2, 3)
+    for i, resume in enumerate(resumes):
+        for j, job in enumerate(jobs):
+            assert matrix[i, j] == pytest.approx(keyword_scorer.score(resume, job))
+
+
+def test_idf_weighting_discounts_terms_shared_by_every_document():
+    scorer = KeywordScorer()
+    jobs = [JOB_DESCRIPTION, JOB_DESCRIPTION.replace("Snowflake", "BigQuery")]
+
+    plain = scorer.score_matrix([RESUME_TEXT], jobs)
+    weighted = scorer.score_matrix([RESUME_TEXT], jobs, use_idf=True)
+
+    assert not (plain == weighted).all()
+
+
+def test_match_many_equals_match_for_each_job():
+    jobs = [JOB_DESCRIPTION, "Sell printers to local businesses.", ""]
+
+    assert keyword_scorer.match_many(RESUME_TEXT, jobs) == [keyword_scorer.match(RESUME_TEXT, job) for job in jobs]
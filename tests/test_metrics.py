@@ -0,0 +1,105 @@
+import asyncio
+import io
+
+import pytest
+
+from app.cache import MemoryCache, TieredCache
+from app.metrics import PROMETHEUS_CONTENT_TYPE, MetricFamily, MetricsRegistry, cache_metric_families, timed
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT, docx_bytes
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_renders_each_label_combination(registry):
+    calls = registry.counter("calls_total", "Calls made.", ("prompt",))
+    calls.inc(prompt="compatibility")
+    calls.inc(2, prompt="compatibility")
+    calls.inc(prompt='say "hi"')
+
+    assert registry.render().splitlines() == [
+        "# HELP resume_tailor_calls_total Calls made.",
+        "# TYPE resume_tailor_calls_total counter",
+        'resume_tailor_calls_total{prompt="compatibility"} 3',
+        'resume_tailor_calls_total{prompt="say \\"hi\\""} 1',
+    ]
+
+
+def test_metrics_reject_wrong_labels_and_duplicate_names(registry):
+    calls = registry.counter("calls_total", "Calls made.", ("prompt",))
+
+    with pytest.raises(ValueError, match="takes labels"):
+        calls.inc(model="gpt-4o")
+    with pytest.raises(ValueError, match="already registered"):
+        registry.counter("calls_total", "Calls made.")
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count(registry):
+    durations = registry.histogram("duration_seconds", "Durations.", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        durations.observe(value)
+
+    assert registry.render().splitlines()[2:] == [
+        'resume_tailor_duration_seconds_bucket{le="0.1"} 1',
+        'resume_tailor_duration_seconds_bucket{le="1"} 2',
+        'resume_tailor_duration_seconds_bucket{le="+Inf"} 3',
+        "resume_tailor_duration_seconds_sum 5.55",
+        "resume_tailor_duration_seconds_count 3",
+    ]
+
+
+def test_timed_works_as_a_context_manager_and_a_decorator_for_coroutines(registry):
+    durations = registry.histogram("duration_seconds", "Durations.", ("step",))
+
+    with timed(durations, step="block") as timer:
+        pass
+
+    @timed(durations, step="coroutine")
+    async def step():
+        await asyncio.sleep(0)
+
+    asyncio.run(step())
+    asyncio.run(step())
+
+    assert timer.elapsed is not None
+    counts = {labels["step"]: value for name, labels, value in durations.samples() if name.endswith("_count")}
+    assert counts == {"block": 1, "coroutine": 2}
+
+
+def test_collector_families_are_rendered_at_scrape_time(registry):
+    queued = []
+    registry.register_collector(lambda: [MetricFamily("jobs_queued", "gauge", "Jobs waiting.", [({}, len(queued))])])
+
+    queued.append("job")
+
+    assert "resume_tailor_jobs_queued 1" in registry.render().splitlines()
+
+
+def test_cache_metric_families_skip_disabled_caches():
+    cache = TieredCache(MemoryCache())
+    cache.get("missing")
+
+    families = {family.name: family.samples for family in cache_metric_families({"llm": cache, "document": None})}
+
+    assert families["cache_misses_total"] == [({"cache": "llm"}, 1)]
+    assert families["cache_stale_hits_total"] == []
+
+
+def test_metrics_endpoint_reports_requests_llm_calls_and_tokens(client):
+    client.post("/api/resume/upload", data={
+        "file": (io.BytesIO(docx_bytes(RESUME_TEXT)), "resume.docx"),
+        "job_description": JOB_DESCRIPTION,
+    }, content_type="multipart/form-data")
+
+    response = client.get("/metrics")
+
+    assert response.content_type == PROMETHEUS_CONTENT_TYPE
+    body = response.get_data(as_text=True)
+    # The registry is process-wide, so other tests' requests may be counted too
+    upload = 'endpoint="/api/resume/upload",method="POST",status="200"'
+    assert f"resume_tailor_http_request_duration_seconds_count{{{upload}}} " in body
+    assert 'prompt="compatibility"' in body
+    assert "resume_tailor_llm_tokens_total" in body
+    assert "resume_tailor_analyses_active 0" in body
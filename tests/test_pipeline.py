@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.nlp.pipeline import AsyncStageExecutor, GateClosed, PipelineCancelled, Stage, StageExecutor
+
+
+def test_stages_receive_their_dependencies_results():
+    stages = [
+        Stage("a", lambda results: 1),
+        Stage("b", lambda results: 2),
+        Stage("sum", lambda results: results["a"] + results["b"], depends_on=("a", "b")),
+    ]
+
+    results = StageExecutor().run(stages)
+
+    assert results == {"a": 1, "b": 2, "sum": 3}
+
+
+def test_independent_stages_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    stages = [
+        Stage("a", lambda results: barrier.wait()),
+        Stage("b", lambda results: barrier.wait()),
+    ]
+
+    # Each stage waits for the other, so running them one after another would time out
+    results = StageExecutor(max_workers=2).run(stages)
+
+    assert set(results) == {"a", "b"}
+
+
+def test_on_stage_complete_is_called_for_every_stage_in_dependency_order():
+    completed = []
+    stages = [
+        Stage("first", lambda results: "x"),
+        Stage("second", lambda results: results["first"] * 2, depends_on=("first",)),
+    ]
+
+    StageExecutor().run(stages, on_stage_complete=lambda name, result: completed.append((name, result)))
+
+    assert completed == [("first", "x"), ("second", "xx")]
+
+
+def test_unknown_dependency_is_rejected_before_anything_runs():
+    ran = []
+    stages = [
+        Stage("a", lambda results: ran.append("a")),
+        Stage("b", lambda results: None, depends_on=("missing",)),
+    ]
+
+    with pytest.raises(ValueError, match="unknown stages: missing"):
+        StageExecutor().run(stages)
+    assert ran == []
+
+
+def test_dependency_cycle_raises():
+    stages = [
+        Stage("a", lambda results: None, depends_on=("b",)),
+        Stage("b", lambda results: None, depends_on=("a",)),
+    ]
+
+    with pytest.raises(ValueError, match="unresolvable dependencies"):
+        StageExecutor().run(stages)
+
+
+def test_failing_stage_raises_and_dependent_stages_never_start():
+    ran = []
+
+    def fail(results):
+        raise RuntimeError("boom")
+
+    def slow(results):
+        time.sleep(0.2)
+        return "slow"
+
+    stages = [
+        Stage("fail", fail),
+        Stage("slow", slow),
+        Stage("after_slow", lambda results: ran.append("after_slow"), depends_on=("slow",)),
+        Stage("after_fail", lambda results: ran.append("after_fail"), depends_on=("fail",)),
+    ]
+
+    with pytest.raises(RuntimeError, match="boom"):
+        StageExecutor(max_workers=2).run(stages)
+    time.sleep(0.3)
+    assert ran == []
+
+
+def test_closed_gate_carries_its_result():
+    def gate(results):
+        raise GateClosed({"error": "invalid"})
+
+    stages = [
+        Stage("gate", gate),
+        Stage("after", lambda results: "never", depends_on=("gate",)),
+    ]
+
+    with pytest.raises(GateClosed) as raised:
+        StageExecutor().run(stages)
+    assert raised.value.result == {"error": "invalid"}
+
+
+def test_cancelled_pipeline_waits_for_running_stages_and_starts_no_more():
+    cancel = threading.Event()
+    ran = []
+
+    def slow(results):
+        cancel.set()
+        time.sleep(0.1)
+        ran.append("slow")
+
+    stages = [
+        Stage("slow", slow),
+        Stage("after", lambda results: ran.append("after"), depends_on=("slow",)),
+    ]
+
+    with pytest.raises(PipelineCancelled):
+        StageExecutor().run(stages, cancel_event=cancel)
+    assert ran == ["slow"]
+
+
+def test_async_executor_awaits_coroutines_and_runs_plain_functions():
+    async def double(results):
+        await asyncio.sleep(0)
+        return results["value"] * 2
+
+    stages = [
+        Stage("value", lambda results: 21),
+        Stage("double", double, depends_on=("value",)),
+    ]
+
+    results = asyncio.run(AsyncStageExecutor().run(stages))
+
+    assert results == {"value": 21, "double": 42}
+
+
+def test_async_executor_rejects_cycles_and_unknown_dependencies():
+    cycle = [
+        Stage("a", lambda results: None, depends_on=("b",)),
+        Stage("b", lambda results: None, depends_on=("a",)),
+    ]
+    unknown = [Stage("a", lambda results: None, depends_on=("missing",))]
+
+    with pytest.raises(ValueError, match="unresolvable dependencies"):
+        asyncio.run(AsyncStageExecutor().run(cycle))
+    with pytest.raises(ValueError, match="unknown stages"):
+        asyncio.run(AsyncStageExecutor().run(unknown))
+
+
+def test_async_executor_cancels_running_stages_when_one_fails():
+    cancelled = []
+
+    async def fail(results):
+        raise RuntimeError("boom")
+
+    async def slow(results):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    async def run():
+        stages = [Stage("fail", fail), Stage("slow", slow)]
+        with pytest.raises(RuntimeError, match="boom"):
+            await AsyncStageExecutor().run(stages)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert cancelled == ["slow"]
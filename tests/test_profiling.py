@@ -0,0 +1,68 @@
+import io
+
+import pytest
+
+from app.profiling import configure_profiling, get_profiler
+from config.config import get_config
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT, docx_bytes
+
+TOKEN = "profiling-secret"
+AUTHORIZATION = {"Authorization": f"Bearer {TOKEN}"}
+
+
+@pytest.fixture
+def profiling(app, tmp_path):
+    configure_profiling(header_enabled=True, directory=str(tmp_path), access_token=TOKEN)
+    yield get_profiler()
+    configure_profiling()
+
+
+def upload(client, headers):
+    return client.post("/api/resume/upload", data={
+        "file": (io.BytesIO(docx_bytes(RESUME_TEXT)), "resume.docx"),
+        "job_description": JOB_DESCRIPTION,
+    }, content_type="multipart/form-data", headers=headers)
+
+
+def test_header_profiling_is_off_by_default():
+    assert get_config("development").PROFILING_HEADER_ENABLED is False
+
+
+def test_profiled_request_gets_a_server_generated_id_and_its_profile_can_be_read(client, profiling):
+    response = upload(client, {"X-Profile": "true", "X-Request-ID": "chosen-by-client", **AUTHORIZATION})
+
+    request_id = response.headers["X-Request-ID"]
+    assert request_id != "chosen-by-client"
+    assert profiling.load_summary("chosen-by-client") is None
+    profile = client.get(f"/api/profiles/{request_id}", headers=AUTHORIZATION)
+    assert profile.status_code == 200
+    assert profile.get_json()["request_id"] == request_id
+
+
+def test_profile_header_without_the_token_is_ignored(client, profiling, tmp_path):
+    response = upload(client, {"X-Profile": "true"})
+
+    assert response.status_code == 200
+    assert "X-Request-ID" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}, {"Authorization": TOKEN}])
+def test_profiles_endpoint_rejects_requests_without_the_token(client, profiling, headers):
+    request_id = upload(client, {"X-Profile": "true", **AUTHORIZATION}).headers["X-Request-ID"]
+
+    response = client.get(f"/api/profiles/{request_id}", headers=headers)
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_profiles_are_never_served_without_a_configured_token(client, tmp_path):
+    configure_profiling(enabled=True, directory=str(tmp_path))
+    try:
+        request_id = upload(client, {}).headers["X-Request-ID"]
+        response = client.get(f"/api/profiles/{request_id}", headers={"Authorization": "Bearer "})
+    finally:
+        configure_profiling()
+
+    assert response.status_code == 401
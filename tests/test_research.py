@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.cache import MemoryCache, RefreshingCache
+from app.nlp.clients import get_client_registry
+from app.nlp.model import InterviewResearchService, LLMHelper
+from app.nlp.research import configure_research_cache, normalize_company, normalize_job_title, research_cache_key
+
+
+@pytest.mark.parametrize("variant", ["Acme", "ACME, Inc.", "acme corp", "Acme Corporation LLC"])
+def test_company_name_variants_normalize_alike(variant):
+    assert normalize_company(variant) == "acme"
+
+
+@pytest.mark.parametrize("title, normalized", [
+    ("Sr. SWE", "senior software engineer"),
+    ("Senior  Software Engineer", "senior software engineer"),
+    ("C++ Dev", "c++ developer"),
+])
+def test_job_title_abbreviations_are_expanded(title, normalized):
+    assert normalize_job_title(title) == normalized
+
+
+def test_research_cache_key_ignores_spelling_but_not_meaning():
+    key = research_cache_key("serp", "Google LLC", "Sr. SWE")
+
+    assert key == research_cache_key("serp", "alphabet", "Senior Software Engineer")
+    assert key != research_cache_key("serp", "Google", "Software Engineer")
+    assert key != research_cache_key("interview_insights", "Google", "Senior Software Engineer")
+
+
+def make_stale_cache(value="stale"):
+    cache = RefreshingCache(MemoryCache(), ttl=60, stale_ttl=60)
+    cache.cache.set("key", {"value": value, "stored_at": time.time() - 90})
+    return cache
+
+
+def test_fresh_entries_are_served_without_computing():
+    cache = RefreshingCache(MemoryCache(), ttl=60)
+
+    assert cache.get_or_compute("key", lambda: "computed") == "computed"
+    assert cache.get_or_compute("key", lambda: pytest.fail("fresh entries are not recomputed")) == "computed"
+
+
+def test_stale_entry_is_served_while_one_background_refresh_runs():
+    cache = make_stale_cache()
+    refreshed = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        refreshed.set()
+        return "fresh"
+
+    assert cache.get_or_compute("key", compute) == "stale"
+    assert cache.get_or_compute("key", compute) == "stale"
+    release.set()
+    refreshed.wait(5)
+    deadline = time.monotonic() + 5
+    while cache.get("key") != "fresh" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert cache.get("key") == "fresh"
+    assert (cache.stale_hits, cache.refreshes) == (2, 1)
+
+
+def test_failed_background_refresh_keeps_the_stale_entry():
+    cache = make_stale_cache()
+
+    def compute():
+        raise RuntimeError("SERP API is down")
+
+    assert cache.get_or_compute("key", compute) == "stale"
+    deadline = time.monotonic() + 5
+    while cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert cache.get("key") == "stale"
+
+
+def test_async_refresh_task_is_kept_until_it_finishes():
+    cache = make_stale_cache()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return "fresh"
+
+    async def main():
+        assert await cache.aget_or_compute("key", compute) == "stale"
+        (task,) = cache._refresh_tasks
+        await task
+        return cache._refresh_tasks
+
+    assert asyncio.run(main()) == set()
+    assert cache.get("key") == "fresh"
+
+
+def test_search_results_are_shared_across_company_spellings(services, serp_server):
+    configure_research_cache(enabled=True)
+    service = InterviewResearchService(LLMHelper(api_key="test"), "serp-key")
+    before = serp_server.request_count
+
+    async def search_async():
+        try:
+            return await service.asearch_interview_info("acme corp", "senior data engineer")
+        finally:
+            await get_client_registry().aclose_loop_clients()
+
+    first = service.search_interview_info("Acme, Inc.", "Sr. Data Engineer")
+    second = service.search_interview_info("ACME", "Senior Data Engineer")
+    third = asyncio.run(search_async())
+
+    assert first == second == third
+    assert serp_server.request_count - before == 1
@@ -0,0 +1,97 @@
+import io
+import json
+import time
+
+from app.concurrency import get_concurrency_limiter
+from app.nlp.model import stream_full_analysis
+from tests.conftest import JOB_DESCRIPTION, RESUME_TEXT, docx_bytes
+
+INVALID_RESUME = "1. Resume Validity: No - Not a resume.\n2. Resume Sufficiency: Insufficient - Not a resume."
+
+
+def test_stream_yields_each_section_then_done(services):
+    events = list(stream_full_analysis(RESUME_TEXT, JOB_DESCRIPTION, "serp-key", "openai-key"))
+
+    names = [event["event"] for event in events]
+    assert names[-1] == "done"
+    assert set(names[:-1]) == {
+        "keyword_match", "validation", "compatibility_evaluation", "suggestions", "bullet_points",
+        "company_and_job_title", "interview_insights",
+    }
+    assert names.index("validation") < names.index("compatibility_evaluation")
+    sections = {event["event"]: event["data"] for event in events}
+    assert sections["company_and_job_title"] == {"company_name": "Acme Analytics", "job_title": "Senior Data Engineer"}
+    assert sections["done"]["analysis"]["suggestions"] == sections["suggestions"]
+
+
+def test_stream_tokens_reassemble_the_streamed_sections(services):
+    events = list(stream_full_analysis(RESUME_TEXT, JOB_DESCRIPTION, "serp-key", "openai-key", stream_tokens=True))
+
+    tokens = [event for event in events if event["event"] == "token"]
+    suggestions = "".join(event["data"] for event in tokens if event["section"] == "suggestions")
+    assert suggestions.strip() == next(event["data"] for event in events if event["event"] == "suggestions")
+    assert {event["section"] for event in tokens} == {"suggestions", "interview_insights"}
+
+
+def test_stream_ends_with_an_error_event_when_validation_fails(services):
+    services.script("validate_resume", INVALID_RESUME)
+
+    events = list(stream_full_analysis(RESUME_TEXT, JOB_DESCRIPTION, "serp-key", "openai-key"))
+
+    assert events[-1]["event"] == "error"
+    assert events[-1]["data"]["error"] == "Validation failed for one or both inputs."
+    assert "compatibility_evaluation" not in [event["event"] for event in events]
+
+
+def post_stream(client, headers=None):
+    return client.post("/api/resume/upload/stream", data={
+        "file": (io.BytesIO(docx_bytes(RESUME_TEXT)), "resume.docx"),
+        "job_description": JOB_DESCRIPTION,
+    }, content_type="multipart/form-data", headers=headers or {})
+
+
+def test_stream_route_responds_with_ndjson_and_releases_its_slot(client):
+    response = post_stream(client)
+
+    assert response.mimetype == "application/x-ndjson"
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert events[-1]["event"] == "done"
+    response.close()
+    assert get_concurrency_limiter().active == 0
+
+
+def test_stream_route_responds_with_server_sent_events(client):
+    response = post_stream(client, headers={"Accept": "text/event-stream"})
+
+    assert response.mimetype == "text/event-stream"
+    messages = [message for message in response.get_data(as_text=True).split("\n\n") if message]
+    assert messages[-1].startswith("event: done\ndata: ")
+    response.close()
+
+
+def test_stream_route_rejects_a_missing_job_description(client):
+    response = client.post("/api/resume/upload/stream", data={
+        "file": (io.BytesIO(docx_bytes(RESUME_TEXT)), "resume.docx"),
+    }, content_type="multipart/form-data")
+
+    assert response.status_code == 400
+    assert "Job description is required" in response.get_json()["error"]
+
+
+def test_closing_the_stream_cancels_the_analysis_and_then_releases_its_slot(client, services):
+    # Slow models keep validation running when the first event (the keyword match) arrives
+    for model_name in ("gpt-4o", "gpt-4o-mini"):
+        services.create(model_name).latency = 0.2
+    response = post_stream(client)
+
+    first = json.loads(next(iter(response.response)))
+    response.close()
+
+    limiter = get_concurrency_limiter()
+    assert limiter.active == 1
+    deadline = time.monotonic() + 5
+    while limiter.active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert first["event"] == "keyword_match"
+    assert limiter.active == 0
+    assert sorted(services.calls()) == ["validate_job_description", "validate_resume"]
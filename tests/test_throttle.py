@@ -0,0 +1,158 @@
+import email.utils
+import time
+
+import httpx
+import openai
+import pytest
+from pydantic import Field
+
+from app.nlp.model import LLMHelper
+from app.nlp.throttle import (
+    RateLimiter, RetryPolicy, TokenBucket, configure_llm_resilience, get_throttle_registry, is_retryable, retry_after,
+)
+from tests.conftest import ScriptedChatModel
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def status_error(error_class, status_code, headers=None, code=None):
+    response = httpx.Response(status_code, headers=headers, request=REQUEST)
+    return error_class("error", response=response, body={"code": code} if code else None)
+
+
+def tokens_taken(limiter):
+    """
+    Return how far the limiter's token bucket is below capacity.
+    """
+    limiter.tokens.refund(0)
+    return limiter.tokens.capacity - limiter.tokens._level
+
+
+def test_token_bucket_delays_reservations_beyond_its_level_and_caps_refunds():
+    bucket = TokenBucket(capacity=60, refill_per_second=1)
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(30) == pytest.approx(30, abs=0.1)
+    bucket.refund(1000)
+    assert bucket.reserve(60) == 0.0
+
+
+def test_rate_limiter_settles_a_reservation_to_the_tokens_used():
+    limiter = RateLimiter(tpm=6000)
+    limiter.reserve(1000)
+    limiter.settle(1000, 400)
+    assert tokens_taken(limiter) == pytest.approx(400, abs=5)
+
+    limiter.reserve(1000)
+    limiter.settle(1000, 0)
+    assert tokens_taken(limiter) == pytest.approx(400, abs=5)
+
+    limiter.reserve(1000)
+    limiter.settle(1000, None)
+    assert tokens_taken(limiter) == pytest.approx(1400, abs=5)
+
+
+def test_rate_limiter_pause_delays_every_reservation():
+    limiter = RateLimiter()
+    limiter.pause(5)
+
+    assert limiter.reserve(100) == pytest.approx(5, abs=0.1)
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (openai.APITimeoutError(request=REQUEST), True),
+    (status_error(openai.RateLimitError, 429), True),
+    (status_error(openai.RateLimitError, 429, code="insufficient_quota"), False),
+    (status_error(openai.InternalServerError, 503), True),
+    (status_error(openai.BadRequestError, 400), False),
+    (ValueError("bad output"), False),
+])
+def test_is_retryable(error, retryable):
+    assert is_retryable(error) is retryable
+
+
+def test_retry_policy_stops_after_max_retries_and_honors_retry_after():
+    policy = RetryPolicy(max_retries=2, base_delay=1, max_delay=4)
+    error = openai.APITimeoutError(request=REQUEST)
+
+    assert policy.should_retry(error, 1)
+    assert not policy.should_retry(error, 2)
+    assert 0 <= policy.delay(10) <= 4
+    assert policy.delay(0, retry_after=20) == 20
+
+
+@pytest.mark.parametrize("headers, seconds", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "7"}, 7.0),
+    ({"retry-after": "soon"}, None),
+    ({}, None),
+])
+def test_retry_after_reads_the_response_headers(headers, seconds):
+    delay = retry_after(status_error(openai.RateLimitError, 429, headers=headers))
+
+    assert delay == seconds
+
+
+def test_retry_after_reads_an_http_date():
+    headers = {"retry-after": email.utils.formatdate(time.time() + 30, usegmt=True)}
+
+    assert retry_after(status_error(openai.RateLimitError, 429, headers=headers)) == pytest.approx(30, abs=2)
+
+
+class FlakyChatModel(ScriptedChatModel):
+    """
+    A scripted chat model whose first `failures` calls time out.
+    """
+
+    failures: int = 0
+    attempts: list = Field(default_factory=list)
+
+    def _respond(self, prompt):
+        self.attempts.append(prompt)
+        if self.failures:
+            self.failures -= 1
+            raise openai.APITimeoutError(request=REQUEST)
+        return super()._respond(prompt)
+
+
+@pytest.fixture
+def limiter(services):
+    configure_llm_resilience(tpm=60_000, max_retries=3, base_delay=0)
+    return get_throttle_registry().get_limiter("test", "gpt-4o")
+
+
+def used_tokens(helper):
+    return helper.token_usage["input_tokens"] + helper.token_usage["output_tokens"]
+
+
+def test_retried_calls_only_keep_the_tokens_of_the_successful_attempt(services, limiter):
+    services["gpt-4o"] = FlakyChatModel(latency=0, failures=2)
+    helper = LLMHelper(api_key="test", prompt_models={})
+
+    helper.invoke_chain(helper.get_chain("bullet_points"), job_description="Build pipelines.")
+
+    assert len(services["gpt-4o"].attempts) == 3
+    assert tokens_taken(limiter) == pytest.approx(used_tokens(helper), abs=20)
+
+
+def test_a_call_that_exhausts_its_retries_releases_every_reservation(services, limiter):
+    services["gpt-4o"] = FlakyChatModel(latency=0, failures=10)
+    helper = LLMHelper(api_key="test", prompt_models={})
+
+    with pytest.raises(openai.APITimeoutError):
+        helper.invoke_chain(helper.get_chain("bullet_points"), job_description="Build pipelines.")
+
+    assert len(services["gpt-4o"].attempts) == 4
+    assert tokens_taken(limiter) == pytest.approx(0, abs=20)
+
+
+def test_streamed_calls_record_and_settle_their_usage(limiter):
+    helper = LLMHelper(api_key="test", prompt_models={})
+    tokens = []
+
+    result = helper.stream_chain(helper.get_chain("bullet_points"), tokens.append, job_description="Build pipelines.")
+
+    assert "".join(tokens).strip() == result
+    assert helper.token_usage["calls"] == 1
+    assert helper.token_usage["output_tokens"] > 0
+    assert tokens_taken(limiter) == pytest.approx(used_tokens(helper), abs=20)